@@ -0,0 +1,87 @@
+# benchmarks/compare.py
+"""Compare two run_benchmarks.py result files.
+
+    python benchmarks/compare.py benchmarks/results/base.json benchmarks/results/head.json
+
+Exits with status 1 when any metric regressed by more than --threshold.
+"""
+import argparse
+import json
+import sys
+
+# Metric name suffixes where a larger number is better; everything else is a duration
+HIGHER_IS_BETTER = ('_per_sec',)
+
+# Keys that describe the data rather than measure anything
+IGNORED_KEYS = ('samples', 'game_logs', 'training_rows', 'mae')
+
+
+def flatten(results, prefix=''):
+    metrics = {}
+    for key, value in results.items():
+        if key in IGNORED_KEYS:
+            continue
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            metrics.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = float(value)
+    return metrics
+
+
+def compare(base, head, threshold):
+    base_metrics = flatten(base['scales'])
+    head_metrics = flatten(head['scales'])
+
+    rows = []
+    for name in sorted(base_metrics.keys() & head_metrics.keys()):
+        old, new = base_metrics[name], head_metrics[name]
+        if old == 0:
+            continue
+
+        change = (new - old) / old
+        # Positive change is always "worse" from here on
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        rows.append((name, old, new, change, worse > threshold, worse < -threshold))
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--threshold', type=float, default=0.10, help="Relative change that counts as a regression")
+    parser.add_argument('--all', action='store_true', help="Show unchanged metrics too")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    print(f"base: {base['environment'].get('commit')}  head: {head['environment'].get('commit')}")
+    if base['environment'].get('cpu_count') != head['environment'].get('cpu_count'):
+        print("⚠️  Results come from machines with different CPU counts")
+
+    rows = compare(base, head, args.threshold)
+    regressions = 0
+
+    for name, old, new, change, regressed, improved in rows:
+        if regressed:
+            regressions += 1
+            marker = '❌'
+        elif improved:
+            marker = '✅'
+        elif args.all:
+            marker = '  '
+        else:
+            continue
+        print(f"{marker} {name:<60} {old:>14,.4f} -> {new:>14,.4f}  ({change:+.1%})")
+
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0%} across {len(rows)} metrics")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
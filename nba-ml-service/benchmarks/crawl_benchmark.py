@@ -0,0 +1,152 @@
+# benchmarks/crawl_benchmark.py
+"""Crawl throughput and retry behaviour of NBADataCollector against the local fake stats.nba.com.
+
+Starts benchmarks/fake_nba_api.py in a subprocess (or uses --base-url), then
+crawls every player's game logs once per fault scenario and concurrency:
+
+    python benchmarks/crawl_benchmark.py --players 120 --concurrency 4,8 --output benchmarks/results/crawl.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_nba_api import DEFAULT_FAULTS
+from benchmarks.run_benchmarks import environment_info
+from services.data_collector import NBADataCollector
+
+SCENARIOS = {
+    'clean': {},
+    'latency': {'latency_ms': 40, 'jitter_ms': 40},
+    'throttled': {'latency_ms': 40, 'jitter_ms': 40, 'rate_429': 0.05},
+    'timeouts': {'latency_ms': 40, 'jitter_ms': 40, 'timeout_rate': 0.02, 'timeout_seconds': 5},
+}
+
+
+@contextlib.contextmanager
+def fake_server(args):
+    """Run fake_nba_api.py on a local port until the benchmark is done"""
+    if args.base_url:
+        yield args.base_url.rstrip('/')
+        return
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_nba_api.py')
+    process = subprocess.Popen([
+        sys.executable, script, '--port', str(args.port), '--players', str(args.players),
+        '--games', str(args.games), '--season', args.season, '--seed', str(args.seed)
+    ])
+    server_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"{server_url}/fake/stats", timeout=1).raise_for_status()
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError("Fake stats.nba.com did not start")
+        yield f"{server_url}/stats"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def bench_crawl(base_url, control_url, faults, concurrency, args):
+    collector = NBADataCollector(
+        requests_per_second=args.rps, burst=args.burst, max_concurrency=concurrency,
+        cache_dir=None, base_url=base_url, timeout=args.client_timeout
+    )
+    async with httpx.AsyncClient() as control:
+        # Reset counters and apply this scenario's faults (none while picking players)
+        await control.post(f"{control_url}/fake/config", json=DEFAULT_FAULTS)
+        with contextlib.redirect_stdout(io.StringIO()):
+            players = await collector.get_active_players(args.season, args.players)
+
+        await control.post(f"{control_url}/fake/config", json={**DEFAULT_FAULTS, **faults})
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = await collector.crawl_game_logs(players, args.season)
+        elapsed = time.perf_counter() - started
+
+        served = (await control.get(f"{control_url}/fake/stats")).json()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        await collector.close()
+
+    games = sum(len(game_logs) for _, _, game_logs in results)
+    complete = sum(1 for _, _, game_logs in results if not game_logs.empty)
+    return {
+        'concurrency': concurrency,
+        'players': len(players),
+        'players_with_games': complete,
+        'games': games,
+        'seconds': round(elapsed, 3),
+        'players_per_sec': round(len(players) / elapsed, 2),
+        'games_per_sec': round(games / elapsed, 1),
+        'requests': served['requests'],
+        'retries': served['requests'] - len(players),
+        'throttled': served['throttled'],
+        'timed_out': served['timed_out'],
+        'final_rate': round(collector.rate_limiter.rate, 3)
+    }
+
+
+async def run(args):
+    concurrency_levels = [int(c) for c in args.concurrency.split(',') if c]
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    results = {'environment': environment_info(), 'config': vars(args), 'scenarios': {}}
+
+    with fake_server(args) as base_url:
+        control_url = base_url.rsplit('/stats', 1)[0]
+
+        for name in scenarios:
+            results['scenarios'][name] = []
+            for concurrency in concurrency_levels:
+                crawl = await bench_crawl(base_url, control_url, SCENARIOS[name], concurrency, args)
+                results['scenarios'][name].append(crawl)
+                print(f"{name:>10} x{concurrency:<3} {crawl['players_per_sec']:>8} players/s  "
+                      f"{crawl['seconds']:>7}s  retries {crawl['retries']:<4} "
+                      f"(429 {crawl['throttled']}, timeouts {crawl['timed_out']})  "
+                      f"complete {crawl['players_with_games']}/{crawl['players']}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default=None, help="Use an already running stand-in (http://host:port/stats)")
+    parser.add_argument('--port', type=int, default=8010)
+    parser.add_argument('--players', type=int, default=120, help="Players to generate (the collector crawls those averaging 10+ points)")
+    parser.add_argument('--games', type=int, default=60)
+    parser.add_argument('--season', default='2023-24')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"Any of {', '.join(SCENARIOS)}")
+    parser.add_argument('--concurrency', default='4,8', help="Collector max_concurrency values")
+    parser.add_argument('--rps', type=float, default=200.0, help="Token bucket rate (the real API needs ~3)")
+    parser.add_argument('--burst', type=int, default=20)
+    parser.add_argument('--client-timeout', type=float, default=2.0, help="Collector HTTP timeout in seconds")
+    parser.add_argument('--output', default=None, help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Crawl benchmark results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
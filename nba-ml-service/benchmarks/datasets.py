@@ -0,0 +1,74 @@
+# benchmarks/datasets.py
+import numpy as np
+import pandas as pd
+
+from services.feature_builder import MIN_PRIOR_GAMES
+
+SEASON_OPENER = pd.Timestamp('2023-10-24')
+
+# Scaled copies of a player get ids far away from real NBA ids
+SCALED_PLAYER_ID_OFFSET = 10_000_000
+
+
+def game_logs_from_training_rows(training_df):
+    """Rebuild playergamelog-shaped rows from real_nba_training_data.csv.
+
+    Every training row's actuals are one real game. The ten games before a
+    player's first row are not in the file, so they are filled in at that
+    row's season averages; dates follow the recorded rest days and MATCHUP
+    follows home_vs_away.
+    """
+    frames = []
+
+    for player_id, rows in training_df.groupby('player_id', sort=False):
+        first = rows.iloc[0]
+        n_prior = MIN_PRIOR_GAMES
+
+        pts = np.concatenate([np.full(n_prior, round(first['season_avg_points'])), rows['actual_points']])
+        reb = np.concatenate([np.full(n_prior, round(first['season_avg_rebounds'])), rows['actual_rebounds']])
+        ast = np.concatenate([np.full(n_prior, round(first['season_avg_assists'])), rows['actual_assists']])
+
+        # Day offsets: every other day for the filler games, then the recorded gaps
+        gaps = np.concatenate([np.full(n_prior, 2), rows['rest_days'].to_numpy() + 1])
+        dates = SEASON_OPENER + pd.to_timedelta(np.cumsum(gaps) - gaps[0], unit='D')
+        home = np.concatenate([np.ones(n_prior, dtype=bool), rows['home_vs_away'].to_numpy() == 1])
+
+        frames.append(pd.DataFrame({
+            'Game_ID': [f"{player_id}-{i:03d}" for i in range(len(pts))],
+            'GAME_DATE': dates.strftime('%b %d, %Y').str.upper(),
+            'MATCHUP': np.where(home, 'LAL vs. BOS', 'LAL @ BOS'),
+            'PTS': pts.astype(np.int64),
+            'REB': reb.astype(np.int64),
+            'AST': ast.astype(np.int64),
+            'PLAYER_ID': int(player_id)
+        }))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def scale_game_logs(game_logs_df, factor, seed=0):
+    """Stack `factor` copies of the game logs with new player ids and jittered box scores"""
+    if factor == 1:
+        return game_logs_df.copy()
+
+    rng = np.random.default_rng(seed)
+    copies = [game_logs_df]
+
+    for copy_index in range(1, factor):
+        scaled = game_logs_df.copy()
+        scaled['PLAYER_ID'] = scaled['PLAYER_ID'] + copy_index * SCALED_PLAYER_ID_OFFSET
+        scaled['Game_ID'] = scaled['Game_ID'] + f"-x{copy_index}"
+
+        # Small +/- noise keeps the copies from being exact duplicates for the trees
+        for stat in ('PTS', 'REB', 'AST'):
+            noise = rng.integers(-2, 3, size=len(scaled))
+            scaled[stat] = np.maximum(scaled[stat].to_numpy() + noise, 0)
+
+        copies.append(scaled)
+
+    return pd.concat(copies, ignore_index=True)
+
+
+def load_benchmark_game_logs(csv_path, factor=1, seed=0):
+    training_df = pd.read_csv(csv_path)
+    return scale_game_logs(game_logs_from_training_rows(training_df), factor, seed)
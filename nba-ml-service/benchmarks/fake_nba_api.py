@@ -0,0 +1,270 @@
+# benchmarks/fake_nba_api.py
+"""Local stand-in for stats.nba.com: commonallplayers, leaguedashplayerstats, playergamelog.
+
+Serves generated fixtures (or recorded response bodies from --fixtures) and
+can inject latency, 429s and hung requests, so the collector can be load
+tested and benchmarked without the network or the real API's rate limits:
+
+    python benchmarks/fake_nba_api.py --port 8010 --players 200 --latency-ms 40 --rate-429 0.02
+    NBA_API_BASE_URL=http://127.0.0.1:8010/stats NBA_API_CACHE_DIR= uvicorn main:app
+
+Recorded fixtures are stats.nba.com JSON bodies laid out as
+<dir>/commonallplayers.json, <dir>/leaguedashplayerstats.json and
+<dir>/playergamelog/<PlayerID>.json (save_fixtures writes generated ones in
+that layout). Every Season parameter gets the same fixtures. Fault
+injection can be changed at runtime with POST /fake/config, and GET
+/fake/stats counts what was served.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from fastapi import Body, FastAPI, Request
+from fastapi.responses import Response
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.feature_builder import NBA_DATE_FORMAT, parse_game_dates
+from services.nba_decoder import loads, result_set
+from services.synthetic_data import random_season_averages, SYNTHETIC_PLAYER_ID_OFFSET
+
+TEAMS = [
+    'ATL', 'BOS', 'BKN', 'CHA', 'CHI', 'CLE', 'DAL', 'DEN', 'DET', 'GSW', 'HOU', 'IND', 'LAC', 'LAL', 'MEM',
+    'MIA', 'MIL', 'MIN', 'NOP', 'NYK', 'OKC', 'ORL', 'PHI', 'PHX', 'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS'
+]
+FIRST_TEAM_ID = 1610612737
+
+PLAYER_HEADERS = ['PERSON_ID', 'DISPLAY_LAST_COMMA_FIRST', 'DISPLAY_FIRST_LAST', 'ROSTERSTATUS',
+                  'FROM_YEAR', 'TO_YEAR', 'TEAM_ID', 'TEAM_ABBREVIATION']
+STATS_HEADERS = ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'TEAM_ABBREVIATION', 'AGE',
+                 'GP', 'W', 'L', 'MIN', 'REB', 'AST', 'PTS']
+GAME_LOG_HEADERS = ['SEASON_ID', 'Player_ID', 'Game_ID', 'GAME_DATE', 'MATCHUP', 'WL',
+                    'MIN', 'REB', 'AST', 'PTS', 'PLUS_MINUS']
+
+DEFAULT_FAULTS = {
+    'latency_ms': 0.0,       # added to every response
+    'jitter_ms': 0.0,        # plus uniform 0..jitter_ms
+    'rate_429': 0.0,         # fraction of requests answered 429
+    'retry_after': None,     # Retry-After header on those 429s (seconds)
+    'timeout_rate': 0.0,     # fraction of requests that hang...
+    'timeout_seconds': 60.0  # ...for this long before answering
+}
+
+
+def generate_fixtures(n_players=60, games_per_player=60, season='2023-24', seed=0):
+    """Made-up players with season lines and game logs that agree with each other"""
+    rng = np.random.default_rng(seed)
+    avg_points, avg_rebounds, avg_assists = random_season_averages(n_players, rng)
+    opener = pd.Timestamp(f"{season[:4]}-10-24")
+    season_id = f"2{season[:4]}"
+
+    players, season_stats, game_logs = [], [], {}
+
+    for i in range(n_players):
+        player_id = SYNTHETIC_PLAYER_ID_OFFSET + i
+        team_index = int(rng.integers(len(TEAMS)))
+        team = TEAMS[team_index]
+        opponents = rng.choice([t for t in TEAMS if t != team], size=games_per_player)
+        name = f"Player {i:04d}"
+
+        gaps = rng.choice([1, 2, 3, 4], size=games_per_player, p=[0.15, 0.55, 0.2, 0.1])
+        dates = opener + pd.to_timedelta(np.cumsum(gaps) - gaps[0], unit='D')
+        home = rng.integers(0, 2, games_per_player).astype(bool)
+        pts = rng.poisson(avg_points[i], games_per_player)
+        reb = rng.poisson(avg_rebounds[i], games_per_player)
+        ast = rng.poisson(avg_assists[i], games_per_player)
+        minutes = np.clip(rng.normal(14 + avg_points[i], 4, games_per_player), 5, 44).round()
+        plus_minus = rng.integers(-20, 21, games_per_player)
+
+        # Newest game first, like the real endpoint
+        rows = [
+            [season_id, player_id, f"0022{season[2:4]}{i:04d}{g:03d}",
+             dates[g].strftime(NBA_DATE_FORMAT).upper(),
+             f"{team} vs. {opponents[g]}" if home[g] else f"{team} @ {opponents[g]}",
+             'W' if plus_minus[g] > 0 else 'L',
+             int(minutes[g]), int(reb[g]), int(ast[g]), int(pts[g]), int(plus_minus[g])]
+            for g in range(games_per_player)
+        ]
+        game_logs[player_id] = {'headers': GAME_LOG_HEADERS, 'rowSet': rows[::-1]}
+
+        wins = int((plus_minus > 0).sum())
+        players.append([player_id, f"{i:04d}, Player", name, 1, season[:4], season[:4],
+                        FIRST_TEAM_ID + team_index, team])
+        season_stats.append([player_id, name, FIRST_TEAM_ID + team_index, team, int(rng.integers(20, 36)),
+                             games_per_player, wins, games_per_player - wins, round(float(minutes.mean()), 1),
+                             round(float(reb.mean()), 1), round(float(ast.mean()), 1), round(float(pts.mean()), 1)])
+
+    # Scorers first, like the default sort of leaguedashplayerstats
+    season_stats.sort(key=lambda row: -row[-1])
+
+    return {
+        'commonallplayers': {'headers': PLAYER_HEADERS, 'rowSet': players},
+        'leaguedashplayerstats': {'headers': STATS_HEADERS, 'rowSet': season_stats},
+        'playergamelog': game_logs
+    }
+
+
+def _recorded_result_set(path):
+    with open(path, 'rb') as f:
+        headers, rows = result_set(loads(f.read()))
+    return {'headers': headers, 'rowSet': rows}
+
+
+def load_fixtures(fixtures_dir):
+    """Recorded stats.nba.com response bodies in the save_fixtures layout"""
+    fixtures = {}
+    for endpoint in ('commonallplayers', 'leaguedashplayerstats'):
+        fixtures[endpoint] = _recorded_result_set(os.path.join(fixtures_dir, f"{endpoint}.json"))
+
+    fixtures['playergamelog'] = {}
+    game_log_dir = os.path.join(fixtures_dir, 'playergamelog')
+    for name in os.listdir(game_log_dir):
+        if name.endswith('.json'):
+            player_id = int(name[:-len('.json')])
+            fixtures['playergamelog'][player_id] = _recorded_result_set(os.path.join(game_log_dir, name))
+    return fixtures
+
+
+def save_fixtures(fixtures, fixtures_dir):
+    """Write fixtures as stats.nba.com-shaped JSON files that load_fixtures reads back"""
+    os.makedirs(os.path.join(fixtures_dir, 'playergamelog'), exist_ok=True)
+    for endpoint in ('commonallplayers', 'leaguedashplayerstats'):
+        with open(os.path.join(fixtures_dir, f"{endpoint}.json"), 'w') as f:
+            json.dump({'resource': endpoint, 'resultSets': [fixtures[endpoint]]}, f)
+    for player_id, table in fixtures['playergamelog'].items():
+        with open(os.path.join(fixtures_dir, 'playergamelog', f"{player_id}.json"), 'w') as f:
+            json.dump({'resource': 'playergamelog', 'resultSets': [table]}, f)
+
+
+def _body(endpoint, params, table):
+    return json.dumps({
+        'resource': endpoint,
+        'parameters': params,
+        'resultSets': [{'name': endpoint, **table}]
+    }).encode()
+
+
+def create_app(fixtures, faults=None, seed=None):
+    """FastAPI app serving `fixtures` under /stats/<endpoint> with injectable faults"""
+    app = FastAPI(title="Fake stats.nba.com")
+    faults_config = {**DEFAULT_FAULTS, **(faults or {})}
+    counters = {'requests': 0, 'ok': 0, 'throttled': 0, 'timed_out': 0, 'by_endpoint': {}}
+    fault_rng = random.Random(seed)
+
+    # Bodies that don't depend on the query are built once
+    static_bodies = {
+        endpoint: _body(endpoint, {}, fixtures[endpoint])
+        for endpoint in ('commonallplayers', 'leaguedashplayerstats')
+    }
+    game_dates = {
+        player_id: parse_game_dates(pd.Series([row[table['headers'].index('GAME_DATE')]
+                                               for row in table['rowSet']], dtype=object))
+        for player_id, table in fixtures['playergamelog'].items()
+    }
+
+    async def inject_faults():
+        """None to answer normally, else the response to send instead"""
+        delay = faults_config['latency_ms'] + fault_rng.uniform(0, faults_config['jitter_ms'])
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        roll = fault_rng.random()
+        if roll < faults_config['rate_429']:
+            counters['throttled'] += 1
+            headers = {}
+            if faults_config['retry_after'] is not None:
+                headers['Retry-After'] = str(faults_config['retry_after'])
+            return Response(status_code=429, content=b'Too Many Requests', headers=headers)
+        if roll < faults_config['rate_429'] + faults_config['timeout_rate']:
+            counters['timed_out'] += 1
+            # Clients with a shorter timeout give up; the rest get a slow answer
+            await asyncio.sleep(faults_config['timeout_seconds'])
+        return None
+
+    def game_log_body(params):
+        player_id = int(params.get('PlayerID', 0))
+        table = fixtures['playergamelog'].get(player_id, {'headers': GAME_LOG_HEADERS, 'rowSet': []})
+
+        date_from = params.get('DateFrom')
+        if date_from and table['rowSet']:
+            keep = (game_dates[player_id] >= datetime.strptime(date_from, '%m/%d/%Y')).to_numpy()
+            table = {'headers': table['headers'],
+                     'rowSet': [row for row, kept in zip(table['rowSet'], keep) if kept]}
+        return _body('playergamelog', params, table)
+
+    @app.get("/stats/{endpoint}")
+    async def serve(endpoint: str, request: Request):
+        counters['requests'] += 1
+        counters['by_endpoint'][endpoint] = counters['by_endpoint'].get(endpoint, 0) + 1
+
+        fault = await inject_faults()
+        if fault is not None:
+            return fault
+
+        params = dict(request.query_params)
+        if endpoint in static_bodies:
+            content = static_bodies[endpoint]
+        elif endpoint == 'playergamelog':
+            content = game_log_body(params)
+        else:
+            return Response(status_code=404, content=f"Unknown endpoint {endpoint}".encode())
+
+        counters['ok'] += 1
+        return Response(content=content, media_type='application/json')
+
+    @app.get("/fake/stats")
+    async def fake_stats():
+        return {**counters, 'faults': faults_config, 'players': len(fixtures['playergamelog'])}
+
+    @app.post("/fake/config")
+    async def fake_config(changes: dict = Body(...)):
+        """Change fault injection (unknown keys are rejected) and reset the counters"""
+        unknown = set(changes) - set(DEFAULT_FAULTS)
+        if unknown:
+            return Response(status_code=422, content=f"Unknown settings: {sorted(unknown)}".encode())
+        faults_config.update(changes)
+        counters.update(requests=0, ok=0, throttled=0, timed_out=0, by_endpoint={})
+        return faults_config
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8010)
+    parser.add_argument('--fixtures', default=None, help="Directory of recorded response bodies")
+    parser.add_argument('--save-fixtures', default=None, help="Write the generated fixtures here and exit")
+    parser.add_argument('--players', type=int, default=60, help="Generated players")
+    parser.add_argument('--games', type=int, default=60, help="Generated games per player")
+    parser.add_argument('--season', default='2023-24')
+    parser.add_argument('--seed', type=int, default=0)
+    for name, default in DEFAULT_FAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=default)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+    else:
+        fixtures = generate_fixtures(args.players, args.games, args.season, args.seed)
+
+    if args.save_fixtures:
+        save_fixtures(fixtures, args.save_fixtures)
+        print(f"✅ Saved fixtures for {len(fixtures['playergamelog'])} players to {args.save_fixtures}")
+        return
+
+    faults = {name: getattr(args, name) for name in DEFAULT_FAULTS}
+    app = create_app(fixtures, faults, seed=args.seed)
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
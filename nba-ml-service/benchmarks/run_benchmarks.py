@@ -0,0 +1,200 @@
+# benchmarks/run_benchmarks.py
+"""Offline benchmarks for the feature pipeline, training and inference hot paths.
+
+Run from nba-ml-service/:
+
+    python benchmarks/run_benchmarks.py --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python benchmarks/compare.py benchmarks/results/old.json benchmarks/results/new.json
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+# Run as a script from anywhere: make the service's packages importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datasets import load_benchmark_game_logs
+from services.feature_builder import build_training_rows
+from services.feature_store import PlayerFeatureStore
+from services.ml_trainer import NBAMLTrainer
+from services.tree_inference import NUMBA_AVAILABLE
+
+
+def summarize(samples):
+    """Latency percentiles in milliseconds"""
+    ms = np.asarray(samples) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(ms, 50)), 4),
+        'p90_ms': round(float(np.percentile(ms, 90)), 4),
+        'p99_ms': round(float(np.percentile(ms, 99)), 4),
+        'mean_ms': round(float(ms.mean()), 4),
+        'samples': len(samples)
+    }
+
+
+def time_calls(fn, repeat, warmup=3):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_feature_building(game_logs, repeat):
+    samples = time_calls(lambda: build_training_rows(game_logs), repeat, warmup=1)
+    best = min(samples)
+    training_rows = len(build_training_rows(game_logs))
+
+    store = PlayerFeatureStore(snapshot_path=os.devnull)
+    store_samples = time_calls(lambda: store.rebuild(game_logs), max(1, repeat // 2), warmup=0)
+
+    return {
+        'game_logs': len(game_logs),
+        'training_rows': training_rows,
+        'build_training_rows': {
+            **summarize(samples),
+            'game_logs_per_sec': round(len(game_logs) / best),
+            'training_rows_per_sec': round(training_rows / best)
+        },
+        'feature_store_rebuild': {
+            **summarize(store_samples),
+            'game_logs_per_sec': round(len(game_logs) / min(store_samples))
+        }
+    }
+
+
+def bench_training(training_df, multi_output=False):
+    trainer = NBAMLTrainer(multi_output=multi_output, prediction_cache_size=0)
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        metrics = trainer.train_models(training_df)
+    total_seconds = time.perf_counter() - started
+
+    return trainer, {
+        'training_rows': len(training_df),
+        'total_seconds': round(total_seconds, 3),
+        'fit_seconds': {stat: round(m['train_seconds'], 3) for stat, m in metrics.items()},
+        'mae': {stat: round(m['mae'], 4) for stat, m in metrics.items()}
+    }
+
+
+def bench_inference(trainer, training_df, single_repeat, batch_repeat, batch_sizes):
+    rows = training_df[trainer.feature_columns].to_dict('records')
+    rng = np.random.default_rng(0)
+
+    engines = {'sklearn': (False, 'auto'), 'compiled_numpy': (True, 'numpy')}
+    if NUMBA_AVAILABLE:
+        engines['compiled_numba'] = (True, 'numba')
+
+    results = {}
+    for engine_name, (use_compiled, engine) in engines.items():
+        trainer.use_compiled_inference = use_compiled
+        trainer.inference_engine = engine
+
+        single_rows = itertools.cycle([rows[i] for i in rng.integers(0, len(rows), single_repeat)])
+        engine_results = {'single': summarize(time_calls(lambda: trainer.predict(next(single_rows)), single_repeat))}
+
+        for batch_size in batch_sizes:
+            batch = [rows[i] for i in rng.integers(0, len(rows), batch_size)]
+            samples = time_calls(lambda: trainer.predict_batch(batch), batch_repeat)
+            engine_results[f"batch_{batch_size}"] = {
+                **summarize(samples),
+                'rows_per_sec': round(batch_size / float(np.median(samples)))
+            }
+
+        results[engine_name] = engine_results
+
+    trainer.use_compiled_inference = True
+    trainer.inference_engine = 'auto'
+    return results
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'numba': NUMBA_AVAILABLE
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NBA ML service hot paths offline")
+    parser.add_argument('--data', default='real_nba_training_data.csv', help="Real training rows to rebuild game logs from")
+    parser.add_argument('--scales', default='1,10,100', help="Dataset scale factors for feature building")
+    parser.add_argument('--train-scales', default='1,10', help="Scale factors to also train and score models on")
+    parser.add_argument('--repeat', type=int, default=5, help="Repetitions for feature building")
+    parser.add_argument('--single-repeat', type=int, default=1000, help="Single-row predictions to time")
+    parser.add_argument('--batch-repeat', type=int, default=100, help="Batch predictions to time per batch size")
+    parser.add_argument('--batch-sizes', default='64,512', help="Batch sizes for batch inference")
+    parser.add_argument('--multi-output', action='store_true', help="Train one multi-output forest")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(',') if s]
+    train_scales = {int(s) for s in args.train_scales.split(',') if s}
+    batch_sizes = [int(s) for s in args.batch_sizes.split(',') if s]
+
+    results = {'environment': environment_info(), 'config': vars(args), 'scales': {}}
+
+    for scale in scales:
+        print(f"Scale {scale}x: building game logs...")
+        game_logs = load_benchmark_game_logs(args.data, scale, args.seed)
+        scale_results = {'features': bench_feature_building(game_logs, args.repeat)}
+        print(f"   build_training_rows: {scale_results['features']['build_training_rows']['game_logs_per_sec']:,} game logs/sec")
+
+        if scale in train_scales:
+            training_df = build_training_rows(game_logs)
+            trainer, scale_results['training'] = bench_training(training_df, args.multi_output)
+            print(f"   training: {scale_results['training']['fit_seconds']}")
+
+            scale_results['inference'] = bench_inference(
+                trainer, training_df, args.single_repeat, args.batch_repeat, batch_sizes
+            )
+            for engine_name, engine_results in scale_results['inference'].items():
+                print(f"   {engine_name}: single p50 {engine_results['single']['p50_ms']}ms, "
+                      f"p99 {engine_results['single']['p99_ms']}ms")
+
+        results['scales'][f"{scale}x"] = scale_results
+
+    output = args.output or os.path.join(
+        'benchmarks', 'results', f"{results['environment']['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Benchmark results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+# export_models.py - Build the compiled model sets inference_app.py serves from saved joblib models
+#
+# main.py writes models/<prefix>.forest and .cforest every time it saves
+# models. A deploy that only ships the joblib files runs this once (it needs
+# sklearn, unlike inference_app.py):
+#
+#   python export_models.py --prefix real_nba_models
+import argparse
+import os
+import sys
+
+from services.ml_trainer import NBAMLTrainer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export models/<prefix>_*.joblib as .forest and .cforest model sets")
+    parser.add_argument('--prefix', default=os.getenv('ML_MODEL_PREFIX', 'real_nba_models'))
+    parser.add_argument('--leaf-values', choices=['table', 'float32'], default='table',
+                        help="Leaf encoding of the compact .cforest file")
+    args = parser.parse_args()
+
+    trainer = NBAMLTrainer(
+        multi_output=os.path.exists(f"models/{args.prefix}_multi.joblib"),
+        prediction_cache_size=0,
+        compact_leaf_values=args.leaf_values
+    )
+    if not trainer.load_models(args.prefix):
+        sys.exit(f"❌ No complete joblib model set for prefix '{args.prefix}' in models/")
+
+    trainer.save_compiled_models(args.prefix)
+    trainer.save_compact_models(args.prefix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+# gunicorn.conf.py - multi-worker deployment of the scoring endpoints
+#
+#   gunicorn -c gunicorn.conf.py                  (inference_app:app, one worker per CPU)
+#
+# Only inference_app.py runs multi-worker. main.py keeps collection, training
+# jobs, their locks and the feature store in process memory, so it runs as a
+# single process next to these workers (uvicorn main:app); started here it is
+# held to one worker.
+#
+# The app is imported once in the master (preload_app) and the compiled forests
+# are memory-mapped from models/<prefix>.cforest (or .forest), so forked workers
+# share both the loaded code and the tree arrays. Each worker polls that file's
+# mtime (ML_MODEL_WATCH_SECONDS, default 5) and remaps it when main.py's
+# retrain has replaced it.
+import multiprocessing
+import os
+
+os.environ.setdefault('ML_MODEL_MMAP', '1')
+os.environ.setdefault('ML_PRELOAD_MODELS', '1')
+
+wsgi_app = 'inference_app:app'
+bind = os.getenv('ML_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('ML_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = True
+
+
+def on_starting(server):
+    # Two main.py workers would run collections and training jobs side by side
+    if server.app.app_uri.startswith('main:') and server.num_workers > 1:
+        server.log.warning("main:app keeps its jobs and stores per process; starting 1 worker, not %s",
+                           server.num_workers)
+        server.num_workers = 1
@@ -0,0 +1,168 @@
+# inference_app.py - Inference-only replica: scoring endpoints without the collector or trainer
+#
+# Imports only NumPy, FastAPI and the compiled-forest services (no pandas,
+# sklearn, pyarrow or httpx) and loads models/<prefix>.cforest (falling back to
+# the full .forest file), so an autoscaled replica is ready in a fraction of
+# main.py's startup time.
+#
+# main.py writes the model set whenever it saves models; for a deploy that
+# only has the joblib files, build it first with export_models.py:
+#
+#   python export_models.py --prefix real_nba_models
+#   uvicorn inference_app:app --port 8001
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List
+
+from fastapi import Body, FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from services.inference import CompiledModelSet
+from services.batcher import PredictionBatcher
+from services.metrics import REGISTRY, MetricsMiddleware
+
+MODEL_DIR = os.getenv('ML_MODEL_DIR', 'models')
+MODEL_PREFIX = os.getenv('ML_MODEL_PREFIX', 'real_nba_models')
+
+model_set = CompiledModelSet(
+    engine=os.getenv('ML_INFERENCE_ENGINE', 'auto'),
+    prediction_cache_size=int(os.getenv('ML_PREDICTION_CACHE_SIZE', '10000')),
+    prediction_cache_ttl=float(os.getenv('ML_PREDICTION_CACHE_TTL', '300'))
+)
+
+BATCH_WINDOW_MS = float(os.getenv('ML_BATCH_WINDOW_MS', '2'))
+prediction_batcher = PredictionBatcher(
+    model_set.predict_batch,
+    max_batch_size=int(os.getenv('ML_BATCH_MAX_SIZE', '64')),
+    max_wait_ms=BATCH_WINDOW_MS,
+    max_queue_depth=int(os.getenv('ML_BATCH_QUEUE_DEPTH', '1024'))
+) if BATCH_WINDOW_MS > 0 else None
+
+
+def forest_path(prefix):
+    """The compact model set when one was exported, else the full one"""
+    compact_path = os.path.join(MODEL_DIR, f"{prefix}.cforest")
+    if os.path.exists(compact_path):
+        return compact_path
+    return os.path.join(MODEL_DIR, f"{prefix}.forest")
+
+
+# Preloaded in the master with gunicorn --preload so forked workers share the mapping
+if os.getenv('ML_PRELOAD_MODELS', '0') == '1':
+    model_set.load(forest_path(MODEL_PREFIX))
+
+# Polling the served file's mtime picks up models main.py (or export_models.py) rewrote (0 turns it off)
+MODEL_WATCH_SECONDS = float(os.getenv('ML_MODEL_WATCH_SECONDS', '5'))
+
+
+async def watch_model_file(interval):
+    """Reload when the model set file on disk is newer than the one being served"""
+    last_tried = None
+    while True:
+        await asyncio.sleep(interval)
+
+        model_file = model_set.model_file or forest_path(MODEL_PREFIX)
+        try:
+            mtime = os.path.getmtime(model_file)
+        except OSError:
+            continue
+
+        # Skip the file being served and files that already failed to load
+        if mtime in (model_set.model_file_mtime, last_tried):
+            continue
+
+        last_tried = mtime
+        print(f"Model set {model_file} changed on disk, reloading...")
+        await asyncio.to_thread(model_set.load, model_file)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if not model_set.is_ready():
+        await asyncio.to_thread(model_set.load, forest_path(MODEL_PREFIX))
+    if prediction_batcher is not None:
+        prediction_batcher.start()
+    watcher = asyncio.create_task(watch_model_file(MODEL_WATCH_SECONDS)) if MODEL_WATCH_SECONDS > 0 else None
+
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    if prediction_batcher is not None:
+        await prediction_batcher.stop()
+
+app = FastAPI(title="NBA ML Inference Service", version="1.0.0", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+
+def require_models():
+    if not model_set.is_ready():
+        raise HTTPException(status_code=503, detail="Models are not loaded yet")
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "healthy",
+        "models_ready": model_set.is_ready(),
+        "model_version": model_set.model_version,
+        "models_loaded_at": model_set.models_loaded_at,
+        "timestamp": datetime.now()
+    }
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 503 until a model set is mapped and warmed"""
+    require_models()
+    return {"ready": True, "model_version": model_set.model_version}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/models/reload")
+async def reload_models(prefix: str = MODEL_PREFIX):
+    """Map another compiled model set and swap it in once warmed"""
+    loaded = await asyncio.to_thread(model_set.load, forest_path(prefix))
+    if not loaded:
+        raise HTTPException(status_code=404, detail=f"No usable compiled model set for prefix '{prefix}'")
+    return {"message": "Models reloaded", "model_version": model_set.model_version}
+
+@app.post("/predict")
+async def make_prediction(features: dict):
+    """Make predictions for a player"""
+    require_models()
+    try:
+        if prediction_batcher is None:
+            predictions = model_set.predict(features)
+        else:
+            predictions = await prediction_batcher.predict(features)
+        return {
+            "predictions": predictions,
+            "model_performance": model_set.model_performance,
+            "model_version": model_set.model_version,
+            "features_used": model_set.feature_columns
+        }
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Prediction queue is full, retry shortly")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+@app.post("/batch-predict")
+async def batch_predict(players_data: List[dict] = Body(...)):
+    """Predict stats for multiple players at once"""
+    require_models()
+    try:
+        batch_predictions = model_set.predict_batch(players_data)
+        return {"batch_predictions": [
+            {"player_id": player_features.get("player_id"), "predictions": predictions}
+            for player_features, predictions in zip(players_data, batch_predictions)
+        ]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv('PORT', '8001')))
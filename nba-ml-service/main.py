@@ -1,19 +1,126 @@
 # main.py - Update the test endpoint
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import Body, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 import pandas as pd
-import numpy as np
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 from services.data_collector import NBADataCollector
 from services.ml_trainer import NBAMLTrainer
+from services.game_log_store import GameLogStore
+from services.training_store import TrainingDataStore
+from services.training_jobs import TrainingJobManager
+from services.feature_store import PlayerFeatureStore
+from services.batcher import PredictionBatcher
+from services.metrics import REGISTRY, MetricsMiddleware
+from services.profiling import RequestProfiler, ProfilingMiddleware, collapsed_stacks
+from services.collection import stream_real_game_collection, stream_synthetic_collection
 
 
 
 load_dotenv()
 
-app = FastAPI(title="NBA ML Prediction Service", version="1.0.0")
+collector = NBADataCollector(
+    requests_per_second=float(os.getenv('NBA_API_REQUESTS_PER_SECOND', '3')),
+    max_concurrency=int(os.getenv('NBA_API_MAX_CONCURRENCY', '4')),
+    cache_dir=os.getenv('NBA_API_CACHE_DIR', 'cache/nba_api') or None,
+    synthetic_seed=int(os.getenv('NBA_SYNTHETIC_SEED')) if os.getenv('NBA_SYNTHETIC_SEED') else None,
+    # Point at a local stand-in (benchmarks/fake_nba_api.py) for offline runs
+    base_url=os.getenv('NBA_API_BASE_URL') or None,
+    timeout=float(os.getenv('NBA_API_TIMEOUT', '30'))
+)
+trainer = NBAMLTrainer(
+    multi_output=os.getenv('ML_MULTI_OUTPUT', '0') == '1',
+    prediction_cache_size=int(os.getenv('ML_PREDICTION_CACHE_SIZE', '10000')),
+    prediction_cache_ttl=float(os.getenv('ML_PREDICTION_CACHE_TTL', '300'))
+)
+game_log_store = GameLogStore()
+real_training_store = TrainingDataStore('data/training/real')
+synthetic_training_store = TrainingDataStore('data/training/synthetic')
+training_jobs = TrainingJobManager()
+# Held from the active-job check until the job is submitted
+training_submit_lock = asyncio.Lock()
+feature_store = PlayerFeatureStore()
+
+# Coalesce concurrent single predictions into one model call; a 0 ms window turns batching off
+BATCH_WINDOW_MS = float(os.getenv('ML_BATCH_WINDOW_MS', '2'))
+prediction_batcher = PredictionBatcher(
+    trainer.predict_batch,
+    max_batch_size=int(os.getenv('ML_BATCH_MAX_SIZE', '64')),
+    max_wait_ms=BATCH_WINDOW_MS,
+    max_queue_depth=int(os.getenv('ML_BATCH_QUEUE_DEPTH', '1024'))
+) if BATCH_WINDOW_MS > 0 else None
+
+# Opt-in request profiling: send 'X-Profile: 1' or profile a sampled fraction of traffic
+request_profiler = RequestProfiler(
+    sample_rate=float(os.getenv('ML_PROFILE_SAMPLE_RATE', '0')),
+    interval_ms=float(os.getenv('ML_PROFILE_INTERVAL_MS', '5')),
+    max_profiles=int(os.getenv('ML_PROFILE_BUFFER', '20'))
+) if os.getenv('ML_PROFILING', '0') == '1' else None
+
+MODEL_PREFIX = os.getenv('ML_MODEL_PREFIX', 'real_nba_models')
+
+# Trees grown (and oldest trees retired) per forest by an incremental update
+INCREMENTAL_TREES = int(os.getenv('ML_INCREMENTAL_TREES', '10'))
+
+# Memory-map the compiled forests so processes serving the same file share one copy of the trees
+MODEL_MMAP = os.getenv('ML_MODEL_MMAP', '0') == '1'
+
+# Polling the .forest file's mtime picks up model sets another process (e.g. export_models.py)
+# wrote (0 turns it off)
+MODEL_WATCH_SECONDS = float(os.getenv('ML_MODEL_WATCH_SECONDS', '5' if MODEL_MMAP else '0'))
+
+# Load models at import time instead of in the lifespan (e.g. under gunicorn --preload)
+if os.getenv('ML_PRELOAD_MODELS', '0') == '1':
+    trainer.load_models(MODEL_PREFIX, use_mmap=MODEL_MMAP)
+
+# State of the latest background model reload
+model_reload = {"status": "idle", "prefix": None, "requested_at": None, "finished_at": None, "error": None}
+background_tasks = set()
+
+# Name of the collection currently crawling, if any
+collection_state = {"running": None}
+# Progress events buffered for a slow (or gone) client before the oldest are dropped
+COLLECTION_QUEUE_SIZE = int(os.getenv('NBA_COLLECTION_QUEUE_SIZE', '256'))
+
+@asynccontextmanager
+async def lifespan(app):
+    # Open the collector's pooled HTTP session once for the app's lifetime
+    await collector.start()
+    
+    # Load and warm the models before the first request instead of lazily
+    if not trainer.is_ready():
+        await asyncio.to_thread(trainer.load_models, MODEL_PREFIX, MODEL_MMAP)
+    
+    # Per-player form for /players/predict; rebuilt from the game log store if there is no snapshot yet
+    await asyncio.to_thread(load_feature_store)
+    
+    if prediction_batcher is not None:
+        prediction_batcher.start()
+    
+    watcher = asyncio.create_task(watch_model_file(MODEL_WATCH_SECONDS)) if MODEL_WATCH_SECONDS > 0 else None
+    
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    if prediction_batcher is not None:
+        await prediction_batcher.stop()
+    training_jobs.shutdown()
+    await collector.close()
+
+def load_feature_store():
+    if feature_store.load() or game_log_store.is_empty():
+        return
+    feature_store.rebuild(game_log_store.load())
+    feature_store.save()
+    print(f"✅ Rebuilt feature store from stored game logs ({len(feature_store)} players)")
+
+app = FastAPI(title="NBA ML Prediction Service", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,9 +129,41 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+if request_profiler is not None:
+    app.add_middleware(ProfilingMiddleware, profiler=request_profiler)
+
+def collect_service_metrics():
+    """Cache, batcher and store gauges read from the objects that already track them"""
+    entry_samples, lookup_samples, byte_samples = [], [], []
+    caches = {"prediction": trainer.prediction_cache, "nba_api_response": collector.cache}
+    for cache_name, cache in caches.items():
+        if cache is None:
+            continue
+        stats = cache.stats()
+        entry_samples.append(({"cache": cache_name}, stats["entries"]))
+        lookup_samples.append(({"cache": cache_name, "result": "hit"}, stats["hits"]))
+        lookup_samples.append(({"cache": cache_name, "result": "miss"}, stats["misses"]))
+        if "bytes" in stats:
+            byte_samples.append(({"cache": cache_name}, stats["bytes"]))
+    
+    metrics = {
+        "nba_ml_cache_entries": ("gauge", "Entries held by each cache", entry_samples),
+        "nba_ml_cache_bytes": ("gauge", "Bytes held by each on-disk cache", byte_samples),
+        "nba_ml_cache_lookups_total": ("counter", "Cache lookups by result", lookup_samples),
+        "nba_ml_models_ready": ("gauge", "1 once every target has a model to serve", [({}, int(trainer.is_ready()))]),
+        "nba_ml_feature_store_players": ("gauge", "Players in the per-player feature store", [({}, len(feature_store))]),
+        "nba_ml_training_job_active": ("gauge", "1 while a training job is queued or running", [({}, int(training_jobs.has_active_job()))])
+    }
+    if prediction_batcher is not None:
+        batcher = prediction_batcher.stats()
+        metrics["nba_ml_batcher_queue_depth"] = ("gauge", "Predictions waiting for the micro-batcher", [({}, batcher["queue_depth"])])
+        metrics["nba_ml_batcher_batches_total"] = ("counter", "Batches scored by the micro-batcher", [({}, batcher["batches"])])
+        metrics["nba_ml_batcher_rows_total"] = ("counter", "Rows scored by the micro-batcher", [({}, prediction_batcher.rows_scored)])
+        metrics["nba_ml_batcher_rejected_total"] = ("counter", "Predictions rejected with a full queue", [({}, batcher["rejected"])])
+    return metrics
 
-collector = NBADataCollector()
-trainer = NBAMLTrainer()
+REGISTRY.add_collector(collect_service_metrics)
 
 @app.get("/")
 async def root():
@@ -32,7 +171,144 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "timestamp": datetime.now()}
+    return {
+        "status": "healthy",
+        "models_ready": trainer.is_ready(),
+        "model_version": trainer.model_version,
+        "models_loaded_at": trainer.models_loaded_at,
+        "model_reload": model_reload["status"],
+        "timestamp": datetime.now()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text-format metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 503 until a model set is loaded and warmed"""
+    if not trainer.is_ready():
+        raise HTTPException(status_code=503, detail="Models are not loaded yet")
+    return {"ready": True, "model_version": trainer.model_version}
+
+def require_models():
+    if not trainer.is_ready():
+        raise HTTPException(status_code=503, detail="Models are not loaded yet")
+
+async def predict_single(features):
+    """Predict one row, through the micro-batcher when it is enabled"""
+    if prediction_batcher is None:
+        return trainer.predict(features)
+    return await prediction_batcher.predict(features)
+
+async def reload_models_in_background(prefix):
+    try:
+        loaded_files = await asyncio.to_thread(trainer.load_models, prefix, MODEL_MMAP)
+        if not loaded_files:
+            raise RuntimeError(f"No complete model set found for prefix '{prefix}'")
+        model_reload.update(status="completed", error=None)
+    except Exception as e:
+        model_reload.update(status="failed", error=str(e))
+    finally:
+        model_reload["finished_at"] = datetime.now()
+
+async def watch_model_file(interval):
+    """Reload when another process writes a newer models/<prefix>.forest than the one being served"""
+    last_tried = None
+    while True:
+        await asyncio.sleep(interval)
+        
+        forest_filename = trainer.model_file or f"models/{MODEL_PREFIX}.forest"
+        try:
+            mtime = os.path.getmtime(forest_filename)
+        except OSError:
+            continue
+        
+        # Skip our own saves, files that already failed to load and reloads/jobs in progress
+        if mtime in (trainer.model_file_mtime, last_tried):
+            continue
+        if model_reload["status"] == "loading" or training_jobs.has_active_job():
+            continue
+        
+        last_tried = mtime
+        prefix = os.path.basename(forest_filename)[:-len('.forest')]
+        print(f"Model set {forest_filename} changed on disk, reloading...")
+        model_reload.update(status="loading", prefix=prefix, requested_at=datetime.now(), finished_at=None, error=None)
+        await reload_models_in_background(prefix)
+
+@app.post("/models/reload")
+async def reload_models(prefix: str = MODEL_PREFIX):
+    """Load a model set in the background and swap it in atomically once warmed.
+    
+    Only this process switches prefix. inference_app.py workers watch the
+    model set file they serve, so retrains here reach them within
+    ML_MODEL_WATCH_SECONDS; to move them to another prefix, set
+    ML_MODEL_PREFIX and restart them.
+    """
+    if model_reload["status"] == "loading":
+        raise HTTPException(status_code=409, detail="A model reload is already in progress")
+    
+    model_reload.update(status="loading", prefix=prefix, requested_at=datetime.now(), finished_at=None, error=None)
+    
+    task = asyncio.create_task(reload_models_in_background(prefix))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    
+    return {
+        "message": "Model reload started",
+        "prefix": prefix,
+        "current_version": trainer.model_version
+    }
+
+@app.get("/models/status")
+async def model_status():
+    return {
+        "models_ready": trainer.is_ready(),
+        "model_version": trainer.model_version,
+        "models_loaded_at": trainer.models_loaded_at,
+        "multi_output": trainer.is_multi_output_loaded(),
+        "reload": model_reload,
+        "compact_model": trainer.compact_report,
+        "trained_at": trainer.trained_at,
+        "last_update": trainer.update_report,
+        "prediction_cache": trainer.prediction_cache.stats() if trainer.prediction_cache is not None else None
+    }
+
+@app.get("/debug/batcher")
+async def batcher_stats():
+    """Batch sizes, queueing delay and queue depth of the /predict micro-batcher"""
+    if prediction_batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_batcher.stats()}
+
+@app.get("/debug/profiles")
+async def list_profiles():
+    """Recently captured request profiles, newest first"""
+    if request_profiler is None:
+        return {"enabled": False}
+    return {"enabled": True, "sample_rate": request_profiler.sample_rate, "profiles": request_profiler.list()}
+
+@app.get("/debug/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = "json"):
+    """One profile as a call tree (json) or as folded stacks for flame graphs (collapsed)"""
+    profile = request_profiler.get(profile_id) if request_profiler is not None else None
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    
+    if format == "collapsed":
+        return PlainTextResponse(
+            collapsed_stacks(profile),
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+        )
+    return {key: value for key, value in profile.items() if key != "stacks"}
+
+@app.get("/debug/cache")
+async def response_cache_stats():
+    """Hit rate and size of the stats.nba.com response cache"""
+    if collector.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **collector.cache.stats()}
 
 #added
 @app.get("/debug/nba-connection")
@@ -78,99 +354,215 @@ async def test_data_collection():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Data collection failed: {str(e)}")
 
+def start_collection(name, events):
+    """Run a collection in a detached task and return the queue its events arrive on.
+    
+    The crawl keeps going (and keeps storing what it fetched) even if the
+    client streaming the progress disconnects.
+    """
+    if collection_state["running"] is not None:
+        raise HTTPException(status_code=409, detail=f"Collection '{collection_state['running']}' is already running")
+    collection_state["running"] = name
+    
+    queue = asyncio.Queue(maxsize=COLLECTION_QUEUE_SIZE)
+    
+    def publish(event):
+        # Nobody may be reading: drop the oldest progress event rather than stall the crawl or grow without bound
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+    
+    async def pump():
+        try:
+            async for event in events:
+                publish(event)
+        except Exception as e:
+            print(f"❌ Collection '{name}' failed: {e}")
+            publish({"event": "error", "detail": str(e)})
+        finally:
+            collection_state["running"] = None
+            publish(None)
+    
+    task = asyncio.create_task(pump())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return queue
+
+async def collection_response(request: Request, queue, stream: bool):
+    """Stream events as NDJSON (or SSE when asked for), or wait and return the final summary"""
+    if not stream:
+        final_event = None
+        while (event := await queue.get()) is not None:
+            final_event = event
+        if final_event is None or final_event["event"] == "error":
+            return {"error": final_event["detail"] if final_event else "Collection produced no events"}
+        return {key: value for key, value in final_event.items() if key != "event"}
+    
+    use_sse = "text/event-stream" in request.headers.get("accept", "")
+    
+    async def events():
+        while (event := await queue.get()) is not None:
+            payload = json.dumps(event, default=str)
+            yield f"event: {event['event']}\ndata: {payload}\n\n" if use_sse else payload + "\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream" if use_sse else "application/x-ndjson")
+
 @app.get("/collect-data/full")
-async def collect_full_dataset():
-    """Collect training data from all seasons"""
-    try:
-        training_df = await collector.collect_all_seasons()
-        
-        if training_df.empty:
-            return {"error": "No training data collected", "total_examples": 0}
-        
-        # Save to CSV
-        training_df.to_csv('nba_training_data.csv', index=False)
-        
-        return {
-            "message": "Full dataset collection complete",
-            "total_examples": len(training_df),
-            "features": list(training_df.columns),
-            "saved_to": "nba_training_data.csv",
-            "sample_data": training_df.head(5).to_dict('records')
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Full collection failed: {str(e)}")
+async def collect_full_dataset(request: Request, export_csv: bool = False, stream: bool = True):
+    """Collect synthetic training data from all seasons, writing each season as it finishes"""
+    queue = start_collection("full", stream_synthetic_collection(
+        collector, synthetic_training_store,
+        export_csv='nba_training_data.csv' if export_csv else None
+    ))
+    return await collection_response(request, queue, stream)
 
-# Add to main.py
 @app.get("/collect-data/real-games")
-async def collect_real_game_data():
-    """Collect real game-by-game data instead of synthetic"""
-    try:
-        # Collect real game logs
-        game_logs_df = await collector.collect_real_game_data('2023-24', max_players=30)
+async def collect_real_game_data(request: Request, full_refresh: bool = False, export_csv: bool = False,
+                                 stream: bool = True):
+    """Collect real game-by-game data; after the first run only newer games are fetched.
+    
+    Progress streams back one record per player while every player's games
+    are stored as soon as they arrive.
+    """
+    season = '2023-24'
+    queue = start_collection("real-games", stream_real_game_collection(
+        collector, season, game_log_store, real_training_store, feature_store,
+        max_players=30, full_refresh=full_refresh,
+        export_csv='real_nba_training_data.csv' if export_csv else None
+    ))
+    return await collection_response(request, queue, stream)
+
+def training_columns():
+    return ['player_id'] + trainer.feature_columns + list(trainer.target_columns.values())
+
+def store_snapshot(parts=None):
+    """The training store parts a read is about to see, and when they were listed"""
+    read_at = datetime.now()
+    return {'read_at': read_at, 'parts': real_training_store.part_names() if parts is None else parts}
+
+def load_real_training_data():
+    """Real training rows (only the columns training needs), where they came from and the store snapshot read"""
+    columns = training_columns()
+    
+    if not real_training_store.is_empty():
+        # Parts written while the job runs are not in the snapshot, so the next update picks them up
+        snapshot = store_snapshot()
+        training_df = real_training_store.read(columns=columns, parts=snapshot['parts'])
+        return training_df, real_training_store.root, snapshot
+    if os.path.exists('real_nba_training_data.csv'):
+        # Legacy CSV export from before the Parquet store
+        return pd.read_csv('real_nba_training_data.csv', usecols=columns), 'real_nba_training_data.csv', None
+    return None, None, None
+
+@app.get("/train/real-models")
+async def train_real_ml_models():
+    """Start training Random Forest models on real game data as a background job"""
+    # Check, read and submit under one lock so two requests can't both start a job
+    async with training_submit_lock:
+        if training_jobs.has_active_job():
+            raise HTTPException(status_code=409, detail="A training job is already running")
         
-        if game_logs_df.empty:
-            return {"error": "No game logs collected"}
+        try:
+            training_df, data_source, snapshot = await asyncio.to_thread(load_real_training_data)
         
-        # Process into training format
-        training_df = collector.process_training_data(game_logs_df)
+            if training_df is None:
+                return {"error": "Real training data not found. Run /collect-data/real-games first"}
         
-        # Save the real data
-        training_df.to_csv('real_nba_training_data.csv', index=False)
+            if training_df.empty:
+                return {"error": "No training data available"}
         
-        return {
-            "message": "Real game data collected successfully",
-            "total_games": len(game_logs_df),
-            "training_examples": len(training_df),
-            "players_included": len(game_logs_df['PLAYER_ID'].unique()),
-            "saved_to": "real_nba_training_data.csv"
-        }
+            print(f"Training models on {len(training_df)} real examples...")
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Real data collection failed: {str(e)}")
-
-@app.get("/train/real-models")
-async def train_real_ml_models():
-    """Train Random Forest models on real game data"""
-    try:
-        # Load the real training data
-        if not os.path.exists('real_nba_training_data.csv'):
-            return {"error": "Real training data not found. Run /collect-data/real-games first"}
+            # Fit in worker processes; the new models are saved with the 'real' prefix and swapped in when done
+            job = training_jobs.submit(trainer, training_df, save_prefix=MODEL_PREFIX, data_snapshot=snapshot)
+        
+            return {
+                "message": "Training job started on real NBA data",
+                "job_id": job['job_id'],
+                "status_url": f"/train/jobs/{job['job_id']}",
+                "training_examples": len(training_df),
+                "players_included": len(training_df['player_id'].unique()),
+                "data_type": "real_game_logs",
+                "data_source": data_source
+            }
         
-        training_df = pd.read_csv('real_nba_training_data.csv')
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
+
+@app.get("/train/real-models/update")
+async def update_real_ml_models(n_new_trees: int = INCREMENTAL_TREES, compare_full_retrain: bool = False):
+    """Extend the serving forests with trees fit on training store parts they have not seen.
+    
+    Much cheaper than /train/real-models after a daily collection. The job
+    reports how the updated forests score against the current ones on the
+    new games (and on the last training holdout); compare_full_retrain also
+    fits from scratch so the drift of the cheap path can be checked.
+    """
+    # Same lock as /train/real-models: only one of the two can pass the check at a time
+    async with training_submit_lock:
+        if training_jobs.has_active_job():
+            raise HTTPException(status_code=409, detail="A training job is already running")
+        if any(model is None for model in trainer.models.values()):
+            raise HTTPException(status_code=409, detail="No trained sklearn models to update; train or load them first")
+        if trainer.trained_parts is None:
+            raise HTTPException(status_code=409, detail="The models were not trained on the training store; run /train/real-models first")
+        if n_new_trees < 1:
+            raise HTTPException(status_code=422, detail="n_new_trees must be at least 1")
         
-        if training_df.empty:
-            return {"error": "No training data available"}
+        since = trainer.trained_at
+        trained_parts = trainer.trained_parts
+        all_parts = await asyncio.to_thread(real_training_store.part_names)
+        snapshot = store_snapshot([name for name in all_parts if name not in trained_parts])
         
-        print(f"Training models on {len(training_df)} real examples...")
+        new_df = pd.DataFrame()
+        if snapshot['parts']:
+            new_df = await asyncio.to_thread(real_training_store.read, training_columns(), parts=snapshot['parts'])
+        if new_df.empty:
+            return {"message": "No new training data since the models were trained", "trained_at": since}
         
-        # Train models
-        results = trainer.train_models(training_df)
+        history_df = None
+        if compare_full_retrain:
+            history_parts = [name for name in all_parts if name in trained_parts]
+            history_df = await asyncio.to_thread(real_training_store.read, training_columns(), parts=history_parts)
         
-        # Save models with 'real' prefix to distinguish from synthetic
-        saved_files = trainer.save_models('real_nba_models')
+        try:
+            job = training_jobs.submit_update(
+                trainer, new_df, n_new_trees=n_new_trees, history_df=history_df, save_prefix=MODEL_PREFIX,
+                data_snapshot=snapshot
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Update failed: {str(e)}")
         
         return {
-            "message": "Models trained successfully on real NBA data",
-            "training_examples": len(training_df),
-            "players_included": len(training_df['player_id'].unique()),
-            "model_performance": results,
-            "saved_models": saved_files,
-            "data_type": "real_game_logs"
+            "message": "Incremental update job started",
+            "job_id": job['job_id'],
+            "status_url": f"/train/jobs/{job['job_id']}",
+            "new_training_examples": len(new_df),
+            "new_since": since,
+            "new_parts": len(snapshot['parts']),
+            "n_new_trees": n_new_trees,
+            "compare_full_retrain": compare_full_retrain
         }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
+
+@app.get("/train/jobs")
+async def list_training_jobs():
+    return {"jobs": training_jobs.list()}
+
+@app.get("/train/jobs/{job_id}")
+async def training_job_status(job_id: str):
+    """Status and progress of a training job; metrics once it has completed"""
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Training job {job_id} not found")
+    return job
 
 # Add this endpoint to main.py to test predictions
 @app.post("/predict")
 async def make_prediction(features: dict):
     """Make predictions for a player"""
+    require_models()
     try:
-        if all(model is None for model in trainer.models.values()):
-            trainer.load_models('real_nba_models')
-        
-        predictions = trainer.predict(features)
+        predictions = await predict_single(features)
         performance = trainer.get_model_performance()
         
         return {
@@ -179,42 +571,49 @@ async def make_prediction(features: dict):
             "features_used": trainer.feature_columns
         }
         
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Prediction queue is full, retry shortly")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 @app.get("/players/predict/{player_id}")
 async def predict_for_player(player_id: int, home_game: bool = True, rest_days: int = 1):
     """Get predictions for a specific NBA player using their recent stats"""
+    require_models()
+    
+    # Season and recent averages come precomputed from the feature store
+    features = feature_store.get_features(player_id, home_game=home_game, rest_days=rest_days)
+    if features is None:
+        raise HTTPException(status_code=404, detail=f"No game logs stored for player {player_id}")
+    
     try:
-        # Load models
-        if all(model is None for model in trainer.models.values()):
-            trainer.load_models('real_nba_models')
+        predictions = await predict_single(features)
+        state = feature_store.get_state(player_id)
         
-        # You'd need to fetch this player's actual stats from your database
-        # For now, return a structured response
         return {
             "player_id": player_id,
-            "predictions": {
-                "points": 0,  # Will implement after connecting to your player database
-                "rebounds": 0,
-                "assists": 0
-            },
+            "predictions": predictions,
+            "features": features,
+            "games_played": state['games_played'],
+            "last_game_date": state['last_game_date'],
             "confidence": "Based on recent performance",
-            "last_updated": datetime.now()
+            "last_updated": feature_store.updated_at
         }
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Prediction queue is full, retry shortly")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/batch-predict")
-async def batch_predict(players_data: list):
+async def batch_predict(players_data: List[dict] = Body(...)):
     """Predict stats for multiple players at once"""
+    require_models()
     try:
-        if all(model is None for model in trainer.models.values()):
-            trainer.load_models('real_nba_models')
+        # Score the whole slate as one feature matrix instead of row by row, off the event loop
+        batch_predictions = await asyncio.to_thread(trainer.predict_batch, players_data)
         
         results = []
-        for player_features in players_data:
-            predictions = trainer.predict(player_features)
+        for player_features, predictions in zip(players_data, batch_predictions):
             results.append({
                 "player_id": player_features.get("player_id"),
                 "predictions": predictions
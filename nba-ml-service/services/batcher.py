@@ -0,0 +1,154 @@
+# services/batcher.py
+import asyncio
+import time
+
+
+class PredictionBatcher:
+    """Coalesces concurrent single-row predictions into batched model calls.
+
+    Requests are queued with a future each. A single worker task takes the
+    first waiting request, keeps collecting for up to `max_wait_ms` or until
+    `max_batch_size` rows are queued, scores them with one `predict_batch`
+    call in a thread and resolves every caller's future with its own row.
+    If the batch call fails, its rows are rescored one by one so only the
+    callers whose rows fail see an error.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=64, max_wait_ms=2.0, max_queue_depth=1024):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_depth = max_queue_depth
+
+        self._queue = None
+        self._worker = None
+
+        self.requests = 0
+        self.rejected = 0
+        self.batches = 0
+        self.rows_scored = 0
+        self.largest_batch = 0
+        self.batch_fallbacks = 0
+        self.peak_queue_depth = 0
+        self.total_wait_seconds = 0.0
+        self.total_predict_seconds = 0.0
+
+    @property
+    def running(self):
+        return self._worker is not None and not self._worker.done()
+
+    def start(self):
+        if not self.running:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        # Nothing will score what is still queued
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction batcher stopped"))
+
+    async def predict(self, features_dict):
+        """Queue one feature dict and wait for its predictions.
+
+        Raises asyncio.QueueFull when `max_queue_depth` requests are waiting.
+        """
+        if not self.running:
+            self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((features_dict, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+
+        self.requests += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            # Keep collecting until the window closes or the batch is full
+            while len(batch) < self.max_batch_size:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+
+            # Callers that gave up (client disconnects) don't need scoring
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+
+            dispatched_at = time.perf_counter()
+            self.total_wait_seconds += sum(dispatched_at - queued_at for _, _, queued_at in batch)
+
+            try:
+                predictions = await asyncio.to_thread(self.predict_batch, [features for features, _, _ in batch])
+            except Exception:
+                # One bad row must not fail its neighbours: score each row on its own
+                predictions = await asyncio.to_thread(self._predict_rows, [features for features, _, _ in batch])
+            finally:
+                self.total_predict_seconds += time.perf_counter() - dispatched_at
+
+            self.batches += 1
+            self.rows_scored += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+            for (_, future, _), row_predictions in zip(batch, predictions):
+                if future.done():
+                    continue
+                if isinstance(row_predictions, Exception):
+                    future.set_exception(row_predictions)
+                else:
+                    future.set_result(row_predictions)
+
+    def _predict_rows(self, features_list):
+        """Row-by-row fallback after a failed batch: predictions, or the row's own exception"""
+        self.batch_fallbacks += 1
+        results = []
+        for features in features_list:
+            try:
+                results.append(self.predict_batch([features])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def stats(self):
+        return {
+            'running': self.running,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'max_queue_depth': self.max_queue_depth,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'peak_queue_depth': self.peak_queue_depth,
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'avg_batch_size': round(self.rows_scored / self.batches, 2) if self.batches else 0.0,
+            'largest_batch': self.largest_batch,
+            'batch_fallbacks': self.batch_fallbacks,
+            'avg_wait_ms': round(1000 * self.total_wait_seconds / self.rows_scored, 3) if self.rows_scored else 0.0,
+            'avg_batch_predict_ms': round(1000 * self.total_predict_seconds / self.batches, 3) if self.batches else 0.0
+        }
@@ -0,0 +1,210 @@
+# services/collection.py
+import asyncio
+import os
+from datetime import timedelta
+
+import pandas as pd
+
+from services.feature_builder import build_tail_training_rows
+from services.game_log_store import KEY_COLUMNS
+
+
+class _TrainingRowWriter:
+    """Buffers training rows for a few players, then writes them as one store part.
+
+    With overwrite the CSV export is written to a temporary file that
+    finish() moves over the old one, so a failed crawl leaves it untouched.
+    """
+
+    def __init__(self, training_store, season, overwrite=False, flush_every=25, export_csv=None):
+        self.training_store = training_store
+        self.season = season
+        self.overwrite = overwrite
+        self.flush_every = flush_every
+        self.export_csv = export_csv
+        self._csv_path = f"{export_csv}.tmp" if export_csv and overwrite else export_csv
+
+        self.rows_written = 0
+        self._pending = []
+
+    async def add(self, training_df):
+        if not training_df.empty:
+            self._pending.append(training_df)
+        if len(self._pending) >= self.flush_every:
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return 0
+
+        training_df = pd.concat(self._pending, ignore_index=True)
+        self._pending = []
+
+        await asyncio.to_thread(self.training_store.write, training_df, self.season)
+        if self._csv_path:
+            first_write = self.overwrite and self.rows_written == 0
+            write_header = first_write or not os.path.exists(self._csv_path)
+            await asyncio.to_thread(
+                training_df.to_csv, self._csv_path, mode='w' if first_write else 'a',
+                index=False, header=write_header
+            )
+
+        self.rows_written += len(training_df)
+        return len(training_df)
+
+    async def finish(self):
+        await self.flush()
+        if self._csv_path != self.export_csv and os.path.exists(self._csv_path):
+            os.replace(self._csv_path, self.export_csv)
+
+
+async def stream_real_game_collection(collector, season, game_log_store, training_store, feature_store,
+                                      max_players=30, full_refresh=False, flush_every=25, export_csv=None):
+    """Crawl real game logs, storing each player's games as soon as they arrive.
+
+    Yields one progress event per player and a final 'completed' (or 'error')
+    event carrying the run summary. A full run rebuilds the game log store,
+    the season's training rows and the feature store; an incremental run only
+    asks for games after each player's last stored game. Nothing live
+    changes until the crawl has finished: a full run builds game logs,
+    training rows and features in staging stores that then replace the live
+    ones, and an incremental run stores the new games (and folds them into
+    the feature store) only after their training rows are written, so a
+    failed crawl fetches them again next time.
+    """
+    full = full_refresh or game_log_store.is_empty()
+    mode = 'full' if full else 'incremental'
+
+    players = await collector.get_active_players(season, max_players)
+    if not players:
+        yield {'event': 'error', 'mode': mode, 'detail': 'No active players found'}
+        return
+
+    date_from = {}
+    if not full:
+        for player_id, _ in players:
+            last_date = game_log_store.last_game_date(player_id)
+            if last_date is not None:
+                date_from[player_id] = last_date + timedelta(days=1)
+
+    yield {'event': 'started', 'mode': mode, 'season': season, 'players': len(players)}
+
+    rows_store = training_store
+    if full:
+        log_store = await asyncio.to_thread(game_log_store.staging)
+        rows_store = await asyncio.to_thread(training_store.staging)
+        features = feature_store.staging()
+
+    writer = _TrainingRowWriter(rows_store, season, overwrite=full, flush_every=flush_every, export_csv=export_csv)
+    stored_any = False
+    total_games = 0
+    players_with_games = []
+    new_games = []
+    completed = 0
+
+    async for player_id, player_name, game_logs in collector.iter_game_logs(players, season, date_from):
+        completed += 1
+        event = {
+            'event': 'player', 'player_id': int(player_id), 'player_name': player_name,
+            'games': len(game_logs), 'completed': completed, 'total': len(players)
+        }
+
+        if not game_logs.empty:
+            stored_any = True
+
+            if full:
+                stored = await asyncio.to_thread(log_store.append, game_logs)
+                features.update(stored)
+                await writer.add(collector.process_training_data(game_logs))
+            else:
+                stored = await asyncio.to_thread(game_log_store.new_games, game_logs)
+                if not stored.empty:
+                    new_games.append(stored)
+            event['new_games'] = len(stored)
+            total_games += len(stored)
+            if not stored.empty:
+                players_with_games.append(int(player_id))
+
+        event['training_rows_written'] = writer.rows_written
+        yield event
+
+    if full and not stored_any:
+        yield {'event': 'error', 'mode': mode, 'detail': 'No game logs collected'}
+        return
+
+    if not full and new_games:
+        # Tail rows need each affected player's stored history, read once at the end
+        new_games_df = pd.concat(new_games, ignore_index=True)
+        stored_history = await asyncio.to_thread(game_log_store.load, players_with_games)
+        history = pd.concat([stored_history, new_games_df], ignore_index=True).drop_duplicates(KEY_COLUMNS)
+        await writer.add(build_tail_training_rows(history, new_games_df))
+
+    await writer.finish()
+
+    if full:
+        await asyncio.to_thread(game_log_store.replace, log_store)
+        await asyncio.to_thread(training_store.replace_season, season, rows_store)
+        feature_store.replace(features)
+    elif new_games:
+        # Stopped before this point, the next refresh asks for these games (and writes their rows) again
+        await asyncio.to_thread(game_log_store.append, new_games_df)
+        feature_store.update(new_games_df)
+    await asyncio.to_thread(feature_store.save)
+
+    saved_to = [training_store.root] + ([export_csv] if export_csv else [])
+    if full:
+        summary = {
+            'message': 'Real game data collected successfully',
+            'total_games': total_games,
+            'training_examples': writer.rows_written,
+            'players_included': len(players_with_games)
+        }
+    else:
+        summary = {
+            'message': 'Real game data refreshed',
+            'new_games': total_games,
+            'new_training_examples': writer.rows_written,
+            'players_updated': len(players_with_games)
+        }
+
+    print(f"✅ {mode.capitalize()} collection stored {total_games} games, {writer.rows_written} training rows")
+    yield {'event': 'completed', 'mode': mode, **summary, 'saved_to': saved_to}
+
+
+async def stream_synthetic_collection(collector, training_store, export_csv=None):
+    """Build synthetic training rows season by season, writing each season's partition as it is done"""
+    total_examples = 0
+    seasons_written = []
+    features = []
+
+    yield {'event': 'started', 'seasons': list(collector.seasons)}
+
+    for season in collector.seasons:
+        season_df = await collector.get_season_player_stats(season)
+        training_df = collector.create_training_examples(season_df) if not season_df.empty else pd.DataFrame()
+
+        if not training_df.empty:
+            await asyncio.to_thread(training_store.write, training_df, season, True)
+            if export_csv:
+                await asyncio.to_thread(
+                    training_df.assign(season=season).to_csv, export_csv,
+                    mode='a' if seasons_written else 'w', index=False, header=not seasons_written
+                )
+            seasons_written.append(season)
+            total_examples += len(training_df)
+            features = list(training_df.columns) + ['season']
+
+        yield {'event': 'season', 'season': season, 'players': len(season_df), 'training_examples': len(training_df)}
+
+    if not seasons_written:
+        yield {'event': 'error', 'detail': 'No training data collected'}
+        return
+
+    yield {
+        'event': 'completed',
+        'message': 'Full dataset collection complete',
+        'total_examples': total_examples,
+        'seasons': seasons_written,
+        'features': features,
+        'saved_to': [training_store.root] + ([export_csv] if export_csv else [])
+    }
@@ -1,17 +1,27 @@
 # services/data_collector.py
-import requests
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import time
 import asyncio
+from services.feature_builder import build_training_rows
+from services.http_client import AsyncHTTPSession
+from services.rate_limiter import TokenBucketLimiter, RETRYABLE_STATUS_CODES, backoff_delay
+from services.response_cache import ResponseCache
+from services.metrics import UPSTREAM_REQUEST_SECONDS, UPSTREAM_RESPONSES_TOTAL
+from services.nba_decoder import loads, result_set, decode_result_set
+from services.synthetic_data import training_examples_from_season_stats
+import httpx
+
+DEFAULT_BASE_URL = "https://stats.nba.com/stats"
+
 
 class NBADataCollector:
-   def __init__(self):
-       # Working NBA API endpoints
-       self.base_url = "https://stats.nba.com/stats"
+   def __init__(self, requests_per_second=3.0, burst=5, max_concurrency=4, max_retries=4,
+                cache_dir='cache/nba_api', synthetic_seed=None, base_url=None, timeout=30.0):
+       # Working NBA API endpoints (or a stand-in such as benchmarks/fake_nba_api.py)
+       self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+       # httpx derives the Host header from base_url
        self.headers = {
-           'Host': 'stats.nba.com',
            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:72.0) Gecko/20100101 Firefox/72.0',
            'Accept': 'application/json, text/plain, */*',
            'Accept-Language': 'en-US,en;q=0.5',
@@ -25,6 +35,80 @@ class NBADataCollector:
        }
        
        self.seasons = ['2023-24', '2022-23', '2021-22']
+       
+       # One pooled keep-alive session shared by every request
+       self.session = AsyncHTTPSession(headers=self.headers, timeout=timeout)
+       
+       # Every upstream call takes a token, so concurrent crawls stay within the API limits
+       self.rate_limiter = TokenBucketLimiter(rate=requests_per_second, burst=burst)
+       self.max_concurrency = max_concurrency
+       self.max_retries = max_retries
+       
+       # Disk cache checked before any network call (None disables it); a stand-in
+       # server's responses are keyed apart from the real API's
+       namespace = None if self.base_url == DEFAULT_BASE_URL else self.base_url
+       self.cache = ResponseCache(cache_dir, namespace=namespace) if cache_dir else None
+       
+       # Synthetic training rows are reproducible when a seed is given
+       self.synthetic_rng = np.random.default_rng(synthetic_seed)
+   
+   async def start(self):
+       """Open the shared HTTP session (called once at app startup)"""
+       await self.session.start()
+   
+   async def close(self):
+       """Close the shared HTTP session (called once at app shutdown)"""
+       await self.session.close()
+   
+   async def _get(self, url, params):
+       """Cached, rate-limited GET with jittered retries on 429/5xx and timeouts"""
+       endpoint = url.rstrip('/').rsplit('/', 1)[-1]
+       
+       if self.cache is not None:
+           cached_body = self.cache.get(endpoint, params)
+           if cached_body is not None:
+               return httpx.Response(200, content=cached_body, request=httpx.Request('GET', url, params=params))
+       
+       response = await self._fetch(url, params)
+       
+       if self.cache is not None and response.status_code == 200:
+           self.cache.put(endpoint, params, response.content)
+       
+       return response
+   
+   async def _fetch(self, url, params):
+       """Rate-limited network GET with jittered retries on 429/5xx and timeouts"""
+       endpoint = url.rstrip('/').rsplit('/', 1)[-1]
+       
+       for attempt in range(self.max_retries + 1):
+           await self.rate_limiter.acquire()
+           
+           started = time.perf_counter()
+           try:
+               response = await self.session.get(url, params=params)
+           except httpx.TransportError as e:
+               UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+               UPSTREAM_RESPONSES_TOTAL.inc(endpoint=endpoint, status='error')
+               if attempt == self.max_retries:
+                   raise
+               delay = backoff_delay(attempt)
+               print(f"Request to {url} failed ({type(e).__name__}), retrying in {delay:.1f}s")
+           else:
+               UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+               UPSTREAM_RESPONSES_TOTAL.inc(endpoint=endpoint, status=response.status_code)
+               
+               if response.status_code not in RETRYABLE_STATUS_CODES:
+                   self.rate_limiter.reward()
+                   return response
+               
+               # Throttled or upstream trouble: slow the whole crawl down, then retry
+               self.rate_limiter.penalize()
+               if attempt == self.max_retries:
+                   return response
+               delay = backoff_delay(attempt, retry_after=response.headers.get('Retry-After'))
+               print(f"Got {response.status_code} from {url}, retrying in {delay:.1f}s")
+           
+           await asyncio.sleep(delay)
    
    async def test_nba_connection(self):
        """Test NBA API connection with working endpoint"""
@@ -38,21 +122,16 @@ class NBADataCollector:
        
        try:
            print("Testing NBA API connection...")
-           response = requests.get(url, headers=self.headers, params=params, timeout=30)
+           response = await self._get(url, params)
            
            if response.status_code == 200:
-               data = response.json()
+               data = loads(response.content)
                print("NBA API is working!")
                
-               # Handle different response formats
-               if 'resultSets' in data:
-                   rows = data['resultSets'][0]['rowSet']
-                   headers = data['resultSets'][0]['headers']
-               elif 'resultSet' in data:
-                   rows = data['resultSet']['rowSet']
-                   headers = data['resultSet']['headers']
-               else:
+               extracted = result_set(data)
+               if extracted is None:
                    return {"success": False, "error": "Unknown response format", "keys": list(data.keys())}
+               headers, rows = extracted
                
                return {
                    "success": True,
@@ -78,16 +157,10 @@ class NBADataCollector:
        
        try:
            print("Testing simple endpoint...")
-           response = requests.get(url, headers=self.headers, params=params, timeout=30)
+           response = await self._get(url, params)
            
            if response.status_code == 200:
-               data = response.json()
-               
-               # Handle different response formats
-               if 'resultSets' in data:
-                   rows = data['resultSets'][0]['rowSet']
-               else:
-                   rows = data['resultSet']['rowSet']
+               _, rows = result_set(loads(response.content))
                    
                return {
                    "success": True,
@@ -120,23 +193,16 @@ class NBADataCollector:
        
        try:
            # Get players list
-           players_response = requests.get(players_url, headers=self.headers, params=players_params, timeout=30)
+           players_response = await self._get(players_url, players_params)
            
            if players_response.status_code != 200:
                print(f"Failed to get players: {players_response.status_code}")
                return pd.DataFrame()
                
-           players_data = players_response.json()
-           
-           # Handle response format
-           if 'resultSets' in players_data:
-               player_rows = players_data['resultSets'][0]['rowSet']
-               player_headers = players_data['resultSets'][0]['headers']
-           else:
-               player_rows = players_data['resultSet']['rowSet']
-               player_headers = players_data['resultSet']['headers']
-           
-           players_df = pd.DataFrame(player_rows, columns=player_headers)
+           players_df = decode_result_set(players_response.content, 'commonallplayers')
+           if players_df is None:
+               print("Unknown response format for players")
+               return pd.DataFrame()
            print(f"Found {len(players_df)} players")
            
            # Now get season stats for these players
@@ -180,22 +246,13 @@ class NBADataCollector:
                'Weight': ''
            }
            
-           await asyncio.sleep(1)  # Rate limiting
-           
-           stats_response = requests.get(stats_url, headers=self.headers, params=stats_params, timeout=30)
+           stats_response = await self._get(stats_url, stats_params)
            
            if stats_response.status_code == 200:
-               stats_data = stats_response.json()
-               
-               # Handle response format for stats
-               if 'resultSets' in stats_data:
-                   stats_rows = stats_data['resultSets'][0]['rowSet']
-                   stats_headers = stats_data['resultSets'][0]['headers']
-               else:
-                   stats_rows = stats_data['resultSet']['rowSet'] 
-                   stats_headers = stats_data['resultSet']['headers']
-               
-               stats_df = pd.DataFrame(stats_rows, columns=stats_headers)
+               stats_df = decode_result_set(stats_response.content, 'leaguedashplayerstats')
+               if stats_df is None:
+                   print("Unknown response format for stats")
+                   return pd.DataFrame()
                print(f"Got stats for {len(stats_df)} players in {season}")
                return stats_df
            else:
@@ -206,8 +263,8 @@ class NBADataCollector:
            print(f"Error getting season stats: {e}")
            return pd.DataFrame()
    
-   async def get_player_game_logs(self, player_id, season):
-       """Get actual game-by-game stats for a specific player"""
+   async def get_player_game_logs(self, player_id, season, date_from=None):
+       """Get actual game-by-game stats for a specific player (optionally only games on/after date_from)"""
        url = f"{self.base_url}/playergamelog"
        
        params = {
@@ -217,24 +274,16 @@ class NBADataCollector:
            'LeagueID': '00'
        }
        
+       if date_from is not None:
+           params['DateFrom'] = date_from.strftime('%m/%d/%Y')
+       
        try:
-           response = requests.get(url, headers=self.headers, params=params, timeout=30)
+           response = await self._get(url, params)
            
            if response.status_code == 200:
-               data = response.json()
-               
-               # Handle response format (like we learned from debugging)
-               if 'resultSets' in data:
-                   headers = data['resultSets'][0]['headers']
-                   rows = data['resultSets'][0]['rowSet']
-               elif 'resultSet' in data:
-                   headers = data['resultSet']['headers']
-                   rows = data['resultSet']['rowSet']
-               else:
-                   return pd.DataFrame()
-               
-               df = pd.DataFrame(rows, columns=headers)
-               return df
+               # Typed columns: int stats, datetime64 GAME_DATE
+               df = decode_result_set(response.content, 'playergamelog')
+               return df if df is not None else pd.DataFrame()
            else:
                print(f"Failed to get game logs for player {player_id}: {response.status_code}")
                return pd.DataFrame()
@@ -243,42 +292,78 @@ class NBADataCollector:
            print(f"Error getting game logs: {e}")
            return pd.DataFrame()
    
+   async def crawl_game_logs(self, players, season, date_from=None):
+       """Fetch game logs for many (player_id, player_name) pairs concurrently.
+       
+       At most `max_concurrency` requests are in flight; pacing and retries
+       come from the shared token bucket in `_get`. `date_from` optionally maps
+       player_id -> first game date to request.
+       """
+       return [result async for result in self.iter_game_logs(players, season, date_from, ordered=True)]
+   
+   async def iter_game_logs(self, players, season, date_from=None, ordered=False):
+       """Like crawl_game_logs, but yields (player_id, player_name, game_logs) as each player finishes.
+       
+       Callers can store each player's logs right away instead of holding the
+       whole crawl in memory; with ordered=True results keep the input order.
+       """
+       slots = asyncio.Semaphore(self.max_concurrency)
+       date_from = date_from or {}
+       
+       async def fetch(player_id, player_name):
+           async with slots:
+               game_logs = await self.get_player_game_logs(player_id, season, date_from.get(player_id))
+           if not game_logs.empty:
+               game_logs['PLAYER_ID'] = player_id
+           return player_id, player_name, game_logs
+       
+       print(f"Crawling game logs for {len(players)} players ({self.max_concurrency} at a time)...")
+       tasks = [asyncio.ensure_future(fetch(player_id, player_name)) for player_id, player_name in players]
+       
+       try:
+           for next_result in (tasks if ordered else asyncio.as_completed(tasks)):
+               yield await next_result
+       finally:
+           # A consumer that stops early must not leave requests running
+           for task in tasks:
+               task.cancel()
+   
+   async def get_active_players(self, season, max_players=50):
+       """(player_id, player_name) pairs for rotation players with significant stats"""
+       season_df = await self.get_season_player_stats(season)
+       
+       if season_df.empty:
+           return []
+       
+       # Filter to active players with significant stats
+       active_players = season_df[
+           (season_df['GP'] > 20) & 
+           (season_df['PTS'] > 10)
+       ].head(max_players)
+       
+       return [
+           (player['PLAYER_ID'], player.get('PLAYER_NAME', 'Unknown'))
+           for _, player in active_players.iterrows()
+       ]
+   
    async def collect_real_game_data(self, season, max_players=50):
     """Collect real game logs for top players"""
     print(f"Collecting real game data for {season}...")
     
     # First get player list
-    season_df = await self.get_season_player_stats(season)
+    players = await self.get_active_players(season, max_players)
     
-    if season_df.empty:
+    if not players:
         return pd.DataFrame()
     
-    # Filter to active players with significant stats
-    active_players = season_df[
-        (season_df['GP'] > 20) & 
-        (season_df['PTS'] > 10)
-    ].head(max_players)
-    
     all_game_logs = []
     
-    for _, player in active_players.iterrows():
-        player_id = player['PLAYER_ID']
-        player_name = player.get('PLAYER_NAME', 'Unknown')
-        print(f"Getting games for {player_name} (ID: {player_id})...")
-        
-        # Get game logs for the player
-        game_logs = await self.get_player_game_logs(player_id, season)
-        
+    for player_id, player_name, game_logs in await self.crawl_game_logs(players, season):
         if not game_logs.empty:
-            # FIX: Add the PLAYER_ID to the game_logs DataFrame
-            game_logs['PLAYER_ID'] = player_id
             all_game_logs.append(game_logs)
-            print(f"  Found {len(game_logs)} games")
+            print(f"  {player_name} (ID: {player_id}): {len(game_logs)} games")
         else:
-            print(f"  No games found")
-        
-        # Rate limiting - crucial for API stability
-        await asyncio.sleep(1.5)
+            print(f"  {player_name} (ID: {player_id}): no games found")
     
     if all_game_logs:
         combined_df = pd.concat(all_game_logs, ignore_index=True)
@@ -289,124 +374,16 @@ class NBADataCollector:
    
    def process_training_data(self, season_df):
        """Convert real game logs into ML training format"""
-       training_data = []
-       
-       for player_id in season_df['PLAYER_ID'].unique():
-           player_games = season_df[season_df['PLAYER_ID'] == player_id].copy()
-           
-           # Sort by date to ensure chronological order
-           if 'GAME_DATE' in player_games.columns:
-               player_games = player_games.sort_values('GAME_DATE')
-           
-           if len(player_games) < 10:
-               continue
-           
-           for i in range(10, len(player_games)):
-               current_game = player_games.iloc[i]
-               prev_games = player_games.iloc[:i]
-               last_5 = player_games.iloc[i-5:i]
-               last_10 = player_games.iloc[i-10:i]
-               
-               # Calculate rest days if possible
-               rest_days = 1
-               if 'GAME_DATE' in player_games.columns and i > 0:
-                   try:
-                       current_date = pd.to_datetime(current_game['GAME_DATE'])
-                       prev_date = pd.to_datetime(player_games.iloc[i-1]['GAME_DATE'])
-                       rest_days = (current_date - prev_date).days - 1
-                       rest_days = max(0, min(rest_days, 7))  # Cap at 7 days
-                   except:
-                       rest_days = 1
-               
-               features = {
-                   'player_id': player_id,
-                   'season_avg_points': prev_games['PTS'].mean(),
-                   'season_avg_rebounds': prev_games['REB'].mean(),
-                   'season_avg_assists': prev_games['AST'].mean(),
-                   'last_10_avg_points': last_10['PTS'].mean(),
-                   'last_5_avg_points': last_5['PTS'].mean(),
-                   'last_5_avg_rebounds': last_5['REB'].mean(),
-                   'last_5_avg_assists': last_5['AST'].mean(),
-                   'home_vs_away': 1 if '@' not in str(current_game.get('MATCHUP', '')) else 0,
-                   'games_played': len(prev_games),
-                   'rest_days': rest_days,
-                   'actual_points': current_game['PTS'],
-                   'actual_rebounds': current_game['REB'],
-                   'actual_assists': current_game['AST']
-               }
-               
-               training_data.append(features)
-       
-       return pd.DataFrame(training_data)
+       return build_training_rows(season_df)
    
    def create_training_examples(self, player_stats_df):
        """Create synthetic training examples from season averages (fallback method)"""
        if player_stats_df.empty:
            return pd.DataFrame()
-           
-       training_data = []
-       
-       # Filter to players who actually played significant minutes
-       active_players = player_stats_df[player_stats_df['GP'] > 10].copy()  # At least 10 games
        
-       print(f"Creating synthetic training examples for {len(active_players)} active players...")
-       
-       for _, player in active_players.iterrows():
-           try:
-               player_id = player['PLAYER_ID']
-               
-               # Get stats safely
-               season_avg_pts = float(player['PTS']) if pd.notna(player['PTS']) else 0
-               season_avg_reb = float(player['REB']) if pd.notna(player['REB']) else 0
-               season_avg_ast = float(player['AST']) if pd.notna(player['AST']) else 0
-               games_played = int(player['GP']) if pd.notna(player['GP']) else 0
-               
-               # Skip players with very low stats (bench warmers)
-               if season_avg_pts < 5 and season_avg_reb < 3 and season_avg_ast < 2:
-                   continue
-               
-               # Create multiple training examples per player (simulate different game situations)
-               num_examples = min(games_played - 10, 40)  # Up to 40 examples per player
-               
-               for game_num in range(10, 10 + num_examples):
-                   # Simulate performance variation based on recent form
-                   form_variation = np.random.normal(0, 0.15)  # 15% variation
-                   
-                   last_5_pts = max(0, season_avg_pts * (1 + form_variation))
-                   last_10_pts = max(0, season_avg_pts * (1 + form_variation * 0.7))
-                   
-                   last_5_reb = max(0, season_avg_reb * (1 + form_variation))
-                   last_5_ast = max(0, season_avg_ast * (1 + form_variation))
-                   
-                   # Actual game performance with realistic variance
-                   game_variation = np.random.normal(0, 0.25)  # 25% game-to-game variation
-                   
-                   actual_pts = max(0, season_avg_pts * (1 + game_variation))
-                   actual_reb = max(0, season_avg_reb * (1 + game_variation))
-                   actual_ast = max(0, season_avg_ast * (1 + game_variation))
-                   
-                   training_data.append({
-                       'player_id': int(player_id),
-                       'season_avg_points': round(season_avg_pts, 1),
-                       'season_avg_rebounds': round(season_avg_reb, 1),
-                       'season_avg_assists': round(season_avg_ast, 1),
-                       'last_10_avg_points': round(last_10_pts, 1),
-                       'last_5_avg_points': round(last_5_pts, 1),
-                       'last_5_avg_rebounds': round(last_5_reb, 1),
-                       'last_5_avg_assists': round(last_5_ast, 1),
-                       'home_vs_away': np.random.choice([0, 1]),
-                       'games_played': game_num,
-                       'rest_days': np.random.choice([0, 1, 1, 2, 3], p=[0.1, 0.4, 0.3, 0.15, 0.05]),
-                       'actual_points': round(actual_pts, 1),
-                       'actual_rebounds': round(actual_reb, 1),
-                       'actual_assists': round(actual_ast, 1)
-                   })
-                   
-           except Exception as e:
-               print(f"Error processing player: {e}")
-               continue
+       print(f"Creating synthetic training examples for {int((player_stats_df['GP'] > 10).sum())} active players...")
        
-       df = pd.DataFrame(training_data)
+       df = training_examples_from_season_stats(player_stats_df, self.synthetic_rng)
        print(f"Created {len(df)} synthetic training examples")
        return df
    
@@ -421,15 +398,13 @@ class NBADataCollector:
            if not season_df.empty:
                training_df = self.create_training_examples(season_df)
                if not training_df.empty:
+                   training_df['season'] = season
                    all_training_data.append(training_df)
                    print(f"{season}: {len(training_df)} training examples")
                else:
                    print(f"{season}: No training examples created")
            else:
                print(f"{season}: No data collected")
-           
-           # Rate limiting between seasons
-           await asyncio.sleep(2)
        
        if all_training_data:
            final_df = pd.concat(all_training_data, ignore_index=True)
@@ -0,0 +1,200 @@
+# services/feature_builder.py
+import pandas as pd
+import numpy as np
+
+# Columns produced for every training row, in the order of real_nba_training_data.csv
+TRAINING_COLUMNS = [
+    'player_id',
+    'season_avg_points', 'season_avg_rebounds', 'season_avg_assists',
+    'last_10_avg_points', 'last_5_avg_points',
+    'last_5_avg_rebounds', 'last_5_avg_assists',
+    'home_vs_away', 'games_played', 'rest_days',
+    'actual_points', 'actual_rebounds', 'actual_assists'
+]
+
+# A player needs this many earlier games before a game becomes a training row
+MIN_PRIOR_GAMES = 10
+
+# Longest rolling window any feature uses (last_10_avg_points)
+LONGEST_WINDOW = 10
+
+# Features of a player's next game that depend only on the games before it
+FORM_FEATURES = [
+    'season_avg_points', 'season_avg_rebounds', 'season_avg_assists',
+    'last_10_avg_points', 'last_5_avg_points',
+    'last_5_avg_rebounds', 'last_5_avg_assists', 'games_played'
+]
+
+
+# stats.nba.com sends GAME_DATE as e.g. 'APR 14, 2024'
+NBA_DATE_FORMAT = '%b %d, %Y'
+
+
+def parse_game_dates(dates):
+    """Parse a GAME_DATE column, accepting the API format as well as ISO dates"""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates
+
+    parsed = pd.to_datetime(dates, format=NBA_DATE_FORMAT, errors='coerce')
+    # Stored logs decoded to datetime64 are written back as ISO dates
+    for fallback_format in ('ISO8601', 'mixed'):
+        unparsed = parsed.isna() & dates.notna()
+        if not unparsed.any():
+            break
+        parsed[unparsed] = pd.to_datetime(dates[unparsed], format=fallback_format, errors='coerce')
+    return parsed
+
+
+def sort_game_logs(game_logs_df):
+    """Order game logs by player (first appearance) and then chronologically.
+
+    GAME_DATE is parsed exactly once here and kept in a GAME_DATE_PARSED column.
+    """
+    games = game_logs_df.reset_index(drop=True)
+
+    # Keep players in the order they first appear, like iterating .unique()
+    player_order = pd.Series(pd.factorize(games['PLAYER_ID'])[0], index=games.index)
+
+    if 'GAME_DATE' in games.columns:
+        parsed_dates = parse_game_dates(games['GAME_DATE'])
+        games = games.assign(GAME_DATE_PARSED=parsed_dates)
+        order = pd.DataFrame({'player': player_order, 'date': parsed_dates})
+        sorted_index = order.sort_values(['player', 'date'], kind='mergesort').index
+    else:
+        sorted_index = player_order.sort_values(kind='mergesort').index
+
+    return games.loc[sorted_index].reset_index(drop=True)
+
+
+def _compute_features(games, carried=None):
+    """Features for every row of chronologically sorted game logs.
+
+    When `games` is only the tail of each player's history, `carried`
+    (indexed by PLAYER_ID, columns games/PTS/REB/AST) holds the count and
+    totals of the games before it.
+    """
+    players = games['PLAYER_ID']
+    grouped = games.groupby(players, sort=False)
+
+    def carried_over(column):
+        if carried is None:
+            return 0
+        return players.map(carried[column]).fillna(0)
+
+    # Number of earlier games for each row
+    prior_games = grouped.cumcount() + carried_over('games')
+
+    features = pd.DataFrame({'player_id': players})
+
+    # prior_totals[i] = sum of the stat over all games before i (shifted expanding sum)
+    prior_totals = {
+        stat: grouped[stat].cumsum() - games[stat] + carried_over(stat)
+        for stat in ('PTS', 'REB', 'AST')
+    }
+
+    def rolling_prior_mean(stat, window):
+        # Sum of the previous `window` games is the difference of two shifted totals;
+        # with fewer earlier games than that it averages all of them (only served rows need it)
+        totals = prior_totals[stat]
+        window_start = totals.groupby(players, sort=False).shift(window)
+        window_start = window_start.fillna(0).where(window_start.notna() | (prior_games <= window))
+        return (totals - window_start) / prior_games.clip(upper=window)
+
+    features['season_avg_points'] = prior_totals['PTS'] / prior_games
+    features['season_avg_rebounds'] = prior_totals['REB'] / prior_games
+    features['season_avg_assists'] = prior_totals['AST'] / prior_games
+    features['last_10_avg_points'] = rolling_prior_mean('PTS', 10)
+    features['last_5_avg_points'] = rolling_prior_mean('PTS', 5)
+    features['last_5_avg_rebounds'] = rolling_prior_mean('REB', 5)
+    features['last_5_avg_assists'] = rolling_prior_mean('AST', 5)
+
+    if 'MATCHUP' in games.columns:
+        away = games['MATCHUP'].astype(str).str.contains('@', regex=False)
+        features['home_vs_away'] = (~away).astype(np.int64)
+    else:
+        features['home_vs_away'] = 1
+
+    features['games_played'] = prior_games.astype(np.int64)
+
+    # Rest days between consecutive games, capped at 7; unknown dates default to 1
+    if 'GAME_DATE_PARSED' in games.columns:
+        dates = games['GAME_DATE_PARSED']
+        gap_days = (dates - dates.groupby(players, sort=False).shift(1)).dt.days - 1
+        features['rest_days'] = gap_days.clip(0, 7).fillna(1).astype(np.int64)
+    else:
+        features['rest_days'] = 1
+
+    features['actual_points'] = games['PTS']
+    features['actual_rebounds'] = games['REB']
+    features['actual_assists'] = games['AST']
+
+    return features, prior_games
+
+
+def build_training_rows(game_logs_df):
+    """Turn raw game logs into ML training rows in one vectorized pass.
+
+    Every game after a player's first ten becomes a row whose features only use
+    the games before it: expanding season averages, 5/10 game rolling averages,
+    home/away and rest days. Running sums per player replace re-slicing the
+    history for every game, so the cost is linear in the number of games.
+    """
+    if game_logs_df.empty:
+        return pd.DataFrame()
+
+    games = sort_game_logs(game_logs_df)
+    features, prior_games = _compute_features(games)
+
+    training_df = features[prior_games >= MIN_PRIOR_GAMES].reset_index(drop=True)
+
+    if training_df.empty:
+        return pd.DataFrame()
+
+    return training_df[TRAINING_COLUMNS]
+
+
+def build_tail_training_rows(history_df, new_games_df):
+    """Training rows for just the newly ingested games.
+
+    `history_df` must hold the stored game logs of the affected players
+    (including the new games); only rows for games in `new_games_df` are
+    returned, matched on (PLAYER_ID, Game_ID).
+    """
+    if history_df.empty or new_games_df.empty:
+        return pd.DataFrame()
+
+    games = sort_game_logs(history_df)
+    features, prior_games = _compute_features(games)
+
+    new_keys = pd.MultiIndex.from_arrays([
+        new_games_df['PLAYER_ID'].astype(np.int64), new_games_df['Game_ID'].astype(str)
+    ])
+    game_keys = pd.MultiIndex.from_arrays([
+        games['PLAYER_ID'].astype(np.int64), games['Game_ID'].astype(str)
+    ])
+    is_new_game = game_keys.isin(new_keys)
+
+    training_df = features[(prior_games >= MIN_PRIOR_GAMES) & is_new_game].reset_index(drop=True)
+
+    if training_df.empty:
+        return pd.DataFrame()
+
+    return training_df[TRAINING_COLUMNS]
+
+
+def next_game_features(recent_games, carried=None):
+    """FORM_FEATURES of each player's next game, as a frame indexed by PLAYER_ID.
+
+    `recent_games` holds each player's last LONGEST_WINDOW games in order
+    (PLAYER_ID, PTS, REB, AST) and `carried` the count and totals of the
+    games before those, as in _compute_features. A blank game is appended
+    per player and featurized like any training row, so served features use
+    exactly the training formulas.
+    """
+    games = recent_games[['PLAYER_ID', 'PTS', 'REB', 'AST']]
+    players = games['PLAYER_ID'].drop_duplicates()
+    next_games = pd.DataFrame({'PLAYER_ID': players, 'PTS': 0, 'REB': 0, 'AST': 0})
+
+    features, _ = _compute_features(pd.concat([games, next_games], ignore_index=True), carried)
+    next_features = features.iloc[len(games):]
+    return next_features.set_index('player_id')[FORM_FEATURES]
@@ -0,0 +1,160 @@
+# services/feature_store.py
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from services.feature_builder import LONGEST_WINDOW, next_game_features, sort_game_logs
+
+# Enough of each player's latest games for every rolling window
+RECENT_GAMES_KEPT = LONGEST_WINDOW
+
+
+class PlayerFeatureStore:
+    """In-memory per-player form, ready to turn into next-game features in O(1).
+
+    For every player it keeps the running game count and PTS/REB/AST totals,
+    the last ten games and the last game date: exactly the state
+    build_training_rows derives a row's features from. New games are folded
+    in incrementally, and the affected players' next-game features are
+    recomputed with feature_builder.next_game_features, so they match the
+    training rows. The whole store snapshots to a JSON file for fast
+    restarts.
+    """
+
+    def __init__(self, snapshot_path='data/feature_store.json'):
+        self.snapshot_path = snapshot_path
+        self.updated_at = None
+        self._players = {}
+
+    def __len__(self):
+        return len(self._players)
+
+    def __contains__(self, player_id):
+        return int(player_id) in self._players
+
+    def rebuild(self, game_logs_df):
+        """Replace the store with state computed from complete game logs"""
+        self._players = {}
+        self.update(game_logs_df)
+
+    def staging(self):
+        """An empty in-memory store for a full rebuild; swap it in with replace()"""
+        return PlayerFeatureStore(f"{self.snapshot_path}.rebuild")
+
+    def replace(self, rebuilt):
+        """Serve a fully built store's players (from staging()) instead of this one's"""
+        self._players = rebuilt._players
+        self.updated_at = rebuilt.updated_at
+
+    def update(self, new_games_df, replace=False):
+        """Fold newly ingested games into each player's running state.
+
+        With replace=True the frame holds the players' complete logs and any
+        state already stored for them is discarded first.
+        """
+        if new_games_df.empty:
+            return 0
+
+        games = sort_game_logs(new_games_df)
+        if replace:
+            for player_id in games['PLAYER_ID'].astype(int).unique():
+                self._players.pop(int(player_id), None)
+        has_dates = 'GAME_DATE_PARSED' in games.columns
+
+        # Chronological per player, so a plain append keeps the windows right
+        for player_id, pts, reb, ast, game_date in zip(
+            games['PLAYER_ID'].astype(int),
+            games['PTS'].tolist(),
+            games['REB'].tolist(),
+            games['AST'].tolist(),
+            games['GAME_DATE_PARSED'] if has_dates else [None] * len(games)
+        ):
+            state = self._players.setdefault(player_id, {
+                'games_played': 0,
+                'totals': [0.0, 0.0, 0.0],
+                'recent': [],
+                'last_game_date': None
+            })
+
+            state['games_played'] += 1
+            state['totals'] = [state['totals'][0] + pts, state['totals'][1] + reb, state['totals'][2] + ast]
+            state['recent'] = (state['recent'] + [[pts, reb, ast]])[-RECENT_GAMES_KEPT:]
+            if game_date is not None and not pd.isna(game_date):
+                state['last_game_date'] = game_date.date().isoformat()
+
+        self._refresh_features(games['PLAYER_ID'].astype(int).unique())
+        self.updated_at = datetime.now()
+        return len(games)
+
+    def _refresh_features(self, player_ids):
+        """Recompute the cached next-game features of some players from their state"""
+        recent_rows = []
+        carried = {}
+        for player_id in player_ids:
+            state = self._players[int(player_id)]
+            recent_rows += [(int(player_id), *game) for game in state['recent']]
+            recent_totals = [sum(game[i] for game in state['recent']) for i in range(3)]
+            carried[int(player_id)] = [
+                state['games_played'] - len(state['recent']),
+                *(total - recent for total, recent in zip(state['totals'], recent_totals))
+            ]
+
+        if not recent_rows:
+            return
+
+        features = next_game_features(
+            pd.DataFrame(recent_rows, columns=['PLAYER_ID', 'PTS', 'REB', 'AST']),
+            pd.DataFrame.from_dict(carried, orient='index', columns=['games', 'PTS', 'REB', 'AST'])
+        )
+        for player_id, player_features in zip(features.index, features.to_dict('records')):
+            self._players[int(player_id)]['features'] = player_features
+
+    def get_state(self, player_id):
+        return self._players.get(int(player_id))
+
+    def get_features(self, player_id, home_game=True, rest_days=1):
+        """Feature dict for the player's next game, or None for an unknown player"""
+        state = self._players.get(int(player_id))
+        if state is None or state['games_played'] == 0:
+            return None
+
+        return {
+            **state['features'],
+            'home_vs_away': 1 if home_game else 0,
+            'rest_days': max(0, min(rest_days, 7))  # Capped at 7 like the training rows
+        }
+
+    def save(self):
+        """Snapshot every player's state to disk"""
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        snapshot = {
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'players': {str(player_id): state for player_id, state in self._players.items()}
+        }
+
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+        return self.snapshot_path
+
+    def load(self):
+        """Restore the last snapshot; False if there is none"""
+        if not os.path.exists(self.snapshot_path):
+            return False
+
+        with open(self.snapshot_path) as f:
+            snapshot = json.load(f)
+
+        self._players = {int(player_id): state for player_id, state in snapshot['players'].items()}
+        # Snapshots written before features were cached with the state
+        self._refresh_features([player_id for player_id, state in self._players.items() if 'features' not in state])
+        self.updated_at = datetime.fromisoformat(snapshot['updated_at']) if snapshot['updated_at'] else None
+        print(f"✅ Loaded feature store snapshot ({len(self._players)} players)")
+        return True
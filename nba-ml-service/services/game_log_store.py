@@ -0,0 +1,161 @@
+# services/game_log_store.py
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from services.feature_builder import parse_game_dates
+
+KEY_COLUMNS = ['PLAYER_ID', 'Game_ID']
+
+
+class GameLogStore:
+    """Append-only store of raw player game logs, one CSV file per player.
+
+    state.json indexes each player's last GAME_DATE and game count, so a
+    refresh can ask stats.nba.com only for games after that date and decide
+    what is new without reading stored logs. Reads open just the requested
+    players' files, so a refresh costs what the players it touches have
+    stored, not the whole history.
+    """
+
+    def __init__(self, root='data/game_logs'):
+        self.root = root
+        self.players_dir = os.path.join(root, 'players')
+        self.state_path = os.path.join(root, 'state.json')
+        # Single-file layout from before per-player files; split up on first use
+        self.legacy_logs_path = os.path.join(root, 'game_logs.csv')
+
+        self._players = None  # player_id -> {'last_date', 'games'}
+
+    def _player_path(self, player_id):
+        return os.path.join(self.players_dir, f"{int(player_id)}.csv")
+
+    def _load_state(self):
+        if self._players is not None:
+            return
+
+        # Stopped between replace()'s two renames: put the previous store back
+        old_root = f"{self.root.rstrip(os.sep)}.old"
+        if not os.path.isdir(self.root) and os.path.isdir(old_root):
+            os.replace(old_root, self.root)
+
+        self._players = {}
+        if os.path.exists(self.legacy_logs_path):
+            self._migrate_legacy()
+        elif os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                self._players = {int(k): v for k, v in json.load(f).items()}
+
+    def _migrate_legacy(self):
+        # Rebuilt from scratch each time, so a crash halfway just redoes it
+        if os.path.isdir(self.players_dir):
+            shutil.rmtree(self.players_dir)
+        legacy_df = pd.read_csv(self.legacy_logs_path, dtype={'Game_ID': str})
+        self._write_games(legacy_df.drop_duplicates(KEY_COLUMNS))
+        os.remove(self.legacy_logs_path)
+
+    def _save_state(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({str(k): v for k, v in self._players.items()}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def is_empty(self):
+        self._load_state()
+        return not self._players
+
+    def last_game_date(self, player_id):
+        """Most recent GAME_DATE stored for a player, or None"""
+        self._load_state()
+        last_date = self._players.get(int(player_id), {}).get('last_date')
+        return pd.Timestamp(last_date) if last_date else None
+
+    def new_games(self, game_logs_df):
+        """The games newer than each player's last stored game, without storing them"""
+        self._load_state()
+
+        if game_logs_df.empty:
+            return game_logs_df
+
+        games = game_logs_df.copy()
+        games['Game_ID'] = games['Game_ID'].astype(str)
+        games = games[~games.duplicated(KEY_COLUMNS)]
+
+        # A player plays at most once a day, so the stored last date tells new games apart
+        player_ids = games['PLAYER_ID'].astype(int)
+        last_dates = pd.to_datetime(player_ids.map(
+            {player_id: entry['last_date'] for player_id, entry in self._players.items()}
+        ))
+        game_dates = parse_game_dates(games['GAME_DATE'])
+        return games[last_dates.isna() | (game_dates > last_dates)]
+
+    def append(self, game_logs_df):
+        """Append games newer than each player's last stored game and return just those rows"""
+        new_games = self.new_games(game_logs_df)
+
+        if new_games.empty:
+            return new_games
+
+        self._write_games(new_games)
+        return new_games
+
+    def _write_games(self, games):
+        os.makedirs(self.players_dir, exist_ok=True)
+        game_dates = parse_game_dates(games['GAME_DATE'])
+
+        for player_id, player_games in games.groupby(games['PLAYER_ID'].astype(int)):
+            path = self._player_path(player_id)
+            if os.path.exists(path):
+                # Keep the column layout of the existing file
+                columns = pd.read_csv(path, nrows=0).columns
+                player_games.reindex(columns=columns).to_csv(path, mode='a', header=False, index=False)
+            else:
+                player_games.to_csv(path, index=False)
+
+            entry = self._players.setdefault(int(player_id), {'last_date': None, 'games': 0})
+            entry['games'] += len(player_games)
+            last_date = game_dates[player_games.index].max()
+            if not pd.isna(last_date) and (entry['last_date'] is None or last_date > pd.Timestamp(entry['last_date'])):
+                entry['last_date'] = last_date.date().isoformat()
+
+        self._save_state()
+
+    def load(self, player_ids=None):
+        """Stored game logs, reading only the given players' files (all players by default)"""
+        self._load_state()
+
+        player_ids = sorted(self._players) if player_ids is None else [int(p) for p in player_ids]
+        frames = [
+            pd.read_csv(self._player_path(player_id), dtype={'Game_ID': str})
+            for player_id in player_ids
+            if os.path.exists(self._player_path(player_id))
+        ]
+        if not frames:
+            return pd.DataFrame()
+
+        # Rows appended just before a crash that lost the state update come back on the next refresh
+        return pd.concat(frames, ignore_index=True).drop_duplicates(KEY_COLUMNS, ignore_index=True)
+
+    def staging(self):
+        """An empty store beside this one for a full rebuild; swap it in with replace()"""
+        staging_root = f"{self.root.rstrip(os.sep)}.rebuild"
+        if os.path.isdir(staging_root):
+            shutil.rmtree(staging_root)
+        return GameLogStore(staging_root)
+
+    def replace(self, rebuilt):
+        """Swap a fully built store (from staging()) in for this one's files"""
+        old_root = f"{self.root.rstrip(os.sep)}.old"
+        if os.path.isdir(old_root):
+            shutil.rmtree(old_root)
+        if os.path.isdir(self.root):
+            os.replace(self.root, old_root)
+        if os.path.isdir(rebuilt.root):
+            os.replace(rebuilt.root, self.root)
+        shutil.rmtree(old_root, ignore_errors=True)
+
+        rebuilt._load_state()
+        self._players = rebuilt._players
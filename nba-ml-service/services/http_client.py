@@ -0,0 +1,75 @@
+# services/http_client.py
+import asyncio
+import importlib.util
+from urllib.parse import urlsplit
+
+import httpx
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+
+class AsyncHTTPSession:
+    """Shared, pooled async HTTP session.
+
+    Wraps a single httpx.AsyncClient so every request reuses keep-alive
+    connections, negotiates HTTP/2 when it is available and never holds
+    more than `max_connections_per_host` in-flight requests against one host.
+    """
+
+    def __init__(self, headers=None, timeout=30.0, max_connections=20,
+                 max_connections_per_host=6, keepalive_expiry=30.0):
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_expiry = keepalive_expiry
+
+        self._client = None
+        self._host_slots = {}
+
+    @property
+    def is_open(self):
+        return self._client is not None and not self._client.is_closed
+
+    async def start(self):
+        """Open the connection pool (idempotent)"""
+        if self.is_open:
+            return
+
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(self.timeout),
+            limits=limits,
+            http2=HTTP2_AVAILABLE,
+            follow_redirects=True
+        )
+        print(f"HTTP session opened (http2={'on' if HTTP2_AVAILABLE else 'off'})")
+
+    async def close(self):
+        """Close every pooled connection"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._host_slots = {}
+            print("HTTP session closed")
+
+    def _slots_for(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_slots[host]
+
+    async def get(self, url, params=None):
+        """GET a URL through the pool, honouring the per-host connection limit"""
+        if not self.is_open:
+            await self.start()
+
+        async with self._slots_for(url):
+            return await self._client.get(url, params=params)
@@ -0,0 +1,182 @@
+# services/inference.py
+import itertools
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from services.tree_inference import NUMBA_AVAILABLE, load_model_set
+from services.prediction_cache import PredictionCache
+from services.metrics import MODEL_INFERENCE_SECONDS, MODEL_INFERENCE_ROWS, MODEL_LOAD_SECONDS, MODEL_INFO
+
+# Same feature order the trainer fits on; a model set with a different order is rejected
+FEATURE_COLUMNS = [
+    'season_avg_points', 'season_avg_rebounds', 'season_avg_assists',
+    'last_10_avg_points', 'last_5_avg_points',
+    'last_5_avg_rebounds', 'last_5_avg_assists',
+    'home_vs_away', 'games_played', 'rest_days'
+]
+TARGET_NAMES = ['points', 'rebounds', 'assists']
+
+
+def build_feature_matrix(features_list, feature_columns=FEATURE_COLUMNS):
+    """Stack feature dicts into one contiguous float32 matrix (rows x feature_columns)"""
+    n_features = len(feature_columns)
+
+    # float32 is what the trees compare against, so building it directly
+    # avoids a per-call conversion copy
+    values = (
+        features_dict.get(col, 0)
+        for features_dict in features_list
+        for col in feature_columns
+    )
+    feature_matrix = np.fromiter(values, dtype=np.float32, count=len(features_list) * n_features)
+    return feature_matrix.reshape(len(features_list), n_features)
+
+
+class CompiledModelSet:
+    """Serves a compiled model set file (models/<prefix>.cforest or .forest) with NumPy only.
+
+    This is the inference half of NBAMLTrainer without pandas or sklearn:
+    forests are memory-mapped, warmed up and swapped in atomically, and
+    predictions go through the same generation-keyed cache.
+    """
+
+    def __init__(self, engine='auto', prediction_cache_size=10000, prediction_cache_ttl=300):
+        self.engine = engine
+        if engine == 'auto':
+            self.engine = 'numba' if NUMBA_AVAILABLE else 'numpy'
+
+        self._serving = {'compiled': None, 'feature_columns': FEATURE_COLUMNS, 'performance': {},
+                         'version': None, 'generation': 0, 'loaded_at': None,
+                         'model_file': None, 'model_file_mtime': None}
+        self._generations = itertools.count(1)
+
+        self.prediction_cache = (
+            PredictionCache(prediction_cache_size, prediction_cache_ttl) if prediction_cache_size else None
+        )
+
+    @property
+    def model_version(self):
+        return self._serving['version']
+
+    @property
+    def models_loaded_at(self):
+        return self._serving['loaded_at']
+
+    @property
+    def model_file(self):
+        return self._serving['model_file']
+
+    @property
+    def model_file_mtime(self):
+        """mtime of the served file when it was read, to spot a newer one on disk"""
+        return self._serving['model_file_mtime']
+
+    @property
+    def feature_columns(self):
+        return self._serving['feature_columns']
+
+    @property
+    def model_performance(self):
+        """Test-set metrics the trainer stored in the model set file"""
+        return self._serving['performance']
+
+    def is_ready(self):
+        return self._serving['compiled'] is not None
+
+    def load(self, forest_path, version=None):
+        """Load a .cforest/.forest file, warm it up and start serving it; False if unusable"""
+        started = time.perf_counter()
+
+        if not os.path.exists(forest_path):
+            print(f"❌ Compiled model set not found: {forest_path} (build it with python export_models.py)")
+            return False
+
+        # Taken before reading, so a rewrite during the load still looks newer
+        mtime = os.path.getmtime(forest_path)
+        compiled_models, feature_columns, metadata = load_model_set(forest_path)
+        if feature_columns != FEATURE_COLUMNS or list(compiled_models) != TARGET_NAMES:
+            print(f"❌ {forest_path} does not match the configured features/targets")
+            return False
+
+        if version is None:
+            modified = datetime.fromtimestamp(mtime)
+            prefix = os.path.basename(forest_path).rsplit('.', 1)[0]
+            version = f"{prefix}@{modified:%Y%m%d%H%M%S}"
+
+        serving = {
+            'compiled': compiled_models,
+            'feature_columns': feature_columns,
+            'performance': metadata.get('model_performance') or {},
+            'version': version,
+            'generation': next(self._generations),
+            'loaded_at': datetime.now(),
+            'model_file': forest_path,
+            'model_file_mtime': mtime
+        }
+
+        # First calls JIT/page in the trees; do it before any request sees the set
+        for n_rows in (1, 64):
+            self._predict_matrix(serving, np.zeros((n_rows, len(feature_columns)), dtype=np.float32))
+
+        self._serving = serving
+        if self.prediction_cache is not None:
+            self.prediction_cache.clear()
+
+        MODEL_INFO.clear()
+        MODEL_INFO.set(serving['generation'], version=version)
+        source = 'compact' if forest_path.endswith('.cforest') else 'mmap'
+        MODEL_LOAD_SECONDS.set(time.perf_counter() - started, source=source)
+
+        print(f"✅ Serving compiled model version {version}")
+        return True
+
+    def predict(self, features_dict):
+        return self.predict_batch([features_dict])[0]
+
+    def predict_batch(self, features_list):
+        if not features_list:
+            return []
+
+        serving = self._serving
+        features_array = build_feature_matrix(features_list, serving['feature_columns'])
+
+        if self.prediction_cache is None:
+            return self._predict_matrix(serving, features_array)
+
+        keys = [(serving['generation'], row.tobytes()) for row in features_array]
+        predictions = [self.prediction_cache.get(key) for key in keys]
+        missing = [i for i, cached in enumerate(predictions) if cached is None]
+
+        if missing:
+            scored = self._predict_matrix(serving, features_array[missing])
+            for i, row_predictions in zip(missing, scored):
+                self.prediction_cache.put(keys[i], row_predictions)
+                predictions[i] = row_predictions
+
+        return [dict(row_predictions) for row_predictions in predictions]
+
+    def _predict_matrix(self, serving, features_array):
+        predictions = [{} for _ in range(len(features_array))]
+        model_outputs = {}
+
+        for output_index, (stat_name, forest) in enumerate(serving['compiled'].items()):
+            if id(forest) not in model_outputs:
+                started = time.perf_counter()
+                preds = forest.predict(features_array, engine=self.engine)
+
+                metric_target = 'multi-output' if preds.ndim == 2 else stat_name
+                MODEL_INFERENCE_SECONDS.observe(time.perf_counter() - started, target=metric_target, engine=self.engine)
+                MODEL_INFERENCE_ROWS.inc(len(features_array), target=metric_target)
+
+                model_outputs[id(forest)] = np.maximum(preds, 0)  # Ensure non-negative
+            preds = model_outputs[id(forest)]
+            if preds.ndim == 2:
+                preds = preds[:, output_index]
+
+            for row_predictions, pred in zip(predictions, preds.tolist()):
+                row_predictions[stat_name] = round(pred, 1)
+
+        return predictions
@@ -0,0 +1,235 @@
+# services/metrics.py
+import bisect
+import threading
+import time
+
+# Latency buckets in seconds, from sub-millisecond inference to multi-second upstream calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_names, label_values, extra=()):
+    pairs = list(zip(label_names, label_values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    metric_type = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.label_names) or not all(name in labels for name in self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            lines.extend(self._render_sample(label_values, value))
+        return lines
+
+    def _render_sample(self, label_values, value):
+        return [f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    metric_type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    metric_type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; an observation is one bisect plus two additions"""
+
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (last slot is +Inf), then the running sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def _render_sample(self, label_values, state):
+        counts, total = state
+        lines = []
+        cumulative = 0
+        for upper_bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            labels = _format_labels(self.label_names, label_values, [('le', _format_value(upper_bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, label_values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(float(total))}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them in the Prometheus text format.
+
+    Collectors are callables run at scrape time that return {metric name:
+    (type, help, [(labels dict, value), ...])}; they cover values that are
+    already tracked elsewhere, like cache statistics.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name, documentation, label_names=()):
+        return self.register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        for collector in self._collectors:
+            try:
+                collected = collector()
+            except Exception as e:
+                print(f"❌ Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, (metric_type, documentation, samples) in collected.items():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'nba_ml_http_request_duration_seconds', 'HTTP request latency by route', ('method', 'route')
+)
+HTTP_REQUESTS_TOTAL = REGISTRY.counter(
+    'nba_ml_http_requests_total', 'HTTP requests by route and status code', ('method', 'route', 'status')
+)
+MODEL_INFERENCE_SECONDS = REGISTRY.histogram(
+    'nba_ml_model_inference_seconds', 'Time spent in one forest predict call per target', ('target', 'engine')
+)
+MODEL_INFERENCE_ROWS = REGISTRY.counter(
+    'nba_ml_model_inference_rows_total', 'Feature rows scored per target', ('target',)
+)
+MODEL_LOAD_SECONDS = REGISTRY.gauge(
+    'nba_ml_model_load_seconds', 'Duration of the last model set load, including warm-up', ('source',)
+)
+MODEL_INFO = REGISTRY.gauge(
+    'nba_ml_model_info', 'Model set currently serving (value is its generation)', ('version',)
+)
+UPSTREAM_REQUEST_SECONDS = REGISTRY.histogram(
+    'nba_ml_upstream_request_duration_seconds', 'stats.nba.com call latency per endpoint', ('endpoint',)
+)
+UPSTREAM_RESPONSES_TOTAL = REGISTRY.counter(
+    'nba_ml_upstream_responses_total',
+    'stats.nba.com responses per endpoint and status code (error = transport failure)',
+    ('endpoint', 'status')
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request under its route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; the template keeps label cardinality low
+            route = scope.get('route')
+            route_path = getattr(route, 'path', None) or 'unmatched'
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=scope['method'], route=route_path)
+            HTTP_REQUESTS_TOTAL.inc(method=scope['method'], route=route_path, status=status[0])
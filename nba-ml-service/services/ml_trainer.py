@@ -5,23 +5,90 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
+import json
 import os
+import copy
+import time
+import itertools
 from datetime import datetime
+from services.tree_inference import (
+    CompiledForest, NUMBA_AVAILABLE, save_model_set, save_compact_model_set, load_model_set
+)
+from services.metrics import MODEL_INFERENCE_SECONDS, MODEL_INFERENCE_ROWS, MODEL_LOAD_SECONDS, MODEL_INFO
+from services.prediction_cache import PredictionCache
+from services.inference import FEATURE_COLUMNS, build_feature_matrix
+
+def fit_forest(X_train, y_train, model_params, n_jobs=None):
+    """Fit one Random Forest; module level so a process pool can run it"""
+    params = dict(model_params)
+    if n_jobs is not None:
+        params['n_jobs'] = n_jobs
+    
+    started = time.perf_counter()
+    model = RandomForestRegressor(**params)
+    model.fit(X_train, y_train)
+    train_seconds = time.perf_counter() - started
+    
+    # Serving predicts a few rows at a time; don't start a thread pool per call
+    model.set_params(n_jobs=None)
+    
+    return model, train_seconds
+
+
+def extend_forest(model, X_new, y_new, n_new_trees, n_jobs=None):
+    """Grow n_new_trees on new data into a copy of a fitted forest, retiring as many of its oldest trees"""
+    started = time.perf_counter()
+    
+    updated = copy.deepcopy(model)
+    n_trees = len(updated.estimators_)
+    
+    # warm_start keeps the fitted trees and only fits the extra ones
+    updated.set_params(warm_start=True, n_estimators=n_trees + n_new_trees,
+                       n_jobs=n_jobs if n_jobs is not None else model.n_jobs)
+    updated.fit(X_new, y_new)
+    
+    # Same forest size as before, so inference cost does not grow with every update
+    updated.estimators_ = updated.estimators_[-n_trees:]
+    updated.set_params(warm_start=False, n_estimators=n_trees, n_jobs=None)
+    
+    return updated, time.perf_counter() - started
+
+
+def _score(y_true, y_pred):
+    return {
+        'mae': round(float(mean_absolute_error(y_true, y_pred)), 4),
+        'rmse': round(float(np.sqrt(mean_squared_error(y_true, y_pred))), 4),
+        'r2': round(float(r2_score(y_true, y_pred)), 4)
+    }
+
 
 class NBAMLTrainer:
-    def __init__(self):
-        self.models = {
-            'points': None,
-            'rebounds': None,
-            'assists': None
+    def __init__(self, use_compiled_inference=True, multi_output=False,
+                 prediction_cache_size=10000, prediction_cache_ttl=300, compact_leaf_values='table'):
+        # multi_output trains one forest on all targets instead of one per target
+        self.multi_output = multi_output
+        
+        # Flat-array copies of the forests are used for fast inference
+        self.use_compiled_inference = use_compiled_inference
+        self.inference_engine = 'auto'  # CompiledForest traversal: 'auto', 'numpy' or 'numba'
+        
+        # Everything predictions read lives in one dict that is replaced with a
+        # single assignment, so a reload never exposes a half-updated model set
+        self._serving = {
+            'models': {'points': None, 'rebounds': None, 'assists': None},
+            'compiled': {'points': None, 'rebounds': None, 'assists': None},
+            'version': None,
+            'generation': 0,
+            'loaded_at': None
         }
+        self._generations = itertools.count(1)
         
-        self.feature_columns = [
-            'season_avg_points', 'season_avg_rebounds', 'season_avg_assists',
-            'last_10_avg_points', 'last_5_avg_points', 
-            'last_5_avg_rebounds', 'last_5_avg_assists',
-            'home_vs_away', 'games_played', 'rest_days'
-        ]
+        # Repeated requests for the same features skip the forests entirely (size 0 disables)
+        self.prediction_cache = (
+            PredictionCache(prediction_cache_size, prediction_cache_ttl) if prediction_cache_size else None
+        )
+        
+        self.feature_columns = list(FEATURE_COLUMNS)
         
         self.target_columns = {
             'points': 'actual_points',
@@ -34,7 +101,8 @@ class NBAMLTrainer:
             'max_depth': 10,
             'min_samples_split': 5,
             'min_samples_leaf': 2,
-            'random_state': 42
+            'random_state': 42,
+            'n_jobs': -1  # Build trees on all cores
         }
 
         self.model_metrics = {
@@ -42,6 +110,49 @@ class NBAMLTrainer:
         'rebounds': None,
         'assists': None
     }
+        
+        # Test split of the last training run, kept to score exported model formats
+        self.holdout = None
+        
+        # Leaf encoding of the compact .cforest export: 'table' (exact) or 'float32'
+        self.compact_leaf_values = compact_leaf_values
+        self.compact_report = None
+        
+        # The .forest file last loaded or written and its mtime, so workers can spot a newer one
+        self.model_file = None
+        self.model_file_mtime = None
+        
+        # Feature importances read from a model set file when the sklearn forests aren't loaded
+        self.stored_feature_importance = {}
+        
+        # Training store parts the serving forests have seen, and when they were read;
+        # parts stored since then feed update_models
+        self.trained_at = None
+        self.trained_parts = None
+        self.update_report = None
+    
+    @property
+    def models(self):
+        return self._serving['models']
+    
+    @property
+    def compiled_models(self):
+        return self._serving['compiled']
+    
+    @property
+    def model_version(self):
+        return self._serving['version']
+    
+    @property
+    def models_loaded_at(self):
+        return self._serving['loaded_at']
+    
+    def is_ready(self):
+        """True once every target has a model to serve"""
+        return all(
+            self.models[stat_name] is not None or self.compiled_models[stat_name] is not None
+            for stat_name in self.target_columns
+        )
     
     def prepare_data(self, training_df):
         """Prepare features and targets for training"""
@@ -62,71 +173,332 @@ class NBAMLTrainer:
         return clean_df
 
 
-    def train_models(self, training_df):
-    
-        print("Training Random Forest models...")
-        
+    def plan_training(self, training_df):
+        """Clean the data and split it into one fit task per forest to train"""
         clean_df = self.prepare_data(training_df)
         
         # Features (X)
         X = clean_df[self.feature_columns]
         
-        results = {}
+        if self.multi_output:
+            # One forest on every target, with a single shared split
+            forests = {'multi-output': list(self.target_columns)}
+        else:
+            forests = {stat_name: [stat_name] for stat_name in self.target_columns}
         
-        for stat_name, target_col in self.target_columns.items():
-            print(f"\nTraining {stat_name} model...")
-            
+        fit_tasks = []
+        for name, stat_names in forests.items():
             # Target (y)
-            y = clean_df[target_col]
+            target_cols = [self.target_columns[stat_name] for stat_name in stat_names]
+            y = clean_df[target_cols] if len(target_cols) > 1 else clean_df[target_cols[0]]
             
             # Train/test split
             X_train, X_test, y_train, y_test = train_test_split(
                 X, y, test_size=0.2, random_state=42
             )
             
-            # Train Random Forest
-            model = RandomForestRegressor(**self.model_params)
-            model.fit(X_train, y_train)
-            
+            fit_tasks.append({
+                'name': name,
+                'stats': stat_names,
+                'X_train': X_train,
+                'X_test': X_test,
+                'y_train': y_train,
+                'y_test': y_test
+            })
+        
+        return fit_tasks
+    
+    def train_models(self, training_df, data_snapshot=None):
+    
+        print("Training Random Forest models...")
+        
+        fit_tasks = self.plan_training(training_df)
+        
+        fitted = []
+        for task in fit_tasks:
+            print(f"\nTraining {task['name']} model...")
+            fitted.append(fit_forest(task['X_train'], task['y_train'], self.model_params))
+        
+        return self.finish_training(fit_tasks, fitted, data_snapshot)
+    
+    def finish_training(self, fit_tasks, fitted, data_snapshot=None):
+        """Score fitted forests on their test splits, then swap them in.
+        
+        data_snapshot ({'read_at', 'parts'}) records which training store parts
+        the rows were read from; without one (CSV or synthetic rows) the new
+        forests can't be updated incrementally.
+        """
+        models = {}
+        results = {}
+        holdout_y = {}
+        
+        for task, (model, train_seconds) in zip(fit_tasks, fitted):
             # Make predictions on test set
-            y_pred = model.predict(X_test)
-            
-            # Calculate metrics
-            mae = mean_absolute_error(y_test, y_pred)
-            rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-            r2 = r2_score(y_test, y_pred)
+            y_pred = model.predict(task['X_test'])
             
-            # Store model and results
-            self.models[stat_name] = model
-            
-            # Store metrics in both places
-            metric_data = {
-                'mae': round(mae, 2),
-                'rmse': round(rmse, 2),
-                'r2': round(r2, 3),
-                'train_samples': len(X_train),
-                'test_samples': len(X_test)
-            }
-            
-            results[stat_name] = metric_data  # For return value
-            self.model_metrics[stat_name] = metric_data  # Store in class
+            for i, stat_name in enumerate(task['stats']):
+                if len(task['stats']) > 1:
+                    y_test, stat_pred = task['y_test'].iloc[:, i], y_pred[:, i]
+                else:
+                    y_test, stat_pred = task['y_test'], y_pred
+                
+                # Store model and results
+                models[stat_name] = model
+                results[stat_name] = self._record_metrics(
+                    stat_name, model, y_test, stat_pred, len(task['X_train']), train_seconds
+                )
+                holdout_y[stat_name] = y_test.to_numpy(dtype=np.float64)
+        
+        # Every task uses the same split, so one feature matrix serves all targets
+        self.holdout = {'X': fit_tasks[0]['X_test'].to_numpy(dtype=np.float32), 'y': holdout_y}
+        
+        self.activate_models(models, version=f"trained@{datetime.now():%Y%m%d%H%M%S}")
+        self.trained_at = data_snapshot['read_at'] if data_snapshot else datetime.now()
+        self.trained_parts = set(data_snapshot['parts']) if data_snapshot else None
+        
+        return results
+    
+    def _record_metrics(self, stat_name, model, y_test, y_pred, train_samples, train_seconds):
+        """Compute, store and print test-set metrics for one target"""
+        # Calculate metrics
+        mae = mean_absolute_error(y_test, y_pred)
+        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+        r2 = r2_score(y_test, y_pred)
+        
+        # Store metrics in both places
+        metric_data = {
+            'mae': round(mae, 2),
+            'rmse': round(rmse, 2),
+            'r2': round(r2, 3),
+            'train_samples': train_samples,
+            'test_samples': len(y_test),
+            'train_seconds': round(train_seconds, 2)
+        }
+        
+        self.model_metrics[stat_name] = metric_data  # Store in class
+        
+        print(f"✅ {stat_name.title()} Model:")
+        print(f"   - Mean Absolute Error: {mae:.2f}")
+        print(f"   - Root Mean Square Error: {rmse:.2f}")  
+        print(f"   - R² Score: {r2:.3f}")
+        
+        # Feature importance
+        feature_importance = pd.DataFrame({
+            'feature': self.feature_columns,
+            'importance': model.feature_importances_
+        }).sort_values('importance', ascending=False)
+        
+        print("   - Top 3 important features:")
+        for _, row in feature_importance.head(3).iterrows():
+            print(f"     • {row['feature']}: {row['importance']:.3f}")
+        
+        return metric_data  # For return value
+    
+    def plan_update(self, new_training_df, history_df=None):
+        """Split training rows newer than the serving forests into incremental fit tasks.
+        
+        Every forest gets one task on the new rows' train split; the other 20%
+        is kept back to compare the updated forests against the current ones.
+        The forests that get served are extended on all the new rows (X_new),
+        so no row is left out once the scores are in. With history_df (the
+        rows the current forests were trained on) a full-retrain task on
+        history plus the new train split is planned too.
+        """
+        if any(self.models[stat_name] is None for stat_name in self.target_columns):
+            raise ValueError("Incremental updates need the sklearn forests; load the joblib models first")
+        
+        clean_df = self.prepare_data(new_training_df)
+        if len(clean_df) < 10:
+            raise ValueError(f"Only {len(clean_df)} new training examples, not enough for an update")
+        
+        train_index, test_index = train_test_split(clean_df.index, test_size=0.2, random_state=42)
+        
+        # Group targets by forest so a multi-output forest is extended once
+        forests = {}
+        for stat_name, model in self.models.items():
+            forests.setdefault(id(model), (model, []))[1].append(stat_name)
+        
+        update_tasks = []
+        for model, stat_names in forests.values():
+            target_cols = [self.target_columns[stat_name] for stat_name in stat_names]
+            y = clean_df[target_cols] if len(target_cols) > 1 else clean_df[target_cols[0]]
+            update_tasks.append({
+                'name': 'multi-output' if len(stat_names) > 1 else stat_names[0],
+                'stats': stat_names,
+                'model': model,
+                'X_train': clean_df.loc[train_index, self.feature_columns],
+                'X_test': clean_df.loc[test_index, self.feature_columns],
+                'y_train': y.loc[train_index],
+                'y_test': y.loc[test_index],
+                'X_new': clean_df[self.feature_columns],
+                'y_new': y
+            })
+        
+        full_tasks = None
+        if history_df is not None and not history_df.empty:
+            full_df = pd.concat([self.prepare_data(history_df), clean_df.loc[train_index]], ignore_index=True)
+            full_tasks = []
+            for task in update_tasks:
+                target_cols = [self.target_columns[stat_name] for stat_name in task['stats']]
+                full_tasks.append({
+                    'name': task['name'],
+                    'stats': task['stats'],
+                    'X_train': full_df[self.feature_columns],
+                    'y_train': full_df[target_cols] if len(target_cols) > 1 else full_df[target_cols[0]]
+                })
+        
+        return update_tasks, full_tasks
+    
+    def update_models(self, new_training_df, n_new_trees=10, history_df=None, data_snapshot=None):
+        """Extend the serving forests with trees fit on new rows instead of retraining"""
+        print(f"Updating models with {n_new_trees} new trees per forest...")
+        
+        update_tasks, full_tasks = self.plan_update(new_training_df, history_df)
+        
+        evaluated = [
+            extend_forest(task['model'], task['X_train'], task['y_train'], n_new_trees)
+            for task in update_tasks
+        ]
+        fitted = [
+            extend_forest(task['model'], task['X_new'], task['y_new'], n_new_trees)
+            for task in update_tasks
+        ]
+        full_fitted = None
+        if full_tasks is not None:
+            full_fitted = [
+                fit_forest(task['X_train'], task['y_train'], self.model_params)
+                for task in full_tasks
+            ]
+        
+        return self.finish_update(update_tasks, evaluated, fitted, n_new_trees, full_fitted, data_snapshot)
+    
+    def finish_update(self, update_tasks, evaluated, fitted, n_new_trees, full_fitted=None, data_snapshot=None):
+        """Score extended forests against the current ones (and a full retrain), then swap them in.
+        
+        evaluated holds the forests extended on the train split only, which
+        are what the recent test split can fairly score; fitted holds the ones
+        extended on every new row, which get served. The parts in
+        data_snapshot are added to the ones the forests have seen.
+        """
+        holdout = self.holdout
+        if holdout is not None:
+            holdout_X = pd.DataFrame(holdout['X'], columns=self.feature_columns)
+        models = {}
+        stats_report = {}
+        
+        for i, task in enumerate(update_tasks):
+            model, update_seconds = fitted[i]
+            candidates = {'current': task['model'], 'updated': evaluated[i][0]}
+            if full_fitted is not None:
+                candidates['full_retrain'] = full_fitted[i][0]
             
-            print(f"✅ {stat_name.title()} Model:")
-            print(f"   - Mean Absolute Error: {mae:.2f}")
-            print(f"   - Root Mean Square Error: {rmse:.2f}")  
-            print(f"   - R² Score: {r2:.3f}")
+            recent_pred = {name: forest.predict(task['X_test']) for name, forest in candidates.items()}
+            holdout_pred = {}
+            if holdout is not None:
+                # Only the current and updated forests never trained on the old holdout rows
+                holdout_pred = {'current': task['model'].predict(holdout_X), 'updated': model.predict(holdout_X)}
             
-            # Feature importance
-            feature_importance = pd.DataFrame({
-                'feature': self.feature_columns,
-                'importance': model.feature_importances_
-            }).sort_values('importance', ascending=False)
+            for j, stat_name in enumerate(task['stats']):
+                models[stat_name] = model
+                
+                def stat_column(preds):
+                    return preds[:, j] if preds.ndim == 2 else preds
+                
+                y_recent = task['y_test'].iloc[:, j] if len(task['stats']) > 1 else task['y_test']
+                recent = {name: _score(y_recent, stat_column(preds)) for name, preds in recent_pred.items()}
+                
+                stat_report = {
+                    'train_samples': len(task['X_new']),
+                    'update_seconds': round(update_seconds, 2),
+                    'recent': recent,
+                    'mae_drift_vs_current': round(recent['updated']['mae'] - recent['current']['mae'], 4)
+                }
+                if 'full_retrain' in recent:
+                    stat_report['full_retrain_seconds'] = round(full_fitted[i][1], 2)
+                    stat_report['mae_drift_vs_full_retrain'] = round(
+                        recent['updated']['mae'] - recent['full_retrain']['mae'], 4
+                    )
+                if holdout_pred:
+                    stat_report['holdout'] = {
+                        name: _score(holdout['y'][stat_name], stat_column(preds))
+                        for name, preds in holdout_pred.items()
+                    }
+                stats_report[stat_name] = stat_report
+                
+                print(f"✅ {stat_name.title()} update: recent MAE "
+                      f"{recent['current']['mae']:.2f} -> {recent['updated']['mae']:.2f}"
+                      + (f" (full retrain {recent['full_retrain']['mae']:.2f})" if 'full_retrain' in recent else ""))
+        
+        previous_version = self.model_version
+        self.activate_models(models, version=f"updated@{datetime.now():%Y%m%d%H%M%S}")
+        if data_snapshot is not None:
+            self.trained_at = data_snapshot['read_at']
+            self.trained_parts = (self.trained_parts or set()) | set(data_snapshot['parts'])
+        
+        self.update_report = {
+            'previous_version': previous_version,
+            'version': self.model_version,
+            'n_new_trees': n_new_trees,
+            'new_examples': len(update_tasks[0]['X_train']) + len(update_tasks[0]['X_test']),
+            'recent_test_samples': len(update_tasks[0]['X_test']),
+            'holdout_samples': len(holdout['X']) if holdout is not None else 0,
+            'stats': stats_report,
+            'updated_at': datetime.now()
+        }
+        return self.update_report
+    
+    def compile_models(self, models):
+        """Export forests into arrays for the compiled inference engine"""
+        compiled_models = {}
+        compiled_by_model = {}
+        
+        for stat_name, model in models.items():
+            if model is None:
+                compiled_models[stat_name] = None
+                continue
             
-            print(f"   - Top 3 important features:")
-            for _, row in feature_importance.head(3).iterrows():
-                print(f"     • {row['feature']}: {row['importance']:.3f}")
+            # A multi-output forest is shared by all targets, so compile it once
+            if id(model) not in compiled_by_model:
+                compiled_by_model[id(model)] = CompiledForest.from_sklearn(model)
+            compiled_models[stat_name] = compiled_by_model[id(model)]
         
-        return results
+        return compiled_models
+    
+    def activate_models(self, models, version, compiled_models=None):
+        """Compile and warm up a new model set, then swap it in atomically"""
+        serving = {
+            'models': {stat_name: models.get(stat_name) for stat_name in self.target_columns},
+            'compiled': compiled_models,
+            'version': version,
+            # Unique per swap, unlike version strings that may repeat
+            'generation': next(self._generations),
+            'loaded_at': datetime.now()
+        }
+        if serving['compiled'] is None:
+            serving['compiled'] = self.compile_models(serving['models'])
+        
+        self.warm_up(serving)
+        
+        self._serving = serving
+        
+        MODEL_INFO.clear()
+        MODEL_INFO.set(serving['generation'], version=version)
+        
+        # Cached predictions belong to the old models
+        if self.prediction_cache is not None:
+            self.prediction_cache.clear()
+        
+        print(f"✅ Serving model version {version}")
+    
+    def warm_up(self, serving=None, batch_size=64):
+        """Run throwaway predictions so the first real request pays no first-call costs"""
+        serving = serving or self._serving
+        started = time.perf_counter()
+        
+        for n_rows in (1, batch_size):
+            self._predict_matrix(serving, np.zeros((n_rows, len(self.feature_columns)), dtype=np.float32))
+        
+        print(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.1f}ms")
     
      
     
@@ -137,52 +509,331 @@ class NBAMLTrainer:
         
         saved_files = []
         
-        for stat_name, model in self.models.items():
-            if model is not None:
-                filename = f"models/{filepath_prefix}_{stat_name}.joblib"
-                joblib.dump(model, filename)
-                saved_files.append(filename)
-                print(f"✅ Saved {stat_name} model to {filename}")
+        models = self.models
+        multi_output = self.is_multi_output_loaded()
+        
+        if multi_output:
+            # One shared forest: one file
+            filename = f"models/{filepath_prefix}_multi.joblib"
+            joblib.dump(models[next(iter(models))], filename)
+            saved_files.append(filename)
+            print(f"✅ Saved multi-output model to {filename}")
+        else:
+            for stat_name, model in models.items():
+                if model is not None:
+                    filename = f"models/{filepath_prefix}_{stat_name}.joblib"
+                    joblib.dump(model, filename)
+                    saved_files.append(filename)
+                    print(f"✅ Saved {stat_name} model to {filename}")
+        
+        # Loaders pick a layout by which files exist, so the other layout's files would be a stale model set
+        for filename in self._joblib_files(filepath_prefix, not multi_output) if saved_files else []:
+            if os.path.exists(filename):
+                os.remove(filename)
+                print(f"Removed {filename} (other model layout)")
+        
+        saved_files.append(self.save_compiled_models(filepath_prefix))
+        saved_files.append(self.save_compact_models(filepath_prefix))
+        
+        if self.holdout is not None:
+            holdout_filename = f"models/{filepath_prefix}_holdout.npz"
+            np.savez_compressed(holdout_filename, X=self.holdout['X'], **{
+                f"y_{stat_name}": y for stat_name, y in self.holdout['y'].items()
+            })
+            saved_files.append(holdout_filename)
+        
+        if self.model_metrics:
+            metrics_filename = f"models/{filepath_prefix}_metrics.json"
+            with open(metrics_filename, 'w') as f:
+                json.dump(self.model_metrics, f, indent=2)
+            saved_files.append(metrics_filename)
+        
+        if self.trained_parts is not None:
+            data_filename = f"models/{filepath_prefix}_training_data.json"
+            with open(data_filename, 'w') as f:
+                json.dump({'read_at': self.trained_at.isoformat(), 'parts': sorted(self.trained_parts)}, f, indent=2)
+            saved_files.append(data_filename)
         
         return saved_files
     
-    def load_models(self, filepath_prefix='nba_models'):
-        """Load trained models from disk"""
+    def save_compiled_models(self, filepath_prefix='nba_models'):
+        """Write the compiled forests as one memory-mappable file shared by all workers"""
+        filename = f"models/{filepath_prefix}.forest"
+        save_model_set(filename, self.compiled_models, self.feature_columns, metadata=self._model_set_metadata())
+        self.model_file, self.model_file_mtime = filename, os.path.getmtime(filename)
+        print(f"✅ Saved compiled model set to {filename}")
+        return filename
+    
+    def _model_set_metadata(self):
+        # Carried in the file so inference_app.py can report it without the trainer
+        return {
+            'version': self.model_version,
+            'multi_output': self.is_multi_output_loaded(),
+            'model_performance': self.model_metrics,
+            'feature_importance': self.get_feature_importance()
+        }
+    
+    def save_compact_models(self, filepath_prefix='nba_models'):
+        """Write the compact .cforest export and report its size and accuracy cost"""
+        filename = f"models/{filepath_prefix}.cforest"
+        save_compact_model_set(
+            filename, self.compiled_models, self.feature_columns,
+            metadata=self._model_set_metadata(), leaf_values=self.compact_leaf_values
+        )
+        
+        self.compact_report = self.evaluate_compact_models(filename, filepath_prefix)
+        print(f"✅ Saved compact model set to {filename} "
+              f"({self.compact_report['bytes'] / 1024:.0f} KB, "
+              f"{self.compact_report['size_ratio_vs_joblib'] or '?'}x smaller than joblib)")
+        return filename
+    
+    def _joblib_files(self, filepath_prefix, multi_output):
+        """joblib files of one model layout: the shared multi-output forest or one forest per target"""
+        if multi_output:
+            return [f"models/{filepath_prefix}_multi.joblib"]
+        return [f"models/{filepath_prefix}_{stat_name}.joblib" for stat_name in self.target_columns]
+    
+    def evaluate_compact_models(self, compact_filename, filepath_prefix):
+        """Size of the compact file and how its holdout metrics differ from the full forests"""
+        joblib_files = self._joblib_files(filepath_prefix, self.is_multi_output_loaded())
+        joblib_bytes = sum(os.path.getsize(f) for f in joblib_files if os.path.exists(f))
+        compact_bytes = os.path.getsize(compact_filename)
+        
+        report = {
+            'file': compact_filename,
+            'leaf_values': self.compact_leaf_values,
+            'bytes': compact_bytes,
+            'joblib_bytes': joblib_bytes,
+            'size_ratio_vs_joblib': round(joblib_bytes / compact_bytes, 1) if joblib_bytes else None,
+            'max_prediction_diff': None,
+            'metrics': None
+        }
+        
+        holdout = self.holdout or self._load_holdout(filepath_prefix)
+        if holdout is None:
+            return report
+        
+        compact_models, _, _ = load_model_set(compact_filename)
+        full_serving = {'compiled': self.compiled_models}
+        compact_serving = {'compiled': compact_models}
+        
+        metrics = {}
+        max_diff = 0.0
+        for stat_name in self.target_columns:
+            full_pred = self._raw_predictions(full_serving, stat_name, holdout['X'])
+            compact_pred = self._raw_predictions(compact_serving, stat_name, holdout['X'])
+            y = holdout['y'][stat_name]
+            
+            full_mae = mean_absolute_error(y, full_pred)
+            compact_mae = mean_absolute_error(y, compact_pred)
+            metrics[stat_name] = {
+                'mae': round(compact_mae, 4),
+                'mae_delta': float(compact_mae - full_mae),
+                'rmse_delta': float(np.sqrt(mean_squared_error(y, compact_pred)) - np.sqrt(mean_squared_error(y, full_pred))),
+                'r2_delta': float(r2_score(y, compact_pred) - r2_score(y, full_pred)),
+                'trained_mae': (self.model_metrics.get(stat_name) or {}).get('mae')
+            }
+            max_diff = max(max_diff, float(np.abs(compact_pred - full_pred).max(initial=0.0)))
+        
+        report['max_prediction_diff'] = max_diff
+        report['metrics'] = metrics
+        return report
+    
+    def _load_holdout(self, filepath_prefix):
+        holdout_filename = f"models/{filepath_prefix}_holdout.npz"
+        if not os.path.exists(holdout_filename):
+            return None
+        with np.load(holdout_filename) as stored:
+            return {'X': stored['X'], 'y': {
+                stat_name: stored[f"y_{stat_name}"] for stat_name in self.target_columns
+            }}
+    
+    def _load_metrics(self, filepath_prefix):
+        metrics_filename = f"models/{filepath_prefix}_metrics.json"
+        if not os.path.exists(metrics_filename):
+            return {}
+        with open(metrics_filename) as f:
+            return json.load(f)
+    
+    def _load_training_data(self, filepath_prefix):
+        """(read_at, parts) of the training store snapshot a saved model set was fit on"""
+        data_filename = f"models/{filepath_prefix}_training_data.json"
+        if not os.path.exists(data_filename):
+            return None, None
+        with open(data_filename) as f:
+            stored = json.load(f)
+        return datetime.fromisoformat(stored['read_at']), set(stored['parts'])
+    
+    def _raw_predictions(self, serving, stat_name, features_array):
+        forest = serving['compiled'][stat_name]
+        preds = forest.predict(features_array, engine=self.inference_engine)
+        if preds.ndim == 2:
+            preds = preds[:, list(self.target_columns).index(stat_name)]
+        return preds
+    
+    def load_models(self, filepath_prefix='nba_models', use_mmap=False):
+        """Load trained models from disk and swap them in once all are ready.
+        
+        With use_mmap the compiled forests are memory-mapped read-only from
+        models/<prefix>.forest instead of unpickling the sklearn forests, so
+        every worker process shares one copy of the tree arrays.
+        """
+        started = time.perf_counter()
+        
+        if use_mmap:
+            forest_filename = f"models/{filepath_prefix}.forest"
+            if os.path.exists(forest_filename):
+                loaded_files = self._load_compiled_models(forest_filename, filepath_prefix)
+                if loaded_files:
+                    MODEL_LOAD_SECONDS.set(time.perf_counter() - started, source='mmap')
+                return loaded_files
+            print(f"❌ Compiled model set not found: {forest_filename}, loading joblib models instead")
+        
         loaded_files = []
+        models = {}
         
-        for stat_name in self.models.keys():
-            filename = f"models/{filepath_prefix}_{stat_name}.joblib"
-            if os.path.exists(filename):
-                self.models[stat_name] = joblib.load(filename)
-                loaded_files.append(filename)
-                print(f"✅ Loaded {stat_name} model from {filename}")
-            else:
-                print(f"❌ Model file not found: {filename}")
+        multi_filename = f"models/{filepath_prefix}_multi.joblib"
+        if self.multi_output and os.path.exists(multi_filename):
+            model = joblib.load(multi_filename)
+            for stat_name in self.target_columns:
+                models[stat_name] = model
+            loaded_files.append(multi_filename)
+            print(f"✅ Loaded multi-output model from {multi_filename}")
+        else:
+            for stat_name in self.target_columns:
+                filename = f"models/{filepath_prefix}_{stat_name}.joblib"
+                if os.path.exists(filename):
+                    models[stat_name] = joblib.load(filename)
+                    loaded_files.append(filename)
+                    print(f"✅ Loaded {stat_name} model from {filename}")
+                else:
+                    print(f"❌ Model file not found: {filename}")
+        
+        if len(models) < len(self.target_columns):
+            print("❌ Incomplete model set, keeping the models currently being served")
+            return []
+        
+        # Version the set by the newest file it came from
+        newest = max(os.path.getmtime(filename) for filename in loaded_files)
+        self.activate_models(models, version=f"{filepath_prefix}@{datetime.fromtimestamp(newest):%Y%m%d%H%M%S}")
+        MODEL_LOAD_SECONDS.set(time.perf_counter() - started, source='joblib')
+        
+        # Store parts not listed here have not been seen by these forests
+        self.trained_at, self.trained_parts = self._load_training_data(filepath_prefix)
+        self.model_metrics = self._load_metrics(filepath_prefix)
+        self.holdout = self._load_holdout(filepath_prefix)
+        
+        if use_mmap:
+            # Export once so the next worker start can map the arrays directly
+            self.save_compiled_models(filepath_prefix)
         
         return loaded_files
     
+    def _load_compiled_models(self, forest_filename, filepath_prefix):
+        # Taken before mapping: a file replaced in between just looks newer to the next check
+        mtime = os.path.getmtime(forest_filename)
+        compiled_models, feature_columns, metadata = load_model_set(forest_filename)
+        
+        if feature_columns != self.feature_columns or set(compiled_models) != set(self.target_columns):
+            print(f"❌ {forest_filename} does not match the configured features/targets")
+            return []
+        
+        modified = datetime.fromtimestamp(mtime)
+        self.activate_models({}, version=f"{filepath_prefix}@{modified:%Y%m%d%H%M%S}", compiled_models=compiled_models)
+        self.model_file, self.model_file_mtime = forest_filename, mtime
+        self.model_metrics = metadata.get('model_performance') or self._load_metrics(filepath_prefix)
+        self.stored_feature_importance = metadata.get('feature_importance') or {}
+        print(f"✅ Memory-mapped compiled models from {forest_filename}")
+        
+        return [forest_filename]
+    
+    def build_feature_matrix(self, features_list):
+        """Stack feature dicts into one contiguous float32 matrix (rows x feature_columns)"""
+        return build_feature_matrix(features_list, self.feature_columns)
+    
     def predict(self, features_dict):
         """Make predictions for a single player/game"""
-        # Convert features to the expected format
-        feature_values = []
-        for col in self.feature_columns:
-            feature_values.append(features_dict.get(col, 0))
+        return self.predict_batch([features_dict])[0]
+    
+    def predict_batch(self, features_list):
+        """Make predictions for many players/games with one model call per stat"""
+        if not features_list:
+            return []
         
-        features_array = np.array(feature_values).reshape(1, -1)
+        features_array = self.build_feature_matrix(features_list)
         
-        predictions = {}
+        # Read the serving set once so a concurrent swap can't mix two versions
+        serving = self._serving
         
-        for stat_name, model in self.models.items():
+        if self.prediction_cache is None:
+            return self._predict_matrix(serving, features_array)
+        
+        # Key on the model generation plus the canonical float32 feature vector
+        keys = [(serving['generation'], row.tobytes()) for row in features_array]
+        
+        predictions = [self.prediction_cache.get(key) for key in keys]
+        missing = [i for i, cached in enumerate(predictions) if cached is None]
+        
+        if missing:
+            scored = self._predict_matrix(serving, features_array[missing])
+            for i, row_predictions in zip(missing, scored):
+                self.prediction_cache.put(keys[i], row_predictions)
+                predictions[i] = row_predictions
+        
+        # Hand out copies so callers can't modify cached entries
+        return [dict(row_predictions) for row_predictions in predictions]
+    
+    def _predict_matrix(self, serving, features_array):
+        predictions = [{} for _ in range(len(features_array))]
+        target_names = list(self.target_columns)
+        
+        # A multi-output forest is shared by every target: walk it only once
+        model_outputs = {}
+        
+        for stat_name, model in serving['models'].items():
+            compiled = serving['compiled'].get(stat_name)
+            if compiled is not None and (self.use_compiled_inference or model is None):
+                model = compiled
+            
             if model is not None:
-                pred = model.predict(features_array)[0]
-                predictions[stat_name] = round(max(0, pred), 1)  # Ensure non-negative
+                if id(model) not in model_outputs:
+                    started = time.perf_counter()
+                    if isinstance(model, CompiledForest):
+                        preds = model.predict(features_array, engine=self.inference_engine)
+                        engine = self.inference_engine
+                        if engine == 'auto':
+                            engine = 'numba' if NUMBA_AVAILABLE else 'numpy'
+                    else:
+                        preds = model.predict(features_array)
+                        engine = 'sklearn'
+                    
+                    metric_target = 'multi-output' if preds.ndim == 2 else stat_name
+                    MODEL_INFERENCE_SECONDS.observe(time.perf_counter() - started, target=metric_target, engine=engine)
+                    MODEL_INFERENCE_ROWS.inc(len(features_array), target=metric_target)
+                    
+                    model_outputs[id(model)] = np.maximum(preds, 0)  # Ensure non-negative
+                preds = model_outputs[id(model)]
+                if preds.ndim == 2:
+                    preds = preds[:, target_names.index(stat_name)]
+                
+                for row_predictions, pred in zip(predictions, preds.tolist()):
+                    row_predictions[stat_name] = round(pred, 1)
             else:
-                predictions[stat_name] = 0
+                for row_predictions in predictions:
+                    row_predictions[stat_name] = 0
         
         return predictions
     
+    def is_multi_output_loaded(self):
+        """True when a single multi-output forest serves every target"""
+        models = list(self.models.values())
+        if models[0] is None:
+            # Memory-mapped sets only carry the compiled forests
+            models = list(self.compiled_models.values())
+        return models[0] is not None and all(model is models[0] for model in models)
+    
     def get_feature_importance(self):
-        """Get feature importance for all models"""
+        """Get feature importance for all models (from the model set file when serving memory-mapped forests)"""
         importance_data = {}
         
         for stat_name, model in self.models.items():
@@ -191,6 +842,8 @@ class NBAMLTrainer:
                     'features': self.feature_columns,
                     'importances': model.feature_importances_.tolist()
                 }
+            elif stat_name in self.stored_feature_importance:
+                importance_data[stat_name] = self.stored_feature_importance[stat_name]
         
         return importance_data 
 
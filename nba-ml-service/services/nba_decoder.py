@@ -0,0 +1,115 @@
+# services/nba_decoder.py
+import json
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from services.feature_builder import NBA_DATE_FORMAT, parse_game_dates
+
+# orjson parses straight from the response bytes, several times faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Column types per stats.nba.com endpoint. 'int' falls back to float when the
+# column has nulls or float values, 'date' is parsed once into datetime64; text and unlisted
+# columns are left to pandas.
+ID_COLUMNS = {'PLAYER_ID': 'int', 'Player_ID': 'int', 'PERSON_ID': 'int', 'TEAM_ID': 'int'}
+
+ENDPOINT_SCHEMAS = {
+    'playergamelog': {
+        **ID_COLUMNS,
+        'GAME_DATE': 'date', 'MIN': 'float', 'PTS': 'int', 'REB': 'int', 'AST': 'int',
+        'OREB': 'int', 'DREB': 'int', 'STL': 'int', 'BLK': 'int', 'TOV': 'int', 'PF': 'int',
+        'FGM': 'int', 'FGA': 'int', 'FG3M': 'int', 'FG3A': 'int', 'FTM': 'int', 'FTA': 'int',
+        'FG_PCT': 'float', 'FG3_PCT': 'float', 'FT_PCT': 'float', 'PLUS_MINUS': 'float'
+    },
+    'leaguedashplayerstats': {
+        **ID_COLUMNS,
+        'AGE': 'float', 'GP': 'int', 'W': 'int', 'L': 'int', 'MIN': 'float',
+        'PTS': 'float', 'REB': 'float', 'AST': 'float'
+    },
+    'commonallplayers': {
+        **ID_COLUMNS,
+        'ROSTERSTATUS': 'int'
+    }
+}
+
+
+def loads(content):
+    """Parse a JSON body (bytes or str)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def result_set(data, index=0):
+    """(headers, rows) of a stats.nba.com payload in either response layout, or None"""
+    if 'resultSets' in data:
+        result = data['resultSets'][index]
+    elif 'resultSet' in data:
+        result = data['resultSet']
+    else:
+        return None
+    return result['headers'], result['rowSet']
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+@lru_cache(maxsize=8192)
+def _nba_date_micros(text):
+    # A season has a few hundred distinct dates, so most lookups are cache hits
+    return (datetime.strptime(text, NBA_DATE_FORMAT) - EPOCH) // timedelta(microseconds=1)
+
+
+def _typed_column(values, kind):
+    if kind == 'int':
+        try:
+            integers = np.fromiter(values, dtype=np.int64, count=len(values))
+            # fromiter truncates floats (1.5 -> 1); a sum of ints stays an int, so this spots any float
+            if not isinstance(sum(values), float):
+                return integers
+        except (TypeError, ValueError):
+            pass  # Nulls (or stray strings) in an ID/count column
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+    if kind == 'float':
+        try:
+            return np.fromiter(values, dtype=np.float64, count=len(values))
+        except (TypeError, ValueError):
+            return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+    if kind == 'date':
+        try:
+            micros = np.fromiter(map(_nba_date_micros, values), dtype=np.int64, count=len(values))
+            return micros.view('datetime64[us]')
+        except (TypeError, ValueError):
+            return parse_game_dates(pd.Series(values, dtype=object)).to_numpy()
+    return list(values)
+
+
+def rows_to_frame(headers, rows, schema=None):
+    """Transpose row lists into one typed array per column and build the frame from those"""
+    schema = schema or {}
+    if not rows:
+        return pd.DataFrame(columns=headers)
+
+    columns = {}
+    for header, values in zip(headers, zip(*rows)):
+        columns[header] = _typed_column(values, schema.get(header))
+    return pd.DataFrame(columns, columns=headers)
+
+
+def decode_result_set(content, endpoint=None, index=0):
+    """DataFrame of one result set of a stats.nba.com response, typed by the endpoint's schema.
+
+    Returns None when the body is not in a known result set layout.
+    """
+    extracted = result_set(loads(content), index)
+    if extracted is None:
+        return None
+    headers, rows = extracted
+    return rows_to_frame(headers, rows, ENDPOINT_SCHEMAS.get(endpoint))
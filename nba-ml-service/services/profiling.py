@@ -0,0 +1,194 @@
+# services/profiling.py
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+# Innermost frames of a thread that is parked, not working: skip those samples
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('selectors.py', 'select'),
+    ('thread.py', '_worker'),  # concurrent.futures worker waiting for work
+    ('queue.py', 'get'),
+}
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame):
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES
+
+
+class _Sampler(threading.Thread):
+    """Background thread taking stack snapshots of every other thread"""
+
+    def __init__(self, interval):
+        super().__init__(name='request-profiler', daemon=True)
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or _is_idle(frame):
+                    continue
+
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack = tuple(reversed(stack))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def build_call_tree(stacks):
+    """Merge sampled stacks (root first) into a nested {name, samples, children} tree"""
+    root = {'name': 'all', 'samples': 0, 'children': {}}
+    for stack, count in stacks.items():
+        root['samples'] += count
+        node = root
+        for label in stack:
+            node = node['children'].setdefault(label, {'name': label, 'samples': 0, 'children': {}})
+            node['samples'] += count
+
+    def finish(node):
+        children = sorted(node['children'].values(), key=lambda child: -child['samples'])
+        node['children'] = [finish(child) for child in children]
+        return node
+
+    return finish(root)
+
+
+class RequestProfiler:
+    """Opt-in wall-clock sampling profiler for individual HTTP requests.
+
+    A request is profiled when it carries the trigger header or falls in the
+    sampled fraction of traffic. While it is in flight a background thread
+    snapshots every thread's Python stack (event loop, to_thread workers)
+    every `interval_ms`, so pandas, sklearn and HTTP time all show up. Only
+    one request is profiled at a time; finished profiles are kept in a
+    bounded ring buffer.
+
+    sys._current_frames() cannot tell requests apart: whatever other
+    requests run while the profiled one is in flight is sampled into its
+    profile too. Profile on a quiet instance for a clean picture.
+    """
+
+    def __init__(self, sample_rate=0.0, interval_ms=5.0, max_profiles=20, trigger_header='x-profile'):
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.trigger_header = trigger_header.lower().encode('latin-1')
+
+        self.profiles = deque(maxlen=max_profiles)
+        self._busy = threading.Lock()
+
+    def should_profile(self, scope):
+        for name, value in scope.get('headers', ()):
+            if name == self.trigger_header and value not in (b'', b'0', b'false'):
+                return 'header'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    def get(self, profile_id):
+        for profile in self.profiles:
+            if profile['profile_id'] == profile_id:
+                return profile
+        return None
+
+    def list(self):
+        # Summaries only; the call trees can be large
+        return [
+            {key: value for key, value in profile.items() if key not in ('call_tree', 'stacks')}
+            for profile in reversed(self.profiles)
+        ]
+
+    def start(self):
+        if not self._busy.acquire(blocking=False):
+            return None
+        sampler = _Sampler(self.interval)
+        sampler.start()
+        return sampler
+
+    def finish(self, sampler, profile_id, trigger, scope, status, started_at, duration):
+        """Stop the sampler and store the profile; joins a thread and builds the tree, so call it off the loop"""
+        sampler.stop()
+        self._busy.release()
+
+        self.profiles.append({
+            'profile_id': profile_id,
+            'method': scope['method'],
+            'path': scope['path'],
+            'query': scope.get('query_string', b'').decode('latin-1'),
+            'status': status,
+            'trigger': trigger,
+            'started_at': started_at,
+            'duration_ms': round(duration * 1000, 2),
+            'interval_ms': self.interval * 1000,
+            'samples': sampler.samples,
+            'stacks': sampler.stacks,
+            'call_tree': build_call_tree(sampler.stacks)
+        })
+
+
+def collapsed_stacks(profile):
+    """Profile as folded stacks ('a;b;c 12' per line) for flamegraph.pl or speedscope"""
+    lines = [';'.join(stack) + f" {count}" for stack, count in profile['stacks'].items()]
+    return '\n'.join(sorted(lines)) + '\n'
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that wraps triggered requests in a RequestProfiler run.
+
+    Only installed when profiling is enabled, so it costs nothing otherwise.
+    Stopping the sampler and building the call tree run in a worker thread,
+    so other requests are not held up while a profile is stored.
+    """
+
+    def __init__(self, app, profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self.profiler.should_profile(scope)
+        sampler = self.profiler.start() if trigger else None
+        if sampler is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        started, started_at = time.perf_counter(), datetime.now()
+        status = [500]
+
+        async def send_with_profile_id(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+                message['headers'] = list(message.get('headers', [])) + [(b'x-profile-id', profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            duration = time.perf_counter() - started
+            await asyncio.to_thread(
+                self.profiler.finish, sampler, profile_id, trigger, scope, status[0], started_at, duration
+            )
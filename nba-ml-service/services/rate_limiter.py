@@ -0,0 +1,68 @@
+# services/rate_limiter.py
+import asyncio
+import random
+import time
+
+# Upstream responses worth retrying: throttling and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucketLimiter:
+    """Async token bucket that adapts its refill rate to upstream pushback.
+
+    Each request takes one token; tokens refill at `rate` per second up to
+    `burst`. `penalize()` halves the rate after a 429/5xx and `reward()`
+    climbs back towards the configured rate on every success (AIMD), so a
+    crawl slows down by itself when stats.nba.com starts throttling.
+    """
+
+    def __init__(self, rate=3.0, burst=5, min_rate=0.25, recovery_step=0.05):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = burst
+        self.recovery_step = recovery_step
+
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def penalize(self):
+        """Upstream pushed back: halve the rate and drain the burst"""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = min(self.tokens, 0.0)
+
+    def reward(self):
+        """Successful call: recover a step towards the configured rate"""
+        if self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate * self.recovery_step)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0, retry_after=None):
+    """Exponential backoff with full jitter, honouring a Retry-After header"""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    if retry_after:
+        try:
+            delay = max(delay, min(cap, float(retry_after)))
+        except ValueError:
+            pass
+
+    return delay
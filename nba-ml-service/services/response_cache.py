@@ -0,0 +1,178 @@
+# services/response_cache.py
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+
+# Each entry starts with (stored_at, expires_at); expires_at == 0 means "never"
+_HEADER = struct.Struct('<dd')
+
+
+def current_season(today=None):
+    """Season string ('2024-25') that is in progress, or next up, on a date"""
+    today = today or datetime.now()
+    start_year = today.year if today.month >= 10 else today.year - 1
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+
+def is_closed_season(season, today=None):
+    """True for seasons that finished before the current one started"""
+    try:
+        return int(str(season)[:4]) < int(current_season(today)[:4])
+    except ValueError:
+        return False
+
+
+class ResponseCache:
+    """Content-addressed, compressed disk cache for stats.nba.com responses.
+
+    Entries are keyed on the endpoint plus its canonicalized query params,
+    and on `namespace` when one is set (e.g. the host of a stand-in server,
+    so its responses never pass for stats.nba.com ones).
+    Responses for closed seasons never expire; anything else (the current
+    season, or calls without a Season) expires after `current_season_ttl`
+    seconds unless `endpoint_ttls` overrides it. The least recently used
+    entries are evicted once the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir='cache/nba_api', max_bytes=512 * 1024 * 1024,
+                 current_season_ttl=6 * 3600, endpoint_ttls=None, namespace=None):
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.current_season_ttl = current_season_ttl
+        self.endpoint_ttls = endpoint_ttls or {}
+
+        self.hits = 0
+        self.misses = 0
+
+        self._sizes = None  # path -> bytes, built lazily from disk
+        self._total_bytes = 0
+
+    @staticmethod
+    def key(endpoint, params, namespace=None):
+        """Stable hash of an endpoint and its params ('0' and 0 hash the same)"""
+        entry = {'endpoint': endpoint, 'params': {k: str(v) for k, v in (params or {}).items()}}
+        if namespace is not None:
+            # Left out otherwise so existing stats.nba.com entries keep their keys
+            entry['namespace'] = namespace
+        canonical = json.dumps(entry, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, endpoint, params):
+        """Seconds an entry stays fresh, or None if it never expires"""
+        if endpoint in self.endpoint_ttls:
+            return self.endpoint_ttls[endpoint]
+
+        season = (params or {}).get('Season')
+        if season and is_closed_season(season):
+            return None
+
+        return self.current_season_ttl
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.bin")
+
+    def _load_index(self):
+        if self._sizes is not None:
+            return
+
+        self._sizes = {}
+        if os.path.isdir(self.cache_dir):
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if name.endswith('.bin'):
+                        path = os.path.join(root, name)
+                        self._sizes[path] = os.path.getsize(path)
+        self._total_bytes = sum(self._sizes.values())
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        self._total_bytes -= self._sizes.pop(path, 0)
+
+    def get(self, endpoint, params):
+        """Cached response body, or None on a miss, an expired entry or a corrupt one"""
+        self._load_index()
+        path = self._path(self.key(endpoint, params, self.namespace))
+
+        try:
+            with open(path, 'rb') as f:
+                _, expires_at = _HEADER.unpack(f.read(_HEADER.size))
+                compressed = f.read()
+
+            if expires_at and expires_at < time.time():
+                self._remove(path)
+                self.misses += 1
+                return None
+
+            content = zlib.decompress(compressed)
+            # Touch the file so eviction sees it as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (struct.error, zlib.error, OSError):
+            # Truncated or unreadable entry: drop it so the response is fetched and stored again
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return content
+
+    def put(self, endpoint, params, content):
+        """Store a response body (bytes)"""
+        self._load_index()
+        path = self._path(self.key(endpoint, params, self.namespace))
+
+        ttl = self.ttl_for(endpoint, params)
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else 0.0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file first so readers never see half an entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(now, expires_at))
+            f.write(zlib.compress(content, 6))
+        os.replace(tmp_path, path)
+
+        self._total_bytes -= self._sizes.get(path, 0)
+        self._sizes[path] = os.path.getsize(path)
+        self._total_bytes += self._sizes[path]
+
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self, target_ratio=0.9):
+        """Drop least recently used entries until the cache is under its budget"""
+        self._load_index()
+        target_bytes = self.max_bytes * target_ratio
+
+        by_last_use = sorted(
+            self._sizes,
+            key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0
+        )
+        for path in by_last_use:
+            if self._total_bytes <= target_bytes:
+                break
+            self._remove(path)
+
+    def stats(self):
+        self._load_index()
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._sizes),
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
@@ -0,0 +1,107 @@
+# services/synthetic_data.py
+import numpy as np
+import pandas as pd
+
+from services.feature_builder import TRAINING_COLUMNS, MIN_PRIOR_GAMES
+
+# Synthetic rows per player built from a season line
+MAX_EXAMPLES_PER_PLAYER = 40
+
+# Days of rest before a game and how often they occur
+REST_DAYS = np.array([0, 1, 2, 3])
+REST_DAY_PROBABILITIES = [0.1, 0.7, 0.15, 0.05]
+
+# Generated players get ids far away from real NBA ids
+SYNTHETIC_PLAYER_ID_OFFSET = 20_000_000
+
+
+def synthetic_rows(player_ids, avg_points, avg_rebounds, avg_assists, n_games, rng, first_game=MIN_PRIOR_GAMES):
+    """Synthetic training rows for many players at once, n_games[i] of them for player i.
+
+    Each row varies the player's recent form by ~15% around the season
+    averages and the game's actual stats by ~25%, all drawn in bulk from `rng`.
+    """
+    n_games = np.asarray(n_games, dtype=np.int64)
+    n_rows = int(n_games.sum())
+
+    player_index = np.repeat(np.arange(len(n_games)), n_games)
+    block_starts = np.repeat(np.cumsum(n_games) - n_games, n_games)
+
+    pts = np.asarray(avg_points, dtype=np.float64)[player_index]
+    reb = np.asarray(avg_rebounds, dtype=np.float64)[player_index]
+    ast = np.asarray(avg_assists, dtype=np.float64)[player_index]
+
+    form_variation = rng.normal(0, 0.15, n_rows)
+    game_variation = rng.normal(0, 0.25, n_rows)
+
+    def varied(values, variation):
+        return np.round(np.maximum(values * (1 + variation), 0), 1)
+
+    return pd.DataFrame({
+        'player_id': np.asarray(player_ids, dtype=np.int64)[player_index],
+        'season_avg_points': np.round(pts, 1),
+        'season_avg_rebounds': np.round(reb, 1),
+        'season_avg_assists': np.round(ast, 1),
+        'last_10_avg_points': varied(pts, form_variation * 0.7),
+        'last_5_avg_points': varied(pts, form_variation),
+        'last_5_avg_rebounds': varied(reb, form_variation),
+        'last_5_avg_assists': varied(ast, form_variation),
+        'home_vs_away': rng.integers(0, 2, n_rows),
+        'games_played': first_game + np.arange(n_rows) - block_starts,
+        'rest_days': rng.choice(REST_DAYS, size=n_rows, p=REST_DAY_PROBABILITIES),
+        'actual_points': varied(pts, game_variation),
+        'actual_rebounds': varied(reb, game_variation),
+        'actual_assists': varied(ast, game_variation)
+    }, columns=TRAINING_COLUMNS)
+
+
+def training_examples_from_season_stats(player_stats_df, rng):
+    """Synthetic rows from leaguedashplayerstats season averages (players with 10+ games)"""
+    active_players = player_stats_df[player_stats_df['GP'] > 10]
+
+    def column(name):
+        return pd.to_numeric(active_players[name], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+
+    pts, reb, ast, games_played = column('PTS'), column('REB'), column('AST'), column('GP')
+
+    # Skip players with very low stats (bench warmers)
+    keep = ~((pts < 5) & (reb < 3) & (ast < 2))
+    n_games = np.minimum(games_played[keep].astype(np.int64) - MIN_PRIOR_GAMES, MAX_EXAMPLES_PER_PLAYER)
+
+    return synthetic_rows(
+        active_players['PLAYER_ID'].to_numpy()[keep], pts[keep], reb[keep], ast[keep], n_games, rng
+    )
+
+
+def random_season_averages(n_players, rng):
+    """Plausible points/rebounds/assists per game for made-up players"""
+    pts = np.clip(rng.gamma(2.5, 5.0, n_players), 2, 35)
+    reb = np.clip(0.25 * pts + rng.gamma(2.0, 1.2, n_players), 0.5, 15)
+    ast = np.clip(rng.gamma(1.5, 2.0, n_players), 0.2, 12)
+    return pts, reb, ast
+
+
+def iter_synthetic_training_data(n_players, games_per_player=MAX_EXAMPLES_PER_PLAYER, seed=0,
+                                 chunk_rows=1_000_000, first_player_id=SYNTHETIC_PLAYER_ID_OFFSET):
+    """Yield synthetic training frames of about chunk_rows rows for n_players made-up players.
+
+    The same seed and chunk size always produce the same rows; memory use is
+    bounded by one chunk however many rows are generated in total.
+    """
+    rng = np.random.default_rng(seed)
+    players_per_chunk = max(1, chunk_rows // games_per_player)
+
+    for start in range(0, n_players, players_per_chunk):
+        n_chunk_players = min(players_per_chunk, n_players - start)
+        pts, reb, ast = random_season_averages(n_chunk_players, rng)
+        yield synthetic_rows(
+            first_player_id + start + np.arange(n_chunk_players), pts, reb, ast,
+            np.full(n_chunk_players, games_per_player), rng
+        )
+
+
+def generate_synthetic_training_data(n_players, games_per_player=MAX_EXAMPLES_PER_PLAYER, seed=0, chunk_rows=1_000_000):
+    """All of iter_synthetic_training_data's rows in one frame"""
+    return pd.concat(
+        iter_synthetic_training_data(n_players, games_per_player, seed, chunk_rows), ignore_index=True
+    )
@@ -0,0 +1,180 @@
+# services/training_jobs.py
+import asyncio
+import multiprocessing
+import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from services.ml_trainer import extend_forest, fit_forest
+
+
+class TrainingJobManager:
+    """Runs model training as background jobs on a process pool.
+
+    Each forest (one per target, or one multi-output forest) is fitted in its
+    own worker process at the same time, with the machine's cores split
+    between them for tree building. The event loop only awaits the futures,
+    so prediction traffic keeps flowing while a retrain is in progress.
+    """
+
+    def __init__(self, max_workers=3, max_jobs_kept=20):
+        self.max_workers = max_workers
+        self.max_jobs_kept = max_jobs_kept
+
+        self.jobs = OrderedDict()
+        self._executor = None
+        self._tasks = set()
+
+    def start(self):
+        if self._executor is None:
+            # Forking this process would copy the locks its batcher, profiler and httpx threads may hold
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context('forkserver')
+            )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def has_active_job(self):
+        return any(job['status'] in ('queued', 'running') for job in self.jobs.values())
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return list(reversed(self.jobs.values()))
+
+    def submit(self, trainer, training_df, save_prefix=None, on_complete=None, data_snapshot=None):
+        """Queue a training job and return its record right away"""
+        job = self._new_job('train', len(training_df))
+        work = self._train(job, trainer, training_df, data_snapshot)
+        self._schedule(self._run(job, work, trainer, save_prefix, on_complete))
+        return job
+
+    def submit_update(self, trainer, new_training_df, n_new_trees=10, history_df=None,
+                      save_prefix=None, on_complete=None, data_snapshot=None):
+        """Queue an incremental update of the serving forests with rows they have not seen"""
+        job = self._new_job('update', len(new_training_df))
+        job['update'] = None
+        work = self._update(job, trainer, new_training_df, n_new_trees, history_df, data_snapshot)
+        self._schedule(self._run(job, work, trainer, save_prefix, on_complete))
+        return job
+
+    def _new_job(self, kind, training_examples):
+        self.start()
+
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            'job_id': job_id,
+            'kind': kind,
+            'status': 'queued',
+            'progress': 0.0,
+            'fits_completed': 0,
+            'fits_total': None,
+            'training_examples': training_examples,
+            'submitted_at': datetime.now(),
+            'started_at': None,
+            'finished_at': None,
+            'metrics': None,
+            'saved_models': None,
+            'compact_model': None,
+            'model_version': None,
+            'error': None
+        }
+        self.jobs[job_id] = job
+
+        # Only keep the most recent jobs around
+        while len(self.jobs) > self.max_jobs_kept:
+            self.jobs.popitem(last=False)
+
+        return job
+
+    def _schedule(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fit_all(self, job, calls):
+        """Run (function, *args) calls in the worker processes at the same time"""
+        loop = asyncio.get_running_loop()
+        job['fits_total'] = len(calls)
+
+        async def fit(function, *args):
+            result = await loop.run_in_executor(self._executor, function, *args)
+            job['fits_completed'] += 1
+            # Scoring and swapping in take the last slice of progress
+            job['progress'] = round(0.9 * job['fits_completed'] / job['fits_total'], 2)
+            return result
+
+        return await asyncio.gather(*(fit(*call) for call in calls))
+
+    async def _train(self, job, trainer, training_df, data_snapshot):
+        fit_tasks = await asyncio.to_thread(trainer.plan_training, training_df)
+
+        # Split the cores between forests that train at the same time
+        n_jobs = max(1, (os.cpu_count() or 1) // len(fit_tasks))
+
+        for task in fit_tasks:
+            print(f"Training {task['name']} model in a worker process...")
+        fitted = await self._fit_all(job, [
+            (fit_forest, task['X_train'], task['y_train'], trainer.model_params, n_jobs)
+            for task in fit_tasks
+        ])
+
+        # Scores the test splits and hot-swaps the new models in
+        return await asyncio.to_thread(trainer.finish_training, fit_tasks, fitted, data_snapshot)
+
+    async def _update(self, job, trainer, new_training_df, n_new_trees, history_df, data_snapshot):
+        update_tasks, full_tasks = await asyncio.to_thread(trainer.plan_update, new_training_df, history_df)
+        full_tasks = full_tasks or []
+
+        n_jobs = max(1, (os.cpu_count() or 1) // (2 * len(update_tasks) + len(full_tasks)))
+
+        for task in update_tasks:
+            print(f"Extending {task['name']} model with {n_new_trees} trees in a worker process...")
+        # Each forest is extended twice: on the train split to score it, and on every new row to serve it
+        results = await self._fit_all(job, [
+            (extend_forest, task['model'], task['X_train'], task['y_train'], n_new_trees, n_jobs)
+            for task in update_tasks
+        ] + [
+            (extend_forest, task['model'], task['X_new'], task['y_new'], n_new_trees, n_jobs)
+            for task in update_tasks
+        ] + [
+            (fit_forest, task['X_train'], task['y_train'], trainer.model_params, n_jobs)
+            for task in full_tasks
+        ])
+        n_tasks = len(update_tasks)
+        evaluated, fitted, full_fitted = results[:n_tasks], results[n_tasks:2 * n_tasks], results[2 * n_tasks:]
+
+        # Compares against the current forests (and the full retrain), then hot-swaps
+        report = await asyncio.to_thread(
+            trainer.finish_update, update_tasks, evaluated, fitted, n_new_trees, full_fitted or None, data_snapshot
+        )
+        job['update'] = report
+        return {stat_name: stat_report['recent']['updated'] for stat_name, stat_report in report['stats'].items()}
+
+    async def _run(self, job, work, trainer, save_prefix, on_complete):
+        job.update(status='running', started_at=datetime.now())
+
+        try:
+            job['metrics'] = await work
+            job['model_version'] = trainer.model_version
+
+            if save_prefix:
+                job['saved_models'] = await asyncio.to_thread(trainer.save_models, save_prefix)
+                job['compact_model'] = trainer.compact_report
+
+            if on_complete is not None:
+                on_complete(job)
+
+            job.update(status='completed', progress=1.0)
+            print(f"✅ Training job {job['job_id']} completed")
+        except Exception as e:
+            job.update(status='failed', error=str(e))
+            print(f"❌ Training job {job['job_id']} failed: {e}")
+        finally:
+            job['finished_at'] = datetime.now()
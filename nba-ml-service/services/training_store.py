@@ -0,0 +1,189 @@
+# services/training_store.py
+import os
+import shutil
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+# Compact on-disk dtypes; anything not listed keeps its pandas dtype
+FLOAT_COLUMNS = [
+    'season_avg_points', 'season_avg_rebounds', 'season_avg_assists',
+    'last_10_avg_points', 'last_5_avg_points',
+    'last_5_avg_rebounds', 'last_5_avg_assists'
+]
+SMALL_INT_COLUMNS = {
+    'player_id': np.int32,
+    'home_vs_away': np.int8,
+    'games_played': np.int16,
+    'rest_days': np.int8
+}
+TARGET_COLUMNS = ['actual_points', 'actual_rebounds', 'actual_assists']
+
+
+def downcast_training_frame(training_df):
+    """Shrink training rows to float32/int16-sized columns before writing"""
+    compact_df = training_df.copy()
+
+    for col in compact_df.columns:
+        if col in FLOAT_COLUMNS:
+            compact_df[col] = compact_df[col].astype(np.float32)
+        elif col in SMALL_INT_COLUMNS:
+            compact_df[col] = compact_df[col].astype(SMALL_INT_COLUMNS[col])
+        elif col in TARGET_COLUMNS:
+            # Real box scores are whole numbers; synthetic targets are fractional
+            if pd.api.types.is_integer_dtype(compact_df[col]):
+                compact_df[col] = compact_df[col].astype(np.int16)
+            else:
+                compact_df[col] = compact_df[col].astype(np.float32)
+
+    return compact_df
+
+
+class TrainingDataStore:
+    """Parquet training store partitioned by season (hive layout: season=2023-24/).
+
+    Each write adds an immutable part file sorted by player_id, so row-group
+    statistics let per-player reads skip most of the data. Reads use column
+    projection and memory-mapped files, and hand player_id back as a
+    categorical column.
+    """
+
+    def __init__(self, root='data/training/real', row_group_size=64 * 1024):
+        self.root = root
+        self.row_group_size = row_group_size
+
+    def _season_dir(self, season):
+        return os.path.join(self.root, f"season={season}")
+
+    def is_empty(self):
+        if not os.path.isdir(self.root):
+            return True
+        return not any(name.endswith('.parquet') for _, _, files in os.walk(self.root) for name in files)
+
+    def write(self, training_df, season=None, overwrite=False):
+        """Write training rows for one season, or split by a 'season' column"""
+        if training_df.empty:
+            return []
+
+        if season is None:
+            written = []
+            for season_value, season_df in training_df.groupby('season', sort=False):
+                written += self.write(season_df.drop(columns='season'), season_value, overwrite)
+            return written
+
+        season_dir = self._season_dir(season)
+        if overwrite and os.path.isdir(season_dir):
+            shutil.rmtree(season_dir)
+        os.makedirs(season_dir, exist_ok=True)
+
+        compact_df = downcast_training_frame(training_df.drop(columns='season', errors='ignore'))
+        if 'player_id' in compact_df.columns:
+            compact_df = compact_df.sort_values('player_id', kind='mergesort')
+
+        table = pa.Table.from_pandas(compact_df, preserve_index=False)
+
+        # Timestamped names keep parts in write order; write then rename so readers never see half a file
+        part_name = f"part-{datetime.now():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}.parquet"
+        path = os.path.join(season_dir, part_name)
+        pq.write_table(table, f"{path}.tmp", row_group_size=self.row_group_size, compression='zstd')
+        os.replace(f"{path}.tmp", path)
+
+        print(f"Wrote {len(compact_df)} training rows to {path}")
+        return [path]
+
+    def part_names(self):
+        """Finished part files relative to the root (season=2023-24/part-....parquet), in write order.
+
+        A list taken before a read names exactly the rows that read can see,
+        so it doubles as a record of which rows a model was trained on.
+        """
+        names = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith('.parquet'):
+                    names.append(os.path.relpath(os.path.join(directory, name), self.root))
+        return sorted(names, key=lambda name: (os.path.basename(name), name))
+
+    def staging(self):
+        """An empty store beside this one to rebuild a season in; swap it in with replace_season()"""
+        staging_root = f"{self.root.rstrip(os.sep)}.rebuild"
+        if os.path.isdir(staging_root):
+            shutil.rmtree(staging_root)
+        return TrainingDataStore(staging_root, self.row_group_size)
+
+    def replace_season(self, season, rebuilt):
+        """Swap a season's parts for the ones written to a staging() store"""
+        season_dir = self._season_dir(season)
+        old_parts = []
+        if os.path.isdir(season_dir):
+            old_parts = [name for name in os.listdir(season_dir) if name.endswith('.parquet')]
+        os.makedirs(season_dir, exist_ok=True)
+
+        rebuilt_dir = rebuilt._season_dir(season)
+        if os.path.isdir(rebuilt_dir):
+            for name in os.listdir(rebuilt_dir):
+                if name.endswith('.parquet'):
+                    os.replace(os.path.join(rebuilt_dir, name), os.path.join(season_dir, name))
+
+        for name in old_parts:
+            os.remove(os.path.join(season_dir, name))
+        shutil.rmtree(rebuilt.root, ignore_errors=True)
+
+    def _dataset(self, parts=None):
+        # Always list the parts: a directory scan would also pick up .tmp files being written
+        parts = self.part_names() if parts is None else parts
+        return ds.dataset(
+            [os.path.join(self.root, name) for name in parts],
+            format='parquet',
+            partitioning='hive',
+            partition_base_dir=self.root,
+            filesystem=fs.LocalFileSystem(use_mmap=True)
+        )
+
+    def read(self, columns=None, seasons=None, player_ids=None, parts=None):
+        """Load training rows, reading only the requested columns/partitions.
+
+        parts restricts the read to those part files (names from part_names(),
+        e.g. the ones stored since the models were trained); parts since
+        removed by an overwrite are skipped.
+        """
+        if self.is_empty():
+            return pd.DataFrame()
+
+        if parts is not None:
+            parts = [name for name in parts if os.path.exists(os.path.join(self.root, name))]
+            if not parts:
+                return pd.DataFrame()
+
+        filters = None
+        if seasons is not None:
+            filters = ds.field('season').isin([str(s) for s in seasons])
+        if player_ids is not None:
+            player_filter = ds.field('player_id').isin([int(p) for p in player_ids])
+            filters = player_filter if filters is None else filters & player_filter
+
+        table = self._dataset(parts).to_table(columns=columns, filter=filters)
+        training_df = table.to_pandas()
+
+        if 'player_id' in training_df.columns:
+            training_df['player_id'] = training_df['player_id'].astype('category')
+        return training_df
+
+    def count_rows(self):
+        if self.is_empty():
+            return 0
+        return self._dataset().count_rows()
+
+    def export_csv(self, path):
+        """Write the whole store out as a single CSV file"""
+        training_df = self.read()
+        if 'player_id' in training_df.columns:
+            training_df['player_id'] = training_df['player_id'].astype(np.int64)
+        training_df.to_csv(path, index=False)
+        return path
@@ -0,0 +1,382 @@
+# services/tree_inference.py
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+# numba is optional: with it installed the per-row traversal is JIT-compiled
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+class CompiledForest:
+    """A fitted sklearn forest flattened into plain NumPy arrays.
+
+    All trees share one set of node arrays (feature, threshold, left, right,
+    value); `roots` holds the index of each tree's root. Leaves point at
+    themselves, so a fixed number of traversal steps (the deepest tree) lands
+    every row on its leaf without per-node branching in Python. A NaN feature
+    goes left at nodes flagged in `missing_left`, exactly like sklearn's
+    missing-value routing.
+    """
+
+    # Arrays written to / mapped from a model set file
+    ARRAY_NAMES = ('feature', 'threshold', 'left', 'right', 'value', 'roots', 'children', 'missing_left')
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, children=None, missing_left=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+
+        # Interleaved (left, right) pairs: the next node is one gather at 2 * node + go_right
+        if children is None:
+            children = np.stack([left, right], axis=1).ravel().astype(np.intp)
+        self.children = children
+
+        # Files written before missing-value routing was exported send NaN right everywhere
+        if missing_left is None:
+            missing_left = np.zeros(len(left), dtype=np.uint8)
+        self.missing_left = missing_left
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_outputs(self):
+        return self.value.shape[1]
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Export a fitted RandomForestRegressor (or a single decision tree)"""
+        estimators = getattr(model, 'estimators_', [model])
+
+        features, thresholds, lefts, rights, values, roots, missing_lefts = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in estimators:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            # Leaves loop back onto themselves; their feature/threshold are never used
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold).astype(np.float64))
+            lefts.append((np.where(is_leaf, node_ids, tree.children_left) + offset).astype(np.int32))
+            rights.append((np.where(is_leaf, node_ids, tree.children_right) + offset).astype(np.int32))
+            values.append(tree.value[:, :, 0].astype(np.float64))
+            missing_lefts.append(np.where(is_leaf, 0, tree.missing_go_to_left).astype(np.uint8))
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            missing_left=np.concatenate(missing_lefts)
+        )
+
+    def predict(self, X, engine='auto'):
+        """Average tree output for each row: shape (n_rows,) or (n_rows, n_outputs)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+
+        if engine == 'numba' or (engine == 'auto' and NUMBA_AVAILABLE):
+            predictions = self._predict_numba(X)
+        else:
+            predictions = self._predict_numpy(X)
+
+        return predictions[:, 0] if self.n_outputs == 1 else predictions
+
+    def _predict_numpy(self, X):
+        n_rows, n_features = X.shape
+
+        # Walk every (row, tree) pair one level per step using flat gathers
+        X_flat = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+        nodes = np.tile(self.roots.astype(np.intp), (n_rows, 1))
+
+        for _ in range(self.max_depth):
+            x = X_flat.take(row_offsets + self.feature.take(nodes))
+            # float32 features vs float64 thresholds compare exactly like sklearn does
+            go_right = ~(x <= self.threshold.take(nodes))
+            missing = np.isnan(x)
+            if missing.any():
+                go_right[missing] = self.missing_left.take(nodes[missing]) == 0
+            nodes = self.children.take(2 * nodes + go_right)
+
+        return self.value.take(nodes, axis=0).mean(axis=1)
+
+    def _predict_numba(self, X):
+        if not NUMBA_AVAILABLE:
+            raise RuntimeError("numba is not installed")
+
+        out = np.zeros((X.shape[0], self.n_outputs), dtype=np.float64)
+        _traverse_numba(
+            X, self.feature, self.threshold, self.left, self.right, self.missing_left, self.value, self.roots, out
+        )
+        return out
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True, nogil=True)
+    def _traverse_numba(X, feature, threshold, left, right, missing_left, value, roots, out):
+        for i in range(X.shape[0]):
+            for t in range(roots.shape[0]):
+                node = roots[t]
+                while left[node] != node:
+                    x = X[i, feature[node]]
+                    if x <= threshold[node]:
+                        node = left[node]
+                    elif x != x and missing_left[node]:
+                        # NaN compares false, so it only gets here
+                        node = left[node]
+                    else:
+                        node = right[node]
+                for k in range(out.shape[1]):
+                    out[i, k] += value[node, k]
+
+        # Summing tree by tree then dividing mirrors sklearn's averaging order
+        out /= roots.shape[0]
+else:
+    _traverse_numba = None
+
+
+# Model set file layout: magic, header length, JSON header, then 64-byte aligned raw arrays
+MODEL_SET_MAGIC = b'NBAFRST1'
+COMPACT_MODEL_SET_MAGIC = b'NBACFST1'
+_HEADER_LENGTH = struct.Struct('<Q')
+_ALIGNMENT = 64
+
+
+def _aligned(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _group_forests(compiled_models):
+    """Unique forests plus, per target, which forest and output column it reads"""
+    forests = {}
+    targets = {}
+    forest_keys = {}
+
+    for output_index, (stat_name, forest) in enumerate(compiled_models.items()):
+        if forest is None:
+            continue
+        if id(forest) not in forest_keys:
+            forest_keys[id(forest)] = f"forest_{len(forests)}"
+            forests[forest_keys[id(forest)]] = forest
+        targets[stat_name] = {
+            'forest': forest_keys[id(forest)],
+            'output': output_index if forest.n_outputs > 1 else 0
+        }
+
+    return forests, targets
+
+
+def _write_model_file(path, magic, forest_arrays, forest_info, targets, feature_columns, metadata):
+    # Lay the arrays out after the header, each on its own aligned offset
+    layout = {}
+    offset = 0
+    for key, arrays in forest_arrays.items():
+        array_layout = {}
+        for name, array in arrays.items():
+            array_layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset = _aligned(offset + array.nbytes)
+        layout[key] = {**forest_info[key], 'arrays': array_layout}
+
+    header = json.dumps({
+        'feature_columns': list(feature_columns),
+        'targets': targets,
+        'forests': layout,
+        'metadata': metadata or {}
+    }).encode('utf-8')
+    data_start = _aligned(len(magic) + _HEADER_LENGTH.size + len(header))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(magic)
+        f.write(_HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        for key, arrays in forest_arrays.items():
+            for name, array in arrays.items():
+                f.seek(data_start + layout[key]['arrays'][name]['offset'])
+                f.write(array.tobytes())
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def save_model_set(path, compiled_models, feature_columns, metadata=None):
+    """Write compiled forests ({stat: CompiledForest}) to one memory-mappable file.
+
+    Targets sharing a multi-output forest share its arrays; each target records
+    which forest and which output column it reads.
+    """
+    forests, targets = _group_forests(compiled_models)
+
+    forest_arrays = {
+        key: {name: np.ascontiguousarray(getattr(forest, name)) for name in CompiledForest.ARRAY_NAMES}
+        for key, forest in forests.items()
+    }
+    forest_info = {key: {'max_depth': int(forest.max_depth)} for key, forest in forests.items()}
+
+    return _write_model_file(path, MODEL_SET_MAGIC, forest_arrays, forest_info, targets, feature_columns, metadata)
+
+
+def _float32_at_most(values):
+    """Largest float32 <= each float64 value.
+
+    For float32 inputs `x <= t` and `x <= _float32_at_most(t)` always agree,
+    so thresholds shrink to half the size without changing a single split.
+    """
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+def _smallest_uint(max_value):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def compact_forest_arrays(forest, leaf_values='table'):
+    """Encode a CompiledForest into the compact arrays of a .cforest file.
+
+    - feature: smallest unsigned int that fits the feature count
+    - threshold: float32, rounded down (exact for float32 features)
+    - left/children: dropped; trees are stored depth-first, so an internal
+      node's left child is always the next node
+    - right: distance to the right child (0 marks a leaf)
+    - missing_left: one bit per node (np.packbits)
+    - value: leaves only. 'table' keeps each distinct leaf output once in a
+      float64 table and stores small integer codes (exact, and duplicate leaves
+      collapse); 'float32' stores the leaf outputs as float32.
+    """
+    node_ids = np.arange(len(forest.right))
+    is_leaf = forest.right == node_ids
+    if not np.array_equal(forest.left[~is_leaf], node_ids[~is_leaf] + 1):
+        raise ValueError("Forest nodes are not in depth-first order; it cannot be stored compactly")
+
+    right_delta = (forest.right - node_ids).astype(np.int64)
+    leaf_outputs = np.asarray(forest.value)[is_leaf]
+
+    arrays = {
+        'feature': np.where(is_leaf, 0, forest.feature).astype(_smallest_uint(int(forest.feature.max(initial=0)))),
+        'threshold': _float32_at_most(np.where(is_leaf, 0.0, np.asarray(forest.threshold, dtype=np.float64))),
+        'right_delta': right_delta.astype(_smallest_uint(int(right_delta.max(initial=0)))),
+        'missing_left_bits': np.packbits(np.asarray(forest.missing_left, dtype=bool)),
+        'roots': np.asarray(forest.roots, dtype=np.int32)
+    }
+
+    if leaf_values == 'table':
+        table, codes = np.unique(leaf_outputs, axis=0, return_inverse=True)
+        arrays['value_table'] = np.ascontiguousarray(table, dtype=np.float64)
+        arrays['leaf_codes'] = codes.reshape(-1).astype(_smallest_uint(len(table) - 1))
+    elif leaf_values == 'float32':
+        arrays['leaf_values'] = np.ascontiguousarray(leaf_outputs, dtype=np.float32)
+    else:
+        raise ValueError(f"Unknown leaf value encoding: {leaf_values}")
+
+    info = {'max_depth': int(forest.max_depth), 'n_outputs': int(forest.n_outputs), 'leaf_values': leaf_values}
+    return arrays, info
+
+
+def expand_compact_forest(arrays, info):
+    """Rebuild a CompiledForest from compact arrays"""
+    right_delta = arrays['right_delta'].astype(np.int32)
+    node_ids = np.arange(len(right_delta), dtype=np.int32)
+    is_leaf = right_delta == 0
+
+    if info['leaf_values'] == 'table':
+        leaf_outputs = arrays['value_table'][arrays['leaf_codes']]
+    else:
+        leaf_outputs = arrays['leaf_values'].astype(np.float64)
+
+    value = np.zeros((len(node_ids), info['n_outputs']), dtype=np.float64)
+    value[is_leaf] = leaf_outputs
+
+    missing_left = None
+    if 'missing_left_bits' in arrays:
+        missing_left = np.unpackbits(arrays['missing_left_bits'], count=len(node_ids))
+
+    return CompiledForest(
+        feature=arrays['feature'].astype(np.int32),
+        threshold=np.asarray(arrays['threshold']),
+        left=np.where(is_leaf, node_ids, node_ids + 1).astype(np.int32),
+        right=node_ids + right_delta,
+        value=value,
+        roots=np.asarray(arrays['roots'], dtype=np.int32),
+        max_depth=info['max_depth'],
+        missing_left=missing_left
+    )
+
+
+def save_compact_model_set(path, compiled_models, feature_columns, metadata=None, leaf_values='table'):
+    """Write compiled forests in the compact .cforest encoding (see compact_forest_arrays)"""
+    forests, targets = _group_forests(compiled_models)
+
+    forest_arrays, forest_info = {}, {}
+    for key, forest in forests.items():
+        forest_arrays[key], forest_info[key] = compact_forest_arrays(forest, leaf_values)
+
+    return _write_model_file(path, COMPACT_MODEL_SET_MAGIC, forest_arrays, forest_info, targets, feature_columns, metadata)
+
+
+def load_model_set(path):
+    """Map a model set file read-only and rebuild its forests.
+
+    Full (.forest) files come back as zero-copy views: every process that
+    loads the same file shares its pages through the OS page cache, so extra
+    workers add almost no resident memory for the trees. Compact (.cforest)
+    files are expanded into fresh arrays. Returns (compiled_models,
+    feature_columns, metadata).
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic = mapped[:len(MODEL_SET_MAGIC)]
+    if magic not in (MODEL_SET_MAGIC, COMPACT_MODEL_SET_MAGIC):
+        raise ValueError(f"{path} is not a compiled model set file")
+
+    header_start = len(magic) + _HEADER_LENGTH.size
+    (header_length,) = _HEADER_LENGTH.unpack_from(mapped, len(magic))
+    header = json.loads(mapped[header_start:header_start + header_length].decode('utf-8'))
+    data_start = _aligned(header_start + header_length)
+
+    forests = {}
+    for key, layout in header['forests'].items():
+        arrays = {}
+        for name, info in layout['arrays'].items():
+            dtype = np.dtype(info['dtype'])
+            count = int(np.prod(info['shape']))
+            array = np.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + info['offset'])
+            arrays[name] = array.reshape(info['shape'])
+
+        if magic == COMPACT_MODEL_SET_MAGIC:
+            forests[key] = expand_compact_forest(arrays, layout)
+        else:
+            forests[key] = CompiledForest(max_depth=layout['max_depth'], **arrays)
+
+    compiled_models = {
+        stat_name: forests[target['forest']]
+        for stat_name, target in header['targets'].items()
+    }
+    return compiled_models, header['feature_columns'], header['metadata']
@@ -0,0 +1,26 @@
+# tests/test_batch_predict.py
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_batch_predict_accepts_a_json_list(monkeypatch):
+    scored = []
+
+    def predict_batch(features_list):
+        scored.append(features_list)
+        return [{'points': features['season_avg_points'] * 2} for features in features_list]
+
+    monkeypatch.setattr(main.trainer, 'is_ready', lambda: True)
+    monkeypatch.setattr(main.trainer, 'predict_batch', predict_batch)
+
+    players = [{'player_id': 1, 'season_avg_points': 10.0}, {'player_id': 2, 'season_avg_points': 3.5}]
+    response = TestClient(main.app).post('/batch-predict', json=players)
+
+    assert response.status_code == 200
+    assert response.json() == {'batch_predictions': [
+        {'player_id': 1, 'predictions': {'points': 20.0}},
+        {'player_id': 2, 'predictions': {'points': 7.0}}
+    ]}
+    # One model call for the whole slate
+    assert scored == [players]
@@ -0,0 +1,57 @@
+# tests/test_batcher.py
+import asyncio
+
+import pytest
+
+from services.batcher import PredictionBatcher
+
+
+def predict_batch(features_list):
+    # Fails the whole call on one bad row, like building the float32 matrix does
+    return [{'points': float(features['season_avg_points']) * 2} for features in features_list]
+
+
+async def predict_concurrently(batcher, features_list):
+    batcher.start()
+    try:
+        return await asyncio.gather(
+            *(batcher.predict(features) for features in features_list), return_exceptions=True
+        )
+    finally:
+        await batcher.stop()
+
+
+def test_batches_concurrent_requests():
+    batcher = PredictionBatcher(predict_batch, max_wait_ms=20)
+    results = asyncio.run(predict_concurrently(batcher, [{'season_avg_points': i} for i in range(5)]))
+
+    assert results == [{'points': i * 2.0} for i in range(5)]
+    assert batcher.batches == 1
+    assert batcher.batch_fallbacks == 0
+
+
+def test_bad_row_fails_only_its_own_caller():
+    batcher = PredictionBatcher(predict_batch, max_wait_ms=20)
+    good, bad = {'season_avg_points': 10}, {'season_avg_points': 'abc'}
+    results = asyncio.run(predict_concurrently(batcher, [good, bad, {'season_avg_points': 3}]))
+
+    assert results[0] == {'points': 20.0}
+    assert isinstance(results[1], ValueError)
+    assert results[2] == {'points': 6.0}
+    assert batcher.batches == 1
+    assert batcher.batch_fallbacks == 1
+
+
+def test_full_queue_rejects():
+    async def scenario():
+        batcher = PredictionBatcher(predict_batch, max_queue_depth=1)
+        batcher.start()
+        first = asyncio.ensure_future(batcher.predict({'season_avg_points': 1}))
+        second = asyncio.ensure_future(batcher.predict({'season_avg_points': 2}))
+        with pytest.raises(asyncio.QueueFull):
+            await second
+        await first
+        await batcher.stop()
+        return batcher.rejected
+
+    assert asyncio.run(scenario()) == 1
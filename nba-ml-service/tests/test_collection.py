@@ -0,0 +1,98 @@
+# tests/test_collection.py
+import asyncio
+
+import pandas as pd
+import pytest
+
+from services.collection import stream_real_game_collection
+from services.feature_builder import build_training_rows
+from services.feature_store import PlayerFeatureStore
+from services.game_log_store import GameLogStore
+from services.training_store import TrainingDataStore
+
+PLAYERS = [(player_id, f"Player {player_id}") for player_id in range(1, 5)]
+
+
+def game_logs(player_id, n_games):
+    dates = pd.date_range('2023-10-24', periods=n_games, freq='2D')
+    return pd.DataFrame({
+        'Game_ID': [f"{player_id}{i:05d}" for i in range(n_games)],
+        'GAME_DATE': dates.strftime('%b %d, %Y').str.upper(),
+        'MATCHUP': 'LAL vs. BOS',
+        'PTS': [20 + player_id + i % 3 for i in range(n_games)], 'REB': 5, 'AST': 5,
+        'PLAYER_ID': player_id
+    })
+
+
+class FakeCollector:
+    """Serves n_games per player, honouring date_from, and can fail partway through the crawl"""
+
+    def __init__(self, n_games, fail_at=None):
+        self.n_games = n_games
+        self.fail_at = fail_at
+
+    async def get_active_players(self, season, max_players):
+        return PLAYERS
+
+    async def iter_game_logs(self, players, season, date_from=None):
+        for i, (player_id, player_name) in enumerate(players):
+            if i == self.fail_at:
+                raise RuntimeError("crawl interrupted")
+            logs = game_logs(player_id, self.n_games)
+            if date_from and player_id in date_from:
+                logs = logs[pd.to_datetime(logs['GAME_DATE'], format='%b %d, %Y') >= date_from[player_id]]
+            yield player_id, player_name, logs
+
+    def process_training_data(self, season_df):
+        return build_training_rows(season_df)
+
+
+@pytest.fixture
+def stores(tmp_path):
+    return (
+        GameLogStore(str(tmp_path / 'game_logs')),
+        TrainingDataStore(str(tmp_path / 'training')),
+        PlayerFeatureStore(str(tmp_path / 'features.json'))
+    )
+
+
+def collect(collector, stores, full_refresh=False):
+    async def run():
+        events = [event async for event in stream_real_game_collection(
+            collector, '2023-24', *stores, full_refresh=full_refresh, flush_every=2
+        )]
+        return events[-1]
+    return asyncio.run(run())
+
+
+def features(feature_store):
+    return {player_id: feature_store.get_features(player_id) for player_id, _ in PLAYERS}
+
+
+def test_failed_full_collection_leaves_every_store_as_it_was(stores):
+    game_log_store, training_store, feature_store = stores
+    assert collect(FakeCollector(12), stores)['event'] == 'completed'
+    before = (len(game_log_store.load()), training_store.part_names(), features(feature_store))
+
+    with pytest.raises(RuntimeError):
+        collect(FakeCollector(30, fail_at=2), stores, full_refresh=True)
+
+    assert (len(game_log_store.load()), training_store.part_names(), features(feature_store)) == before
+
+
+def test_failed_incremental_refresh_fetches_its_games_again(stores):
+    game_log_store, training_store, feature_store = stores
+    collect(FakeCollector(12), stores)
+
+    with pytest.raises(RuntimeError):
+        collect(FakeCollector(15, fail_at=2), stores)
+    assert game_log_store.last_game_date(1) == pd.Timestamp('2023-11-15')
+
+    assert collect(FakeCollector(15), stores)['new_games'] == 3 * len(PLAYERS)
+
+    # Same rows and features as collecting all 15 games at once
+    all_logs = pd.concat([game_logs(player_id, 15) for player_id, _ in PLAYERS], ignore_index=True)
+    assert len(training_store.read()) == len(build_training_rows(all_logs))
+    rebuilt = PlayerFeatureStore()
+    rebuilt.rebuild(all_logs)
+    assert features(feature_store) == features(rebuilt)
@@ -0,0 +1,58 @@
+# tests/test_game_log_store.py
+import os
+
+import pandas as pd
+
+from services.game_log_store import GameLogStore
+
+
+def game_logs(player_id, dates, first_game=0):
+    return pd.DataFrame({
+        'Game_ID': [f"00223{first_game + i:05d}" for i in range(len(dates))],
+        'GAME_DATE': dates,
+        'MATCHUP': 'LAL vs. BOS',
+        'PTS': 20, 'REB': 5, 'AST': 5,
+        'PLAYER_ID': player_id
+    })
+
+
+def test_append_keeps_only_games_after_the_last_stored_date(tmp_path):
+    store = GameLogStore(str(tmp_path))
+    store.append(game_logs(1, ['OCT 24, 2023', 'OCT 26, 2023']))
+    store.append(game_logs(2, ['OCT 25, 2023']))
+
+    # A fresh instance reads the persisted index, not the logs
+    store = GameLogStore(str(tmp_path))
+    assert store.last_game_date(1) == pd.Timestamp('2023-10-26')
+
+    stored = store.append(game_logs(1, ['OCT 24, 2023', 'OCT 26, 2023', 'OCT 28, 2023']))
+    assert stored['GAME_DATE'].tolist() == ['OCT 28, 2023']
+    assert store.last_game_date(1) == pd.Timestamp('2023-10-28')
+
+    assert len(store.load([1])) == 3
+    assert len(store.load()) == 4
+
+
+def test_legacy_single_file_is_split_per_player(tmp_path):
+    legacy = pd.concat([game_logs(1, ['OCT 24, 2023']), game_logs(2, ['OCT 25, 2023'], first_game=1)])
+    legacy.to_csv(tmp_path / 'game_logs.csv', index=False)
+
+    store = GameLogStore(str(tmp_path))
+    assert store.last_game_date(2) == pd.Timestamp('2023-10-25')
+    assert len(store.load([2])) == 1
+    assert not os.path.exists(tmp_path / 'game_logs.csv')
+
+
+def test_staged_rebuild_replaces_the_store_only_when_swapped_in(tmp_path):
+    store = GameLogStore(str(tmp_path / 'game_logs'))
+    store.append(game_logs(1, ['OCT 24, 2023', 'OCT 26, 2023']))
+
+    rebuilt = store.staging()
+    rebuilt.append(game_logs(2, ['OCT 25, 2023']))
+    # Until the swap the live store still serves the old logs
+    assert GameLogStore(str(tmp_path / 'game_logs')).load()['PLAYER_ID'].tolist() == [1, 1]
+
+    store.replace(rebuilt)
+    assert store.load()['PLAYER_ID'].tolist() == [2]
+    assert GameLogStore(str(tmp_path / 'game_logs')).last_game_date(1) is None
+    assert sorted(os.listdir(tmp_path)) == ['game_logs']
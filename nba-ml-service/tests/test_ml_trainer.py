@@ -0,0 +1,94 @@
+# tests/test_ml_trainer.py
+import os
+
+import pandas as pd
+import pytest
+
+from services.inference import FEATURE_COLUMNS, CompiledModelSet
+from services.ml_trainer import NBAMLTrainer
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'real_nba_training_data.csv')
+
+
+@pytest.fixture(scope='module')
+def training_df():
+    return pd.read_csv(DATA_PATH)
+
+
+@pytest.fixture
+def models_dir(tmp_path, monkeypatch):
+    # The trainer saves to and loads from models/ under the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / 'models'
+
+
+def train(training_df, multi_output=False, **kwargs):
+    trainer = NBAMLTrainer(multi_output=multi_output, **kwargs)
+    trainer.model_params.update(n_estimators=8, n_jobs=1)
+    trainer.train_models(training_df)
+    return trainer
+
+
+def test_saving_one_layout_removes_the_other(training_df, models_dir):
+    train(training_df, multi_output=True).save_models('models')
+    assert (models_dir / 'models_multi.joblib').exists()
+
+    per_target = train(training_df)
+    per_target.save_models('models')
+    assert sorted(path.name for path in models_dir.glob('*.joblib')) == [
+        'models_assists.joblib', 'models_points.joblib', 'models_rebounds.joblib'
+    ]
+    assert per_target.compact_report['joblib_bytes'] == sum(
+        path.stat().st_size for path in models_dir.glob('*.joblib')
+    )
+
+    # A multi-output trainer loads the per-target set just saved, not the stale shared forest
+    loaded = NBAMLTrainer(multi_output=True)
+    assert loaded.load_models('models')
+    assert not loaded.is_multi_output_loaded()
+
+    train(training_df, multi_output=True).save_models('models')
+    assert [path.name for path in models_dir.glob('*.joblib')] == ['models_multi.joblib']
+
+
+@pytest.mark.parametrize('multi_output', [False, True])
+def test_updated_models_serve_the_same_predictions_after_export_and_reload(training_df, models_dir, multi_output):
+    history_df, new_df = training_df.iloc[:1400], training_df.iloc[1400:]
+    features_list = training_df[FEATURE_COLUMNS].iloc[::50].to_dict('records')
+    trainer = train(history_df, multi_output=multi_output)
+    before_update = trainer.predict_batch(features_list)
+    trainer.update_models(new_df, n_new_trees=4)
+    trainer.save_models('models')
+
+    expected = trainer.predict_batch(features_list)
+    assert expected != before_update
+
+    reloaded = {}
+    for use_mmap in (False, True):
+        loaded = NBAMLTrainer(multi_output=multi_output, prediction_cache_size=0)
+        assert loaded.load_models('models', use_mmap=use_mmap)
+        reloaded['mmap' if use_mmap else 'joblib'] = loaded.predict_batch(features_list)
+    for extension in ('forest', 'cforest'):
+        model_set = CompiledModelSet(prediction_cache_size=0)
+        assert model_set.load(str(models_dir / f"models.{extension}"))
+        reloaded[extension] = model_set.predict_batch(features_list)
+
+    assert reloaded == {source: expected for source in reloaded}
+
+
+def test_incomplete_reload_keeps_serving_the_current_models(training_df, models_dir):
+    trainer = train(training_df)
+    trainer.save_models('current')
+    trainer.save_models('broken')
+    os.remove(models_dir / 'broken_rebounds.joblib')
+
+    serving = NBAMLTrainer(prediction_cache_size=0)
+    assert not serving.is_ready()
+    assert serving.load_models('current')
+    version = serving.model_version
+    features = training_df[FEATURE_COLUMNS].iloc[0].to_dict()
+    prediction = serving.predict(features)
+
+    assert serving.load_models('broken') == []
+    assert serving.model_version == version
+    assert serving.predict(features) == prediction == trainer.predict(features)
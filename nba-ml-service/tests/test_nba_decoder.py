@@ -0,0 +1,31 @@
+# tests/test_nba_decoder.py
+import json
+
+import numpy as np
+
+from services.nba_decoder import decode_result_set, rows_to_frame
+
+HEADERS = ['Player_ID', 'Game_ID', 'GAME_DATE', 'PTS', 'PLUS_MINUS']
+
+
+def test_playergamelog_columns_are_typed():
+    body = json.dumps({'resultSets': [{'headers': HEADERS, 'rowSet': [
+        [2544, '0022300001', 'OCT 24, 2023', 21, 5.0],
+        [2544, '0022300015', 'OCT 26, 2023', 30, -2.0]
+    ]}]}).encode()
+
+    frame = decode_result_set(body, 'playergamelog')
+
+    assert frame['PTS'].dtype == np.int64
+    assert frame['GAME_DATE'].dtype.kind == 'M'
+    assert frame['Game_ID'].tolist() == ['0022300001', '0022300015']
+
+
+def test_int_column_with_floats_or_nulls_stays_float():
+    schema = {'PTS': 'int'}
+
+    fractional = rows_to_frame(['PTS'], [[1.5], [2.0]], schema)
+    assert fractional['PTS'].tolist() == [1.5, 2.0]
+
+    with_null = rows_to_frame(['PTS'], [[None], [2]], schema)
+    assert np.isnan(with_null['PTS'][0]) and with_null['PTS'][1] == 2.0
@@ -0,0 +1,48 @@
+# tests/test_prediction_cache.py
+import os
+
+import pandas as pd
+
+from services.inference import FEATURE_COLUMNS
+from services.ml_trainer import NBAMLTrainer
+from services.prediction_cache import PredictionCache
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'real_nba_training_data.csv')
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('services.prediction_cache.time.monotonic', lambda: now[0])
+    cache = PredictionCache(max_entries=2, ttl_seconds=10)
+
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)  # 'b' is now the least recently used
+    assert cache.get('b') is None
+    assert cache.evictions == 1
+
+    now[0] += 11
+    assert cache.get('a') is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_model_swap_invalidates_cached_predictions():
+    training_df = pd.read_csv(DATA_PATH)
+    trainer = NBAMLTrainer(prediction_cache_size=100)
+    trainer.model_params.update(n_estimators=8, n_jobs=1)
+    trainer.train_models(training_df)
+    features = training_df[FEATURE_COLUMNS].iloc[0].to_dict()
+
+    first = trainer.predict(features)
+    assert trainer.predict(features) == first
+    assert (trainer.prediction_cache.hits, trainer.prediction_cache.misses) == (1, 1)
+
+    # A different model set takes over: the next prediction is scored by it, not read from the cache
+    trainer.model_params.update(n_estimators=3, max_depth=2)
+    trainer.train_models(training_df)
+    swapped = trainer.predict(features)
+
+    assert trainer.prediction_cache.misses == 2
+    assert swapped != first
+    assert swapped == trainer._predict_matrix(trainer._serving, trainer.build_feature_matrix([features]))[0]
@@ -0,0 +1,32 @@
+# tests/test_response_cache.py
+import os
+
+from services.response_cache import ResponseCache
+
+PARAMS = {'PlayerID': 2544, 'Season': '2023-24'}
+
+
+def test_round_trip(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put('playergamelog', PARAMS, b'{"resultSets": []}')
+
+    assert cache.get('playergamelog', PARAMS) == b'{"resultSets": []}'
+    assert cache.stats()['hits'] == 1
+
+
+def test_truncated_entry_is_a_miss_and_removed(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put('playergamelog', PARAMS, b'{"resultSets": []}' * 100)
+
+    path = cache._path(cache.key('playergamelog', PARAMS))
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 10)
+
+    assert cache.get('playergamelog', PARAMS) is None
+    assert not os.path.exists(path)
+    assert cache.stats()['entries'] == 0
+
+    # The next fetch stores the entry again
+    cache.put('playergamelog', PARAMS, b'{}')
+    assert cache.get('playergamelog', PARAMS) == b'{}'
+
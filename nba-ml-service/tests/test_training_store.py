@@ -0,0 +1,51 @@
+# tests/test_training_store.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.training_store import TrainingDataStore
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'real_nba_training_data.csv')
+
+
+@pytest.fixture(scope='module')
+def training_df():
+    return pd.read_csv(DATA_PATH)
+
+
+def test_reads_back_compact_rows_filtered_by_season_and_player(training_df, tmp_path):
+    store = TrainingDataStore(str(tmp_path))
+    store.write(training_df.iloc[:1000], '2022-23')
+    store.write(training_df.iloc[1000:], '2023-24')
+
+    assert store.count_rows() == len(training_df)
+
+    player_id = int(training_df['player_id'].iloc[1200])
+    read = store.read(columns=['player_id', 'season_avg_points', 'actual_points'],
+                      seasons=['2023-24'], player_ids=[player_id])
+    expected = training_df.iloc[1000:].query('player_id == @player_id')
+
+    assert list(read.columns) == ['player_id', 'season_avg_points', 'actual_points']
+    assert read['player_id'].dtype == 'category'
+    assert read['season_avg_points'].dtype == np.float32
+    assert read['actual_points'].dtype == np.int16
+    np.testing.assert_allclose(read['season_avg_points'], expected['season_avg_points'], rtol=1e-6)
+    assert read['actual_points'].tolist() == expected['actual_points'].tolist()
+
+
+def test_parts_list_in_write_order_and_restrict_reads(training_df, tmp_path):
+    store = TrainingDataStore(str(tmp_path))
+    store.write(training_df.iloc[:500], '2023-24')
+    first_parts = store.part_names()
+    store.write(training_df.iloc[500:800], '2023-24')
+
+    parts = store.part_names()
+    assert parts[:1] == first_parts and len(parts) == 2
+    assert len(store.read(parts=parts[1:])) == 300
+
+    # Parts removed by an overwrite since the list was taken are skipped
+    store.write(training_df.iloc[800:900], '2023-24', overwrite=True)
+    assert store.read(parts=parts).empty
+    assert len(store.read()) == 100
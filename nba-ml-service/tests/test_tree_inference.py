@@ -0,0 +1,65 @@
+# tests/test_tree_inference.py
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from services.tree_inference import (
+    NUMBA_AVAILABLE, CompiledForest, load_model_set, save_compact_model_set, save_model_set
+)
+
+ENGINES = ['numpy'] + (['numba'] if NUMBA_AVAILABLE else [])
+
+
+@pytest.fixture(scope='module')
+def forest_and_rows():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 5)).astype(np.float32)
+    y = X[:, 0] * 3 + X[:, 1] - X[:, 2] ** 2 + rng.normal(scale=0.1, size=400)
+    model = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0).fit(X, y)
+
+    # Trained without NaN, so sklearn sends missing values to each split's bigger child
+    rows = X[:100].copy()
+    rows[rng.random(rows.shape) < 0.3] = np.nan
+    return model, rows
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_nan_features_follow_sklearn_routing(forest_and_rows, engine):
+    model, rows = forest_and_rows
+    forest = CompiledForest.from_sklearn(model)
+
+    np.testing.assert_allclose(forest.predict(rows, engine=engine), model.predict(rows), rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize('save', [save_model_set, save_compact_model_set])
+def test_saved_model_sets_keep_nan_routing(forest_and_rows, tmp_path, save):
+    model, rows = forest_and_rows
+    path = str(tmp_path / 'models.bin')
+    save(path, {'points': CompiledForest.from_sklearn(model)}, [f"f{i}" for i in range(5)])
+
+    compiled_models, _, _ = load_model_set(path)
+    predictions = compiled_models['points'].predict(rows, engine='numpy')
+    np.testing.assert_allclose(predictions, model.predict(rows), rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize('leaf_values, atol', [('table', 1e-12), ('float32', 1e-5)])
+def test_compact_model_set_is_smaller_and_keeps_predictions(forest_and_rows, tmp_path, leaf_values, atol):
+    model, rows = forest_and_rows
+    compiled_models = {'points': CompiledForest.from_sklearn(model)}
+    features = [f"f{i}" for i in range(5)]
+    full_path, compact_path = str(tmp_path / 'models.forest'), str(tmp_path / 'models.cforest')
+    save_model_set(full_path, compiled_models, features, metadata={'version': 'v1'})
+    save_compact_model_set(compact_path, compiled_models, features, metadata={'version': 'v1'}, leaf_values=leaf_values)
+
+    assert os.path.getsize(compact_path) < os.path.getsize(full_path) / 2
+
+    compact_models, compact_features, metadata = load_model_set(compact_path)
+    assert compact_features == features and metadata['version'] == 'v1'
+    # float32 inputs take the same branches, so only the leaf encoding can change the output
+    finite_rows = np.nan_to_num(rows)
+    np.testing.assert_allclose(
+        compact_models['points'].predict(finite_rows, engine='numpy'), model.predict(finite_rows),
+        rtol=0, atol=atol
+    )